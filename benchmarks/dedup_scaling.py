@@ -0,0 +1,60 @@
+"""
+Wall time of sharded deduplication with 2, 4, 8 and 16 worker
+processes, against the single-process clustering path (1 worker).
+
+Runs at a threshold of 0.5, where fuzzy hostname keys are needed and
+scoring dominates. Every run is checked against the single-process
+result.
+
+    python -m benchmarks.dedup_scaling [hosts]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("API_REQUEST_TIMEOUT", "10")
+os.environ.setdefault("PAGINATION_LIMIT", "500")
+
+from benchmarks import synthetic  # noqa: E402
+from src.clients.crowdstrike import CrowdstrikeClient  # noqa: E402
+from src.clients.qualys import QualysClient  # noqa: E402
+from src.services.deduplication import HostDeduplicator  # noqa: E402
+
+WORKERS = [1, 2, 4, 8, 16]
+THRESHOLD = 0.5
+
+
+def build_hosts(total: int):
+    machines = total * 2 // 3
+    hosts = []
+    for client in (QualysClient(), CrowdstrikeClient()):
+        hosts.extend(client.normalize_page(
+            synthetic.page(client.SOURCE_SYSTEM, 0, total // 2, total // 2, machines)
+        ))
+    return hosts
+
+
+def run(hosts, workers: int):
+    deduplicator = HostDeduplicator(clustering=True, workers=workers)
+    start = time.perf_counter()
+    result = deduplicator.deduplicate_hosts(hosts, THRESHOLD)
+    return result, time.perf_counter() - start, deduplicator.stats
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    hosts = build_hosts(total)
+    print(f"{len(hosts)} hosts, {os.cpu_count()} CPUs\n")
+
+    print(f"{'workers':>7} {'seconds':>8} {'speedup':>8} {'scored':>9} {'unique':>7}")
+    expected_ids = None
+    baseline = None
+    for workers in WORKERS:
+        result, seconds, stats = run(hosts, workers)
+        if expected_ids is None:
+            expected_ids, baseline = [host.id for host in result], seconds
+        assert [host.id for host in result] == expected_ids
+        print(f"{workers:>7} {seconds:>8.2f} {baseline / seconds:>7.2f}x {stats.pairs_scored:>9} {len(result):>7}")
+
+if __name__ == "__main__":
+    main()
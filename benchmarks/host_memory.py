@@ -0,0 +1,84 @@
+"""
+Memory per host of ``Host``, with raw payloads in memory, dropped or
+offloaded to a ``FileRawStore``, against the host class the pipeline
+used before ``Host`` was slotted: a plain dataclass keeping its fields in
+a ``__dict__``, with uninterned OS and source strings.
+
+    python -m benchmarks.host_memory
+"""
+import os
+import random
+import tracemalloc
+from dataclasses import MISSING, field, fields, make_dataclass
+
+os.environ.setdefault("API_REQUEST_TIMEOUT", "10")
+os.environ.setdefault("PAGINATION_LIMIT", "500")
+
+from benchmarks import synthetic  # noqa: E402
+from src.clients.crowdstrike import CrowdstrikeClient  # noqa: E402
+from src.models.host import Host  # noqa: E402
+from src.services.raw_store import FileRawStore  # noqa: E402
+
+HOSTS = 20_000
+
+# Same fields as Host, without slots or interning
+UnslottedHost = make_dataclass('UnslottedHost', [
+    (
+        host_field.name,
+        host_field.type,
+        field(default=host_field.default)
+        if host_field.default is not MISSING
+        else field(default_factory=host_field.default_factory)
+    )
+    for host_field in fields(Host)
+])
+
+
+def unslotted(host: Host) -> UnslottedHost:
+    values = {host_field.name: getattr(host, host_field.name) for host_field in fields(Host)}
+    for name in Host.INTERNED_FIELDS:
+        # A fresh copy, as every normalized record had before interning
+        values[name] = values[name].encode().decode()
+    return UnslottedHost(**values)
+
+
+def build_hosts(keep_raw: bool = True, raw_store=None, convert=None):
+    client = CrowdstrikeClient()
+    client.raw_store = raw_store
+    rng = random.Random(0)
+    hosts = []
+    for record in range(HOSTS):
+        host = client.normalize_host(synthetic.crowdstrike_host(record, record, rng))
+        if not keep_raw:
+            host.raw_data = {}
+        hosts.append(convert(host) if convert else host)
+    return hosts
+
+
+def measure(build):
+    tracemalloc.start()
+    objects = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objects, size
+
+
+def main():
+    _, host_bytes = measure(build_hosts)
+    _, unslotted_bytes = measure(lambda: build_hosts(convert=unslotted))
+    _, host_without_raw_bytes = measure(lambda: build_hosts(keep_raw=False))
+    _, unslotted_without_raw_bytes = measure(lambda: build_hosts(keep_raw=False, convert=unslotted))
+    raw_store = FileRawStore()
+    _, host_offloaded_bytes = measure(lambda: build_hosts(raw_store=raw_store))
+    raw_store.close()
+
+    print(f"{'representation':<36} {'bytes/host':>10}")
+    print(f"{'Host':<36} {host_bytes / HOSTS:>10.0f}")
+    print(f"{'unslotted Host':<36} {unslotted_bytes / HOSTS:>10.0f}")
+    print(f"{'Host without raw_data':<36} {host_without_raw_bytes / HOSTS:>10.0f}")
+    print(f"{'unslotted Host without raw_data':<36} {unslotted_without_raw_bytes / HOSTS:>10.0f}")
+    print(f"{'Host, raw_data offloaded':<36} {host_offloaded_bytes / HOSTS:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
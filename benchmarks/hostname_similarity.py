@@ -0,0 +1,97 @@
+"""
+Accuracy and speed of the hostname similarity backends against the
+``SequenceMatcher`` baseline, on the labeled pairs in
+``fixtures/hostname_pairs.csv``.
+
+For every backend the report gives the threshold with the best F1 on the
+fixture, precision and recall at that threshold, how often its decisions
+agree with the baseline's, and the cost of scoring one pair when every
+hostname is compared many times. For MinHash it also gives the share of
+labeled duplicates that land in a common LSH bucket.
+
+    python -m benchmarks.hostname_similarity
+"""
+import csv
+import itertools
+import os
+import time
+
+from src.services.similarity import (
+    MinHashSimilarity,
+    SequenceMatcherSimilarity,
+    ShingleSimilarity,
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'hostname_pairs.csv')
+TIMING_HOSTNAMES = 300
+
+
+def load_pairs():
+    with open(FIXTURE, newline='') as fixture:
+        return [
+            (row['hostname1'], row['hostname2'], row['duplicate'] == '1')
+            for row in csv.DictReader(fixture)
+        ]
+
+
+def best_threshold(scores, labels):
+    """
+    Threshold maximizing F1, with its precision and recall
+    """
+    best = (0.0, 0.0, 0.0, 0.0)
+    for threshold in sorted(set(scores)):
+        decisions = [score >= threshold for score in scores]
+        true_positives = sum(d and l for d, l in zip(decisions, labels))
+        false_positives = sum(d and not l for d, l in zip(decisions, labels))
+        false_negatives = sum(not d and l for d, l in zip(decisions, labels))
+        f1 = 2 * true_positives / (2 * true_positives + false_positives + false_negatives)
+        if f1 > best[0]:
+            precision = true_positives / (true_positives + false_positives)
+            recall = true_positives / (true_positives + false_negatives)
+            best = (f1, threshold, precision, recall)
+    return best
+
+
+def microseconds_per_pair(backend, hostnames):
+    pairs = list(itertools.combinations(hostnames, 2))
+    start = time.perf_counter()
+    for hostname1, hostname2 in pairs:
+        backend.similarity(hostname1, hostname2)
+    return (time.perf_counter() - start) / len(pairs) * 1e6
+
+
+def main():
+    pairs = load_pairs()
+    labels = [duplicate for _, _, duplicate in pairs]
+    hostnames = sorted({hostname for pair in pairs for hostname in pair[:2]})
+    timing_hostnames = [
+        f"{hostname}-{i}" for i, hostname in zip(range(TIMING_HOSTNAMES), itertools.cycle(hostnames))
+    ]
+
+    backends = [SequenceMatcherSimilarity(), ShingleSimilarity(), MinHashSimilarity()]
+    decisions = {}
+
+    print(f"{len(pairs)} labeled pairs, {sum(labels)} duplicates\n")
+    print(f"{'backend':<10} {'threshold':>9} {'F1':>6} {'precision':>9} {'recall':>7} "
+          f"{'agreement':>9} {'us/pair':>8}")
+    for backend in backends:
+        scores = [backend.similarity(hostname1, hostname2) for hostname1, hostname2, _ in pairs]
+        f1, threshold, precision, recall = best_threshold(scores, labels)
+        decisions[backend.name] = [score >= threshold for score in scores]
+        agreement = sum(
+            d == b for d, b in zip(decisions[backend.name], decisions['sequence'])
+        ) / len(pairs)
+        cost = microseconds_per_pair(backend, timing_hostnames)
+        print(f"{backend.name:<10} {threshold:>9.2f} {f1:>6.3f} {precision:>9.3f} {recall:>7.3f} "
+              f"{agreement:>9.1%} {cost:>8.2f}")
+
+    minhash = backends[-1]
+    bucketed = sum(
+        bool(minhash.lsh_keys(hostname1) & minhash.lsh_keys(hostname2))
+        for hostname1, hostname2, duplicate in pairs if duplicate
+    )
+    print(f"\nMinHash LSH puts {bucketed} of {sum(labels)} labeled duplicates in a common bucket")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Throughput of per-record ``normalize_host_data`` versus page-wise
+``normalize_batch``.
+
+    python -m benchmarks.normalization_throughput
+"""
+import os
+import time
+
+os.environ.setdefault("API_REQUEST_TIMEOUT", "10")
+os.environ.setdefault("PAGINATION_LIMIT", "500")
+
+from benchmarks import synthetic  # noqa: E402
+from src.services.normalization import HostNormalizer  # noqa: E402
+
+RECORDS = 100_000
+PAGE_SIZES = [50, 500, 5000]
+# Each machine is reported twice, as it is by the two vendors
+MACHINES = RECORDS // 2
+
+
+def record(index: int):
+    machine = index % MACHINES
+    return {
+        'hostname': f"HOST-{machine}.corp.example.com",
+        'ip_addresses': [synthetic.machine_ip(machine), f" {synthetic.machine_ip(machine + 1)}", 'n/a'],
+        'mac_addresses': [synthetic.machine_mac(machine).upper().replace(':', '-')],
+        'os': 'Windows'
+    }
+
+
+def per_record(pages):
+    return [[HostNormalizer.normalize_host_data(raw_host) for raw_host in page] for page in pages]
+
+
+def batched(pages):
+    return [HostNormalizer.normalize_batch(page).to_records() for page in pages]
+
+
+def timed(normalize, pages):
+    start = time.perf_counter()
+    result = normalize(pages)
+    return result, time.perf_counter() - start
+
+
+def main():
+    records = [record(index) for index in range(RECORDS)]
+
+    print(f"{'page size':>9} {'per-record rec/s':>17} {'batched rec/s':>14} {'speedup':>8}")
+    for page_size in PAGE_SIZES:
+        pages = [records[i:i + page_size] for i in range(0, RECORDS, page_size)]
+        expected, per_record_seconds = timed(per_record, pages)
+        result, batched_seconds = timed(batched, pages)
+        assert result == expected
+        print(
+            f"{page_size:>9} {RECORDS / per_record_seconds:>17,.0f} "
+            f"{RECORDS / batched_seconds:>14,.0f} {per_record_seconds / batched_seconds:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
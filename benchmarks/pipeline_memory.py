@@ -0,0 +1,73 @@
+"""
+Peak memory of the streaming pipeline versus materializing every stage.
+
+The synthetic fleet has a fixed number of distinct machines, so the
+deduplicated state stays the same size while the inventory grows. The
+streaming peak should stay flat; the materialized peak grows with the
+inventory.
+
+    python -m benchmarks.pipeline_memory
+"""
+import os
+import tracemalloc
+
+os.environ.setdefault("API_REQUEST_TIMEOUT", "10")
+os.environ.setdefault("PAGINATION_LIMIT", "500")
+
+from benchmarks import synthetic  # noqa: E402
+from src.clients.qualys import QualysClient  # noqa: E402
+from src.config.settings import settings  # noqa: E402
+from src.main import iter_hosts  # noqa: E402
+from src.services.deduplication import HostDeduplicator  # noqa: E402
+
+MACHINES = 500
+INVENTORY_SIZES = [2_000, 8_000, 32_000]
+
+
+class SyntheticQualysClient(QualysClient):
+    """
+    Qualys client serving pages of a synthetic fleet instead of the API
+    """
+    def __init__(self, total: int):
+        super().__init__()
+        self.total = total
+
+    def fetch_hosts(self, skip: int = 0, limit: int = 2):
+        return synthetic.page('Qualys', skip, limit, self.total, MACHINES)
+
+
+def run_streaming(total: int) -> int:
+    hosts = HostDeduplicator().deduplicate_hosts(iter_hosts(SyntheticQualysClient(total)))
+    return len(hosts)
+
+
+def run_materialized(total: int) -> int:
+    client = SyntheticQualysClient(total)
+    raw_hosts = [
+        raw_host
+        for batch in client.iter_pages(settings.PAGINATION_LIMIT)
+        for raw_host in batch
+    ]
+    normalized_hosts = client.normalize_page(raw_hosts)
+    hosts = HostDeduplicator().deduplicate_hosts(normalized_hosts)
+    return len(hosts)
+
+
+def measure(run, total: int):
+    tracemalloc.start()
+    hosts = run(total)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return hosts, peak
+
+
+def main():
+    print(f"{'inventory':>10} {'mode':>13} {'unique':>8} {'peak MiB':>9}")
+    for total in INVENTORY_SIZES:
+        for name, run in (('streaming', run_streaming), ('materialized', run_materialized)):
+            hosts, peak = measure(run, total)
+            print(f"{total:>10} {name:>13} {hosts:>8} {peak / 2 ** 20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmark suite timing every stage of the pipeline on a synthetic fleet,
+with the results written to JSON so runs can be compared over time.
+
+Stages: per-record ``normalize_host``, page-wise ``HostNormalizer``
+batches, ``HostDeduplicator`` and storage through ``HostRepository``
+against mongomock. The inventory is split evenly between Qualys and
+Crowdstrike.
+
+mongomock scans a collection for every upsert, so storage slows down
+quadratically; only the first ``--store-limit`` unique hosts are stored.
+
+    python -m benchmarks.suite --scale 100k --duplicate-rate 0.3 --noise 0.05
+    python -m benchmarks.suite --scale 1k --similarity minhash --workers 4
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+os.environ.setdefault("API_REQUEST_TIMEOUT", "10")
+os.environ.setdefault("PAGINATION_LIMIT", "500")
+
+import mongomock  # noqa: E402
+
+from benchmarks import synthetic  # noqa: E402
+from src.clients.crowdstrike import CrowdstrikeClient  # noqa: E402
+from src.clients.qualys import QualysClient  # noqa: E402
+from src.services.deduplication import HostDeduplicator  # noqa: E402
+from src.services.metrics import PipelineMetrics  # noqa: E402
+from src.services.repository import HostRepository  # noqa: E402
+from src.services.similarity import HOSTNAME_SIMILARITIES, get_hostname_similarity  # noqa: E402
+
+STAGES = ['normalize_host', 'normalize_batch', 'deduplicate', 'store']
+PAGE_SIZE = 500
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=sorted(synthetic.SCALES), default='1k',
+                        help="Number of raw hosts across both vendors")
+    parser.add_argument('--duplicate-rate', type=float, default=0.3,
+                        help="Fraction of each vendor's records describing a machine seen before")
+    parser.add_argument('--noise', type=float, default=0.05,
+                        help="Probability of perturbing the hostname, IP and MAC of a record")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--similarity', choices=sorted(HOSTNAME_SIMILARITIES), default='sequence',
+                        help="Hostname similarity backend of deduplication")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Deduplication worker processes")
+    parser.add_argument('--threshold', type=float, default=0.7)
+    parser.add_argument('--store-limit', type=int, default=2_000,
+                        help="Maximum number of unique hosts stored (0 for all)")
+    parser.add_argument('--output', help="Result file (defaults to benchmarks/results/)")
+    return parser.parse_args()
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def iter_raw_pages(client, total: int, args: argparse.Namespace):
+    return synthetic.iter_fleet_pages(
+        client.SOURCE_SYSTEM, total, PAGE_SIZE, args.duplicate_rate, args.noise, args.seed
+    )
+
+
+def run(args: argparse.Namespace) -> dict:
+    total = synthetic.SCALES[args.scale]
+    clients = [(QualysClient(), total // 2), (CrowdstrikeClient(), total - total // 2)]
+    metrics = PipelineMetrics()
+    hosts = []
+
+    if 'normalize_host' in args.stages:
+        for client, vendor_total in clients:
+            for raw_hosts in iter_raw_pages(client, vendor_total, args):
+                with metrics.stage('normalize_host') as stage:
+                    normalized = [client.normalize_host(raw_host) for raw_host in raw_hosts]
+                    stage.count(len(raw_hosts), sum(host is not None for host in normalized))
+
+    # Later stages need the hosts, so they are always normalized page-wise
+    for client, vendor_total in clients:
+        for raw_hosts in iter_raw_pages(client, vendor_total, args):
+            with metrics.stage('normalize_batch') as stage:
+                normalized = client.normalize_page(raw_hosts)
+                stage.count(len(raw_hosts), len(normalized))
+            hosts.extend(normalized)
+
+    unique_hosts = hosts
+    if 'deduplicate' in args.stages or 'store' in args.stages:
+        deduplicator = HostDeduplicator(
+            hostname_similarity=get_hostname_similarity(args.similarity),
+            workers=args.workers
+        )
+        with metrics.stage('deduplicate') as stage:
+            unique_hosts = deduplicator.deduplicate_hosts(hosts, args.threshold)
+            stage.count(len(hosts), len(unique_hosts))
+
+    if 'store' in args.stages:
+        repository = HostRepository(mongomock.MongoClient()['benchmark']['hosts'])
+        repository.ensure_indexes()
+        with metrics.stage('store') as stage:
+            stored_hosts = unique_hosts[:args.store_limit] if args.store_limit else unique_hosts
+            summaries = repository.upsert_hosts(stored_hosts)
+            stage.count(len(stored_hosts), sum(s.matched + s.upserted for s in summaries))
+
+    metrics.finish()
+    summary = metrics.summary()
+    summary['stages'] = {name: summary['stages'][name] for name in STAGES if name in summary['stages']}
+    return {
+        'benchmark': 'suite',
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parameters': {
+            'scale': args.scale,
+            'hosts': total,
+            'duplicate_rate': args.duplicate_rate,
+            'noise': args.noise,
+            'seed': args.seed,
+            'similarity': args.similarity,
+            'workers': args.workers,
+            'threshold': args.threshold,
+            'store_limit': args.store_limit,
+        },
+        **summary,
+    }
+
+
+def main():
+    args = parse_args()
+    result = run(args)
+
+    print(f"{'stage':>16} {'seconds':>9} {'in':>9} {'out':>9} {'records/s':>11} {'max RSS MiB':>12}")
+    for name, stage in result['stages'].items():
+        # Process high-water mark when the stage ended, not a per-stage peak
+        max_rss = (stage['max_rss_so_far_bytes'] or 0) / 2 ** 20
+        print(
+            f"{name:>16} {stage['wall_seconds']:>9.3f} {stage['records_in']:>9} "
+            f"{stage['records_out']:>9} {stage['records_per_second']:>11.0f} {max_rss:>12.1f}"
+        )
+
+    output = args.output or os.path.join(
+        RESULTS_DIR,
+        f"suite-{args.scale}-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as results:
+        json.dump(result, results, indent=2)
+    print(f"\nResults written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
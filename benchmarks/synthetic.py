@@ -0,0 +1,259 @@
+"""
+Synthetic Qualys- and Crowdstrike-shaped raw host payloads for benchmarks
+"""
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List
+
+BASE_TIME = datetime(2024, 1, 1)
+# (Qualys name, Crowdstrike name) of each operating system
+OPERATING_SYSTEMS = [('Windows', 'Windows'), ('Linux', 'Linux'), ('macOS', 'Mac')]
+OS_VERSIONS = ['11', '22.04', '14.2']
+# Inventory sizes of the benchmark suite, across both vendors
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+
+def machine_ip(machine: int) -> str:
+    """
+    Deterministic IPv4 address of a physical machine
+    """
+    return f"10.{machine >> 16 & 255}.{machine >> 8 & 255}.{machine & 255}"
+
+
+def machine_mac(machine: int) -> str:
+    """
+    Deterministic MAC address of a physical machine
+    """
+    return ':'.join(f"{machine >> shift & 255:02x}" for shift in (40, 32, 24, 16, 8, 0))
+
+
+def qualys_host(record: int, machine: int, rng: random.Random) -> Dict[str, Any]:
+    """
+    Build a raw Qualys host for a physical machine
+
+    :param record: Unique record number
+    :param machine: Physical machine number
+    :param rng: Random source
+    :return: Raw Qualys host payload
+    """
+    first_seen = BASE_TIME + timedelta(days=rng.randrange(365))
+    return {
+        'id': record,
+        'hostname': f"host-{machine:06d}.corp.example.com",
+        'ip_address': machine_ip(machine),
+        'mac_addresses': [machine_mac(machine)],
+        'os': OPERATING_SYSTEMS[machine % 3][0],
+        'os_version': OS_VERSIONS[machine % 3],
+        'first_seen': first_seen.isoformat(),
+        'last_seen': (first_seen + timedelta(days=rng.randrange(60))).isoformat(),
+        'vulnerability_count': rng.randrange(50),
+    }
+
+
+def crowdstrike_host(record: int, machine: int, rng: random.Random) -> Dict[str, Any]:
+    """
+    Build a raw Crowdstrike host for a physical machine
+
+    :param record: Unique record number
+    :param machine: Physical machine number
+    :param rng: Random source
+    :return: Raw Crowdstrike host payload
+    """
+    first_seen = BASE_TIME + timedelta(days=rng.randrange(365))
+    return {
+        'cid': f"cs-{record}",
+        'hostname': f"HOST-{machine:06d}",
+        'local_ip': [machine_ip(machine)],
+        'external_ip': [],
+        'mac_addresses': [machine_mac(machine).replace(':', '-')],
+        'platform_name': OPERATING_SYSTEMS[machine % 3][1],
+        'platform_version': OS_VERSIONS[machine % 3],
+        'first_seen': first_seen.isoformat() + 'Z',
+        'last_seen': (first_seen + timedelta(days=rng.randrange(60))).isoformat() + 'Z',
+        'active_vulnerabilities': rng.randrange(50),
+    }
+
+
+def page(
+    vendor: str,
+    skip: int,
+    limit: int,
+    total: int,
+    machines: int,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Build one API page of a synthetic fleet
+
+    Record ``i`` always describes machine ``i % machines``, so pages are
+    reproducible and inventories larger than ``machines`` are duplicates.
+
+    :param vendor: 'Qualys' or 'Crowdstrike'
+    :param skip: Number of records to skip
+    :param limit: Number of records to return
+    :param total: Total number of records in the inventory
+    :param machines: Number of distinct physical machines
+    :param seed: Random seed
+    :return: List of raw host payloads
+    """
+    build = qualys_host if vendor == 'Qualys' else crowdstrike_host
+    return [
+        build(record, record % machines, random.Random(seed * 1_000_003 + record))
+        for record in range(skip, min(skip + limit, total))
+    ]
+
+
+def fleet_machine(record: int, duplicate_rate: float, rng: random.Random) -> int:
+    """
+    Physical machine described by a record of a fleet with duplicates
+
+    New machines and duplicates are interleaved: record ``i`` is a new
+    machine whenever ``(i + 1) * (1 - duplicate_rate)`` reaches the next
+    integer, and otherwise reports again a machine seen earlier.
+
+    :param record: Record number
+    :param duplicate_rate: Fraction of records describing a machine seen before
+    :param rng: Random source of the record
+    :return: Physical machine number
+    """
+    distinct_rate = 1 - duplicate_rate
+    seen = math.ceil(record * distinct_rate)
+    if math.ceil((record + 1) * distinct_rate) > seen or seen == 0:
+        return seen
+    return rng.randrange(seen)
+
+
+def noisy_hostname(hostname: str, rng: random.Random) -> str:
+    """
+    Hostname as another team or agent might report it
+
+    :param hostname: Clean hostname
+    :param rng: Random source
+    :return: Case-changed, shortened, padded or misspelt hostname
+    """
+    variant = rng.randrange(4)
+    if variant == 0:
+        return hostname.swapcase()
+    if variant == 1:
+        return hostname.split('.', 1)[0]
+    if variant == 2:
+        return f" {hostname} "
+    position = rng.randrange(len(hostname))
+    return hostname[:position] + rng.choice('abcdefghijklmnopqrstuvwxyz0123456789') + hostname[position + 1:]
+
+
+def noisy_ip(ip: str, rng: random.Random) -> List[str]:
+    """
+    IP addresses of a machine as reported with noise
+
+    :param ip: Stable IP address of the machine
+    :param rng: Random source
+    :return: IP addresses, including re-leased, padded or invalid ones
+    """
+    variant = rng.randrange(3)
+    if variant == 0:
+        # Re-leased by DHCP
+        return [f"{ip.rsplit('.', 1)[0]}.{rng.randrange(256)}"]
+    if variant == 1:
+        return [f" {ip}", f"172.16.{rng.randrange(256)}.{rng.randrange(256)}"]
+    return [ip, 'n/a']
+
+
+def noisy_mac(mac: str, rng: random.Random) -> List[str]:
+    """
+    MAC addresses of a machine as reported with noise
+
+    :param mac: MAC address of the machine, colon separated
+    :param rng: Random source
+    :return: MAC addresses in another notation, or none at all
+    """
+    variant = rng.randrange(3)
+    if variant == 0:
+        return [mac.upper().replace(':', '-')]
+    if variant == 1:
+        digits = mac.replace(':', '')
+        return ['.'.join(digits[i:i + 4] for i in range(0, 12, 4))]
+    return []
+
+
+def add_noise(vendor: str, raw_host: Dict[str, Any], noise: float, rng: random.Random) -> Dict[str, Any]:
+    """
+    Perturb the hostname, IP and MAC fields of a raw host, each with
+    probability ``noise``
+
+    :param vendor: 'Qualys' or 'Crowdstrike'
+    :param raw_host: Raw host payload, modified in place
+    :param noise: Probability of perturbing each field
+    :param rng: Random source
+    :return: The raw host
+    """
+    ip_key = 'ip_address' if vendor == 'Qualys' else 'local_ip'
+    if rng.random() < noise:
+        raw_host['hostname'] = noisy_hostname(raw_host['hostname'], rng)
+    if rng.random() < noise:
+        ips = raw_host[ip_key]
+        ips = noisy_ip(ips if isinstance(ips, str) else ips[0], rng)
+        raw_host[ip_key] = ips[0] if vendor == 'Qualys' else ips
+    if rng.random() < noise and raw_host['mac_addresses']:
+        raw_host['mac_addresses'] = noisy_mac(raw_host['mac_addresses'][0].replace('-', ':'), rng)
+    return raw_host
+
+
+def fleet_page(
+    vendor: str,
+    skip: int,
+    limit: int,
+    total: int,
+    duplicate_rate: float = 0.3,
+    noise: float = 0.0,
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Build one API page of a synthetic fleet with duplicates and noise
+
+    Every record depends only on its number and the parameters, so any
+    page can be built on its own and runs are reproducible. Both vendors
+    draw from the same machines, so a machine reported by both merges
+    across vendors.
+
+    :param vendor: 'Qualys' or 'Crowdstrike'
+    :param skip: Number of records to skip
+    :param limit: Number of records to return
+    :param total: Total number of records of the vendor
+    :param duplicate_rate: Fraction of records describing a machine seen before
+    :param noise: Probability of perturbing the hostname, IP and MAC of a record
+    :param seed: Random seed
+    :return: List of raw host payloads
+    """
+    build: Callable = qualys_host if vendor == 'Qualys' else crowdstrike_host
+    vendor_seed = seed * 2 + (vendor != 'Qualys')
+    hosts = []
+    for record in range(skip, min(skip + limit, total)):
+        rng = random.Random(vendor_seed * 1_000_003 + record)
+        raw_host = build(record, fleet_machine(record, duplicate_rate, rng), rng)
+        hosts.append(add_noise(vendor, raw_host, noise, rng) if noise else raw_host)
+    return hosts
+
+
+def iter_fleet_pages(
+    vendor: str,
+    total: int,
+    page_size: int = 500,
+    duplicate_rate: float = 0.3,
+    noise: float = 0.0,
+    seed: int = 0
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lazily build every page of a synthetic fleet
+
+    :param vendor: 'Qualys' or 'Crowdstrike'
+    :param total: Total number of records of the vendor
+    :param page_size: Number of records per page
+    :param duplicate_rate: Fraction of records describing a machine seen before
+    :param noise: Probability of perturbing the hostname, IP and MAC of a record
+    :param seed: Random seed
+    :return: Iterator over pages of raw host payloads
+    """
+    for skip in range(0, total, page_size):
+        yield fleet_page(vendor, skip, page_size, total, duplicate_rate, noise, seed)
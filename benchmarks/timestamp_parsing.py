@@ -0,0 +1,59 @@
+"""
+Timestamp parsing cost of ``TimestampParser`` versus calling ``dateutil``
+on every value.
+
+    python -m benchmarks.timestamp_parsing
+"""
+import time
+from datetime import datetime, timedelta
+
+from dateutil.parser import parse
+
+from src.services.timestamps import TimestampParser, as_utc, utc_now
+
+VALUES = 50_000
+BASE_TIME = datetime(2024, 1, 1)
+
+
+def timestamps(suffix: str = '', timestamp_format: str = None):
+    values = [BASE_TIME + timedelta(minutes=17 * i) for i in range(VALUES)]
+    if timestamp_format:
+        return [value.strftime(timestamp_format) for value in values]
+    return [value.isoformat() + suffix for value in values]
+
+
+def rate(parse_value, values) -> float:
+    start = time.perf_counter()
+    for value in values:
+        parse_value(value)
+    return len(values) / (time.perf_counter() - start)
+
+
+def main():
+    cases = [
+        # (name, values, formats known to the parser)
+        ('ISO 8601 (Qualys)', timestamps(), ()),
+        ('ISO 8601 Zulu (Crowdstrike)', timestamps('Z'), ()),
+        ('vendor format', timestamps(timestamp_format='%d/%m/%Y %H:%M:%S'), ('%d/%m/%Y %H:%M:%S',)),
+    ]
+
+    print(f"{'values':<28} {'dateutil/s':>11} {'parser/s':>11} {'speedup':>8}")
+    for name, values, formats in cases:
+        parser = TimestampParser(formats)
+        assert all(
+            parser.parse(value) == as_utc(parse(value, dayfirst=bool(formats)))
+            for value in values[:100]
+        )
+        dateutil_rate = rate(parse, values)
+        parser_rate = rate(parser.parse, values)
+        print(f"{name:<28} {dateutil_rate:>11,.0f} {parser_rate:>11,.0f} {parser_rate / dateutil_rate:>7.1f}x")
+
+    # Missing fields used to format the current time and parse it back
+    missing = [None] * VALUES
+    old_rate = rate(lambda _: parse(datetime.now().isoformat()), missing)
+    new_rate = rate(lambda _: utc_now(), missing)
+    print(f"{'missing (current time)':<28} {old_rate:>11,.0f} {new_rate:>11,.0f} {new_rate / old_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
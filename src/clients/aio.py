@@ -0,0 +1,240 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+from src.clients.crowdstrike import CrowdstrikeClient
+from src.clients.page_cache import default_page_cache
+from src.clients.qualys import QualysClient
+from src.models.host import Host
+from src.services.timestamps import TimestampParser
+from src.config.settings import settings
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+def create_session() -> 'aiohttp.ClientSession':
+    """
+    Create the pooled HTTP session shared by every async client
+
+    :return: aiohttp client session
+    """
+    if aiohttp is None:
+        raise ImportError(
+            "aiohttp is required for the async clients; "
+            "install it with `poetry install --extras async`"
+        )
+
+    connector = aiohttp.TCPConnector(limit=settings.HTTP_CONNECTION_LIMIT)
+    timeout = aiohttp.ClientTimeout(total=settings.API_REQUEST_TIMEOUT)
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        headers={'accept': 'application/json'}
+    )
+
+
+class AsyncHostClientMixin:
+    """
+    Replaces the blocking transport of a vendor client with an asyncio
+    one running on a shared ``aiohttp`` session. Normalization is
+    inherited unchanged from the vendor client.
+    """
+    def __init__(self, session: 'aiohttp.ClientSession'):
+        self.api_token = self.api_token_setting()
+        self.base_url = settings.BASE_URL
+        self.session = session
+        self.timestamp_parser = TimestampParser(self.TIMESTAMP_FORMATS)
+        self.page_cache = default_page_cache()
+        self._init_fetch_controls()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @staticmethod
+    def api_token_setting() -> Optional[str]:
+        """
+        Look up the API token of the vendor
+
+        :return: API token
+        """
+        raise NotImplementedError
+
+    async def fetch_hosts(self, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch hosts from the vendor API with pagination
+
+        :param skip: Number of records to skip
+        :param limit: Number of records to fetch (defaults to ``PAGINATION_LIMIT``)
+        :return: List of raw host data
+        :raises HostFetchError: If the page could not be fetched, even after retrying
+        """
+        limit = limit or settings.PAGINATION_LIMIT
+        url = f"{self.base_url}{self.ENDPOINT}"
+        params = {"skip": skip, "limit": limit}
+
+        cached = await asyncio.to_thread(self._cached_page, url, skip, limit)
+        if cached is not None:
+            return cached
+
+        self.logger.info(f"Fetching hosts from URL: {url} with params: {params}")
+
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await asyncio.sleep(self.rate_limiter.reserve())
+            started = time.perf_counter()
+            try:
+                async with self.session.post(
+                    url,
+                    headers={'token': self.api_token} if self.api_token else None,
+                    **self._request_kwargs(params)
+                ) as response:
+                    response.raise_for_status()
+                    body = await response.read()
+                if not body.strip():
+                    raise ValueError("Empty response body")
+                data = json.loads(body)
+                self.request_stats.record(time.perf_counter() - started)
+                break
+            except aiohttp.ClientResponseError as e:
+                self.request_stats.record(time.perf_counter() - started, ok=False)
+                retry_after = e.headers.get('Retry-After') if e.headers else None
+                delay = self._retry_delay(attempt, e, e.status, retry_after)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.request_stats.record(time.perf_counter() - started, ok=False)
+                if isinstance(e, asyncio.TimeoutError) and self.page_sizer is not None:
+                    self.page_sizer.record_timeout(limit)
+                delay = self._retry_delay(attempt, e)
+            except ValueError as e:
+                # Empty, truncated or invalid body, retried like the sync client does
+                self.request_stats.record(time.perf_counter() - started, ok=False)
+                delay = self._retry_delay(attempt, e)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        # Assuming the API returns a list directly
+        hosts = data if isinstance(data, list) else []
+        self.logger.debug(f"Fetched hosts: {hosts}")
+        if self.page_sizer is not None:
+            self.page_sizer.record(limit, len(hosts), time.perf_counter() - started, len(body))
+        if self.page_cache is not None:
+            await asyncio.to_thread(self.page_cache.put, url, skip, limit, hosts)
+        return hosts
+
+    async def iter_pages(
+        self,
+        page_size: int,
+        max_hosts: Optional[int] = None,
+        concurrency: int = 1
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Yield raw host pages in order until the first empty page, keeping
+        up to ``concurrency`` requests in flight
+
+        Page sizes, checkpoints and short pages are handled as in
+        ``BaseHostClient.iter_pages``.
+
+        :param page_size: Number of records requested per page
+        :param max_hosts: Maximum number of hosts to return (None for all)
+        :param concurrency: Maximum number of pages in flight
+        :return: Async iterator over lists of raw host data
+        """
+        in_flight: Deque[Tuple[asyncio.Task, int, int]] = deque()
+        next_skip = 0
+        await asyncio.to_thread(self._start_pagination, page_size)
+
+        try:
+            while True:
+                while len(in_flight) < max(concurrency, 1) and (max_hosts is None or next_skip < max_hosts):
+                    limit = self._next_page_size(page_size, next_skip, max_hosts)
+                    task = asyncio.ensure_future(self.fetch_hosts(skip=next_skip, limit=limit))
+                    in_flight.append((task, next_skip, limit))
+                    next_skip += limit
+
+                if not in_flight:
+                    break
+
+                task, skip, limit = in_flight.popleft()
+                batch = (await task)[:limit]
+                while batch:
+                    await asyncio.to_thread(self._save_checkpoint, skip + len(batch))
+                    yield batch
+                    if len(batch) == limit:
+                        break
+                    # A short page is either the last one or cut by the
+                    # server, so request the rest of its range before
+                    # moving on; an empty answer ends pagination
+                    skip, limit = skip + len(batch), limit - len(batch)
+                    batch = (await self.fetch_hosts(skip=skip, limit=limit))[:limit]
+                if not batch:
+                    break
+        finally:
+            # Drop pages requested past the end of the data, waiting for the
+            # cancellations so no request outlives the iteration
+            for task, _, _ in in_flight:
+                task.cancel()
+            await asyncio.gather(*(task for task, _, _ in in_flight), return_exceptions=True)
+        await asyncio.to_thread(self._finish_pagination)
+
+    async def iter_normalized_pages(
+        self,
+        page_size: int,
+        max_hosts: Optional[int] = None,
+        concurrency: int = 1
+    ) -> AsyncIterator[List[Host]]:
+        """
+        Yield pages of normalized hosts as soon as each page arrives
+
+        Pages are normalized on a worker thread, since offloading raw
+        payloads to a file or MongoDB store blocks.
+
+        :param page_size: Number of records requested per page
+        :param max_hosts: Maximum number of hosts to return (None for all)
+        :param concurrency: Maximum number of pages in flight
+        :return: Async iterator over lists of normalized hosts
+        """
+        async for batch in self.iter_pages(page_size, max_hosts=max_hosts, concurrency=concurrency):
+            yield await asyncio.to_thread(self.normalize_page, batch)
+
+    async def get_normalized_hosts(
+        self,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+        concurrency: int = 1
+    ) -> List[Host]:
+        """
+        Get normalized hosts from the vendor
+
+        :param limit: Number of hosts to fetch (None fetches until the first empty page)
+        :param page_size: Number of hosts of the first requests (defaults to ``PAGINATION_LIMIT``)
+        :param concurrency: Maximum number of pages in flight
+        :return: List of normalized hosts
+        """
+        page_size = page_size or settings.PAGINATION_LIMIT
+        normalized_hosts = []
+
+        async for hosts in self.iter_normalized_pages(page_size, max_hosts=limit, concurrency=concurrency):
+            normalized_hosts.extend(hosts)
+
+        return normalized_hosts
+
+
+class AsyncQualysClient(AsyncHostClientMixin, QualysClient):
+    """
+    Asyncio client for the Qualys host API
+    """
+    @staticmethod
+    def api_token_setting() -> Optional[str]:
+        return settings.QUALYS_API_TOKEN
+
+
+class AsyncCrowdstrikeClient(AsyncHostClientMixin, CrowdstrikeClient):
+    """
+    Asyncio client for the Crowdstrike host API
+    """
+    @staticmethod
+    def api_token_setting() -> Optional[str]:
+        return settings.CROWDSTRIKE_API_TOKEN
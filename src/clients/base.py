@@ -0,0 +1,490 @@
+import logging
+import time
+import requests
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from src.clients.checkpoints import default_checkpoints
+from src.clients.page_cache import default_page_cache
+from src.clients.paging import PageSizeController
+from src.clients.rate_limit import rate_limiter_for
+from src.clients.retry import HostFetchError, RetryPolicy, parse_retry_after
+from src.models.host import Host
+from src.services.metrics import RequestStats
+from src.services.normalization import HostNormalizer
+from src.services.raw_store import RawPayloadStore
+from src.services.timestamps import TimestampParser, utc_now
+from src.config.settings import settings
+
+class BaseHostClient:
+    """
+    Shared HTTP and pagination logic for vendor host clients
+    """
+    SOURCE_SYSTEM = ''
+    ENDPOINT = ''
+    # Host field -> raw vendor keys it is read from. List fields concatenate
+    # the values of every key, other fields take the first key present.
+    FIELD_MAPPING: Dict[str, Tuple[str, ...]] = {}
+    LIST_FIELDS = frozenset({'ip_addresses', 'mac_addresses'})
+    TIMESTAMP_FIELDS = frozenset({'first_seen', 'last_seen'})
+    # strptime formats the vendor is known to use besides ISO 8601
+    TIMESTAMP_FORMATS: Tuple[str, ...] = ()
+    # Largest page size the vendor API accepts
+    MAX_PAGE_SIZE = 1000
+
+    def __init__(self, api_token: str):
+        self.api_token = api_token
+        self.base_url = settings.BASE_URL
+        self.session = requests.Session()
+        # Allow one pooled connection per page in flight
+        adapter = HTTPAdapter(pool_maxsize=max(settings.FETCH_CONCURRENCY, 1))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'token': self.api_token,
+            'accept': 'application/json'
+        })
+        self.timestamp_parser = TimestampParser(self.TIMESTAMP_FORMATS)
+        self.page_cache = default_page_cache()
+        self._init_fetch_controls()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _init_fetch_controls(self) -> None:
+        """
+        Set up retries, rate limiting and pagination checkpoints
+        """
+        self.retry_policy = RetryPolicy()
+        self.rate_limiter = rate_limiter_for(self.SOURCE_SYSTEM)
+        # Checkpoints are only useful when the pages before them are cached
+        self.checkpoints = (
+            default_checkpoints()
+            if self.page_cache is not None and settings.PAGE_CACHE_MODE in ('on', 'resume')
+            else None
+        )
+        self.resume_skip = 0
+        self.page_sizer: Optional[PageSizeController] = None
+        self.request_stats = RequestStats()
+        # Side store receiving raw payloads; None keeps them on the hosts
+        self.raw_store: Optional[RawPayloadStore] = None
+
+    @property
+    def replay(self) -> bool:
+        """
+        Whether pages are only read from the page cache, without network
+        """
+        return self.page_cache is not None and settings.PAGE_CACHE_MODE == 'replay'
+
+    def _cached_page(self, url: str, skip: int, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up a page in the page cache
+
+        In replay mode an uncached page reads as empty, which ends pagination.
+        Pages fetched before the checkpoint of an interrupted run are used
+        even if they have expired. In resume mode those are the only pages
+        read from the cache; every other page is fetched fresh.
+
+        :param url: Endpoint URL
+        :param skip: Number of records to skip
+        :param limit: Number of records to fetch
+        :return: Raw host data, or None if the page has to be fetched
+        """
+        if self.page_cache is None:
+            return None
+        resuming = skip + limit <= self.resume_skip
+        if settings.PAGE_CACHE_MODE == 'resume' and not resuming:
+            return None
+        ignore_ttl = self.replay or resuming
+        hosts = self.page_cache.get(url, skip, limit, ignore_ttl=ignore_ttl)
+        if hosts is not None:
+            self.logger.debug(f"Page cache hit for {url} skip={skip} limit={limit}")
+            return hosts
+        if self.replay:
+            self.logger.info(f"Replay: no cached page for {url} skip={skip} limit={limit}")
+            return []
+        return None
+
+    def _request_kwargs(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the keyword arguments used to send pagination params to the API
+
+        :param params: Pagination parameters
+        :return: Keyword arguments for ``requests.Session.post``
+        """
+        raise NotImplementedError
+
+    def _retry_delay(
+        self,
+        attempt: int,
+        error: Exception,
+        status: Optional[int] = None,
+        retry_after: Optional[str] = None
+    ) -> float:
+        """
+        Decide how long to wait before retrying a failed request
+
+        :param attempt: Number of the failed attempt, starting at 0
+        :param error: Error of the failed attempt
+        :param status: HTTP status of the response, None if there was none
+        :param retry_after: ``Retry-After`` header of the response
+        :return: Seconds to wait before the next attempt
+        :raises HostFetchError: If the request is not retried
+        """
+        if attempt >= self.retry_policy.max_retries or not self.retry_policy.is_retryable(status):
+            self.logger.error(f"Error fetching {self.SOURCE_SYSTEM} hosts: {error!r}")
+            raise HostFetchError(
+                f"Could not fetch {self.SOURCE_SYSTEM} hosts after {attempt + 1} attempts: {error}"
+            ) from error
+        retry_after_seconds = parse_retry_after(retry_after)
+        if not self.retry_policy.honors(retry_after_seconds):
+            self.logger.error(
+                f"Error fetching {self.SOURCE_SYSTEM} hosts: {error!r}, "
+                f"server asked to retry in {retry_after_seconds:.0f}s"
+            )
+            raise HostFetchError(
+                f"Could not fetch {self.SOURCE_SYSTEM} hosts: server asked to retry in "
+                f"{retry_after_seconds:.0f}s, more than FETCH_RETRY_AFTER_MAX: {error}"
+            ) from error
+        delay = self.retry_policy.delay(attempt, retry_after_seconds)
+        self.logger.warning(
+            f"Error fetching {self.SOURCE_SYSTEM} hosts: {error!r}, retrying in {delay:.2f}s"
+        )
+        return delay
+
+    def fetch_hosts(self, skip: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch hosts from the vendor API with pagination
+
+        :param skip: Number of records to skip
+        :param limit: Number of records to fetch (defaults to ``PAGINATION_LIMIT``)
+        :return: List of raw host data
+        :raises HostFetchError: If the page could not be fetched, even after retrying
+        """
+        limit = limit or settings.PAGINATION_LIMIT
+        url = f"{self.base_url}{self.ENDPOINT}"
+        params = {"skip": skip, "limit": limit}
+
+        cached = self._cached_page(url, skip, limit)
+        if cached is not None:
+            return cached
+
+        self.logger.info(f"Fetching hosts from URL: {url} with params: {params}")
+
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                response = self.session.post(
+                    url,
+                    timeout=settings.API_REQUEST_TIMEOUT,
+                    **self._request_kwargs(params)
+                )
+                response.raise_for_status()
+                data = response.json()
+                self.request_stats.record(time.perf_counter() - started)
+                break
+            except requests.RequestException as e:
+                self.request_stats.record(time.perf_counter() - started, ok=False)
+                if isinstance(e, requests.Timeout) and self.page_sizer is not None:
+                    self.page_sizer.record_timeout(limit)
+                if e.response is not None:
+                    self.logger.debug(f"Response content: {e.response.content}")
+                    delay = self._retry_delay(
+                        attempt, e, e.response.status_code, e.response.headers.get('Retry-After')
+                    )
+                else:
+                    delay = self._retry_delay(attempt, e)
+                time.sleep(delay)
+                attempt += 1
+
+        # Assuming the API returns a list directly
+        hosts = data if isinstance(data, list) else []
+        self.logger.debug(f"Fetched hosts: {hosts}")
+        if self.page_sizer is not None:
+            self.page_sizer.record(limit, len(hosts), time.perf_counter() - started, len(response.content))
+        if self.page_cache is not None:
+            self.page_cache.put(url, skip, limit, hosts)
+        return hosts
+
+    def parse_timestamp(self, value: str) -> datetime:
+        """
+        Parse a timestamp as formatted by the vendor
+
+        :param value: Raw timestamp
+        :return: Timezone-aware UTC timestamp
+        """
+        return self.timestamp_parser.parse(value)
+
+    def map_host(self, raw_host: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Translate raw vendor host data to Host fields using ``FIELD_MAPPING``
+
+        Missing or null values are left out so the Host defaults apply,
+        except for timestamps, which default to the current UTC time.
+
+        :param raw_host: Raw host data from the vendor
+        :return: Host keyword arguments
+        """
+        host_data: Dict[str, Any] = {'source_system': self.SOURCE_SYSTEM}
+        for host_field, raw_keys in self.FIELD_MAPPING.items():
+            values = [raw_host[key] for key in raw_keys if raw_host.get(key) is not None]
+            if host_field in self.LIST_FIELDS:
+                host_data[host_field] = [
+                    item for value in values
+                    for item in (value if isinstance(value, list) else [value])
+                ]
+            elif host_field in self.TIMESTAMP_FIELDS:
+                host_data[host_field] = self.parse_timestamp(values[0]) if values else utc_now()
+            elif values:
+                host_data[host_field] = values[0]
+
+        if 'source_id' in host_data:
+            host_data['source_id'] = str(host_data['source_id'])
+        if self.raw_store is not None and 'source_id' in host_data:
+            host_data['raw_data'] = self.raw_store.offload(self.SOURCE_SYSTEM, host_data['source_id'], raw_host)
+        else:
+            host_data['raw_data'] = raw_host
+        return host_data
+
+    def _map_page(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Map a page of raw hosts, dropping records that fail to map
+
+        :param batch: Page of raw host data
+        :return: Host keyword arguments of every valid record
+        """
+        records = []
+        for raw_host in batch:
+            try:
+                records.append(self.map_host(raw_host))
+            except Exception as e:
+                self.logger.warning(f"Could not normalize {self.SOURCE_SYSTEM} host: {e}")
+        return records
+
+    def normalize_host(self, raw_host: Dict[str, Any]) -> Optional[Host]:
+        """
+        Convert raw vendor host data to unified Host model
+
+        :param raw_host: Raw host data from the vendor
+        :return: Normalized Host object, or None if the record is invalid
+        """
+        hosts = self.normalize_page([raw_host])
+        return hosts[0] if hosts else None
+
+    def iter_pages(
+        self,
+        page_size: int,
+        max_hosts: Optional[int] = None,
+        concurrency: int = 1
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield raw host pages in order until the first empty page
+
+        With ``concurrency`` above one, up to that many pages are requested
+        at once from a bounded thread pool; pages are still yielded in
+        order and nothing after the first empty page is returned.
+
+        Unless ``ADAPTIVE_PAGE_SIZE`` is off, ``page_size`` is only the
+        size of the first pages: later pages grow or shrink with the
+        latency and payload size of the responses, up to ``MAX_PAGE_SIZE``.
+        Cached pages are keyed by their size, so sizes stay fixed while
+        the page cache is in use.
+
+        With the page cache on or in resume mode, a checkpoint records how
+        far pagination got until the last page was read. A run resuming after an
+        interruption reads the pages before the checkpoint from the cache
+        and only requests the rest from the vendor.
+
+        :param page_size: Number of records requested per page
+        :param max_hosts: Maximum number of hosts to return (None for all)
+        :param concurrency: Maximum number of pages in flight
+        :return: Iterator over lists of raw host data
+        """
+        self._start_pagination(page_size)
+        if concurrency <= 1:
+            pages = self._iter_pages_sequential(page_size, max_hosts)
+        else:
+            pages = self._iter_pages_concurrent(page_size, max_hosts, concurrency)
+        for skip, batch in pages:
+            self._save_checkpoint(skip + len(batch))
+            yield batch
+        self._finish_pagination()
+
+    def _start_pagination(self, page_size: int) -> None:
+        """
+        Set up page sizing and pick up the checkpoint of an interrupted run
+
+        :param page_size: Page size of the first requests
+        """
+        self.page_sizer = None
+        if settings.ADAPTIVE_PAGE_SIZE and self.page_cache is None:
+            self.page_sizer = PageSizeController(page_size, self.MAX_PAGE_SIZE)
+        self.resume_skip = self.checkpoints.get(self.SOURCE_SYSTEM) if self.checkpoints else 0
+        if self.resume_skip:
+            self.logger.info(
+                f"Resuming {self.SOURCE_SYSTEM} pagination: the first {self.resume_skip} "
+                f"hosts are read from the page cache"
+            )
+
+    def _next_page_size(self, page_size: int, skip: int, max_hosts: Optional[int]) -> int:
+        """
+        Size of the next page to request
+
+        :param page_size: Fixed page size, used when sizing is not adaptive
+        :param skip: Number of records requested so far
+        :param max_hosts: Maximum number of hosts to return (None for all)
+        :return: Number of records to request
+        """
+        if self.page_sizer is not None:
+            page_size = self.page_sizer.next_page_size()
+        return page_size if max_hosts is None else min(page_size, max_hosts - skip)
+
+    def _save_checkpoint(self, skip: int) -> None:
+        """
+        Record that every record before ``skip`` was fetched
+
+        :param skip: Number of records fetched so far
+        """
+        if self.checkpoints is not None and skip > self.resume_skip:
+            self.checkpoints.save(self.SOURCE_SYSTEM, skip)
+
+    def _finish_pagination(self) -> None:
+        """
+        Report the page sizes and drop the checkpoint once the last page was read
+        """
+        if self.page_sizer is not None:
+            sizes = ', '.join(f"{count} x {size}" for size, count in self.page_sizer.summary().items())
+            self.logger.info(f"{self.SOURCE_SYSTEM} pages requested by size: {sizes}")
+        if self.checkpoints is not None:
+            self.checkpoints.clear(self.SOURCE_SYSTEM)
+        self.resume_skip = 0
+
+    def _iter_pages_sequential(
+        self,
+        page_size: int,
+        max_hosts: Optional[int]
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Yield raw host pages one request at a time
+
+        :param page_size: Number of records requested per page
+        :param max_hosts: Maximum number of hosts to return (None for all)
+        :return: Iterator over the skip and raw host data of every page
+        """
+        skip = 0
+
+        while max_hosts is None or skip < max_hosts:
+            limit = self._next_page_size(page_size, skip, max_hosts)
+            batch = self.fetch_hosts(skip=skip, limit=limit)
+            if not batch:
+                break
+
+            batch = batch[:limit]
+            yield skip, batch
+            skip += len(batch)
+
+    def _iter_pages_concurrent(
+        self,
+        page_size: int,
+        max_hosts: Optional[int],
+        concurrency: int
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Yield raw host pages in order while keeping several requests in flight
+
+        Offsets are scheduled ahead by the requested page sizes. When a
+        page comes back short, the rest of its range is requested before
+        the following pages are yielded, so a server returning fewer
+        records than asked for does not leave gaps.
+
+        :param page_size: Number of records requested per page
+        :param max_hosts: Maximum number of hosts to return (None for all)
+        :param concurrency: Maximum number of pages in flight
+        :return: Iterator over the skip and raw host data of every page
+        """
+        in_flight: Deque[Tuple[Future, int, int]] = deque()
+        next_skip = 0
+
+        with ThreadPoolExecutor(
+            max_workers=concurrency,
+            thread_name_prefix=self.__class__.__name__
+        ) as executor:
+            try:
+                while True:
+                    while len(in_flight) < concurrency and (max_hosts is None or next_skip < max_hosts):
+                        limit = self._next_page_size(page_size, next_skip, max_hosts)
+                        future = executor.submit(self.fetch_hosts, skip=next_skip, limit=limit)
+                        in_flight.append((future, next_skip, limit))
+                        next_skip += limit
+
+                    if not in_flight:
+                        break
+
+                    future, skip, limit = in_flight.popleft()
+                    batch = future.result()[:limit]
+                    while batch:
+                        yield skip, batch
+                        if len(batch) == limit:
+                            break
+                        # A short page is either the last one or cut by the
+                        # server, so request the rest of its range before
+                        # moving on; an empty answer ends pagination
+                        skip, limit = skip + len(batch), limit - len(batch)
+                        batch = self.fetch_hosts(skip=skip, limit=limit)[:limit]
+                    if not batch:
+                        break
+            finally:
+                # Drop pages queued past the end of the data
+                for future, _, _ in in_flight:
+                    future.cancel()
+
+    def normalize_page(self, batch: List[Dict[str, Any]]) -> List[Host]:
+        """
+        Normalize a page of raw hosts in a single pass, dropping records that
+        fail to normalize
+
+        Vendor keys are mapped to Host fields, the hostname, IP and MAC
+        columns of the page are normalized together and each Host is built
+        exactly once.
+
+        :param batch: Page of raw host data
+        :return: List of normalized hosts
+        """
+        return HostNormalizer.normalize_batch(self._map_page(batch)).to_hosts()
+
+    def iter_normalized_hosts(
+        self,
+        page_size: int,
+        max_hosts: Optional[int] = None,
+        concurrency: int = 1
+    ) -> Iterator[Host]:
+        """
+        Lazily fetch and normalize hosts one page at a time
+
+        :param page_size: Number of records requested per page
+        :param max_hosts: Maximum number of hosts to return (None for all)
+        :param concurrency: Maximum number of pages in flight
+        :return: Iterator over normalized hosts
+        """
+        for batch in self.iter_pages(page_size, max_hosts=max_hosts, concurrency=concurrency):
+            yield from self.normalize_page(batch)
+
+    def get_normalized_hosts(
+        self,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+        concurrency: int = 1
+    ) -> List[Host]:
+        """
+        Get normalized hosts from the vendor
+
+        :param limit: Number of hosts to fetch (None fetches until the first empty page)
+        :param page_size: Number of hosts of the first requests (defaults to ``PAGINATION_LIMIT``)
+        :param concurrency: Maximum number of pages in flight
+        :return: List of normalized hosts
+        """
+        page_size = page_size or settings.PAGINATION_LIMIT
+        return list(self.iter_normalized_hosts(page_size, max_hosts=limit, concurrency=concurrency))
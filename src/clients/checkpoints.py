@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+from src.config.settings import settings
+
+
+class PaginationCheckpoints:
+    """
+    Last fetched ``skip`` of every source, persisted to a JSON file
+
+    A checkpoint exists only while a source is being paginated: it is
+    advanced after every page and removed once the last page was read,
+    so a checkpoint found at startup means the previous run stopped
+    early.
+    """
+    def __init__(self, path: str):
+        """
+        :param path: JSON file holding the checkpoints
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path) as checkpoints:
+                return json.load(checkpoints)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable checkpoints {self.path}: {e}")
+            return {}
+
+    def _write(self, checkpoints: Dict[str, Any]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w') as temporary:
+            json.dump(checkpoints, temporary)
+        os.replace(temporary_path, self.path)
+
+    def get(self, source_system: str) -> int:
+        """
+        Look up the checkpoint of a source
+
+        :param source_system: Vendor name
+        :return: Number of records fetched by the interrupted run, 0 if none
+        """
+        with self._lock:
+            checkpoint = self._read().get(source_system)
+        return checkpoint['skip'] if checkpoint else 0
+
+    def save(self, source_system: str, skip: int) -> None:
+        """
+        Record how far pagination of a source got
+
+        :param source_system: Vendor name
+        :param skip: Number of records fetched so far
+        """
+        with self._lock:
+            checkpoints = self._read()
+            checkpoints[source_system] = {'skip': skip, 'updated_at': time.time()}
+            self._write(checkpoints)
+
+    def clear(self, source_system: str) -> None:
+        """
+        Remove the checkpoint of a source once pagination completed
+
+        :param source_system: Vendor name
+        """
+        with self._lock:
+            checkpoints = self._read()
+            if checkpoints.pop(source_system, None) is not None:
+                self._write(checkpoints)
+
+
+_default_checkpoints: Optional[PaginationCheckpoints] = None
+
+
+def default_checkpoints() -> PaginationCheckpoints:
+    """
+    Checkpoints shared by every client of the process
+
+    :return: Pagination checkpoints stored at ``CHECKPOINT_PATH``
+    """
+    global _default_checkpoints
+    if _default_checkpoints is None:
+        _default_checkpoints = PaginationCheckpoints(settings.CHECKPOINT_PATH)
+    return _default_checkpoints
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from src.config.settings import settings
+
+CACHE_MODES = ('off', 'on', 'resume', 'replay')
+
+
+class PageCache:
+    """
+    On-disk cache of raw vendor API pages
+
+    Pages are stored as one JSON file each, keyed by URL, skip and limit.
+    Entries expire after ``ttl`` seconds, and once the cache grows beyond
+    ``max_bytes`` the least recently used pages are evicted. Safe to share
+    between the threads of the concurrent page fetcher.
+    """
+    def __init__(self, directory: str, ttl: float, max_bytes: int):
+        """
+        :param directory: Directory holding the cached pages
+        :param ttl: Seconds a page stays fresh
+        :param max_bytes: Maximum total size of the cached pages
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Tuple[int, float]]] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @staticmethod
+    def key(url: str, skip: int, limit: int) -> str:
+        """
+        Build the cache key of a page
+
+        :param url: Endpoint URL
+        :param skip: Number of records skipped
+        :param limit: Number of records requested
+        :return: Cache key
+        """
+        return hashlib.sha1(f"{url}?skip={skip}&limit={limit}".encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_entries(self) -> Dict[str, Tuple[int, float]]:
+        """
+        Size and last use of every cached page, read from disk once
+
+        :return: Entries by cache key
+        """
+        if self._entries is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._entries = {}
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    self._entries[entry.name[:-len('.json')]] = (stat.st_size, stat.st_mtime)
+            # The limit may have been lowered since the pages were written
+            self._evict()
+        return self._entries
+
+    def get(self, url: str, skip: int, limit: int, ignore_ttl: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up a cached page
+
+        :param url: Endpoint URL
+        :param skip: Number of records skipped
+        :param limit: Number of records requested
+        :param ignore_ttl: Return the page even if it has expired
+        :return: Raw host data, or None if the page is not cached
+        """
+        key = self.key(url, skip, limit)
+        path = self._path(key)
+        with self._lock:
+            entries = self._load_entries()
+            if key not in entries:
+                return None
+            try:
+                with open(path) as cached:
+                    page = json.load(cached)
+            except (OSError, ValueError):
+                self.logger.warning(f"Dropping unreadable cached page {path}")
+                self._remove(key)
+                return None
+
+            if not ignore_ttl and time.time() - page['fetched_at'] > self.ttl:
+                self._remove(key)
+                return None
+
+            # The modification time records the last use, for LRU eviction
+            now = time.time()
+            os.utime(path, (now, now))
+            entries[key] = (entries[key][0], now)
+        return page['hosts']
+
+    def put(self, url: str, skip: int, limit: int, hosts: List[Dict[str, Any]]) -> None:
+        """
+        Store a page, evicting least recently used pages beyond ``max_bytes``
+
+        :param url: Endpoint URL
+        :param skip: Number of records skipped
+        :param limit: Number of records requested
+        :param hosts: Raw host data of the page
+        """
+        key = self.key(url, skip, limit)
+        path = self._path(key)
+        payload = json.dumps({'fetched_at': time.time(), 'hosts': hosts})
+        with self._lock:
+            entries = self._load_entries()
+            temporary_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary_path, 'w') as cached:
+                cached.write(payload)
+            os.replace(temporary_path, path)
+            entries[key] = (os.path.getsize(path), time.time())
+            self._evict()
+
+    def _remove(self, key: str) -> None:
+        """
+        Delete a cached page
+
+        :param key: Cache key of the page
+        """
+        self._entries.pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        """
+        Delete least recently used pages until the cache fits ``max_bytes``
+        """
+        total = sum(size for size, _ in self._entries.values())
+        if total <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+            self.logger.debug(f"Evicted cached page {key}")
+
+    def clear(self) -> None:
+        """
+        Delete every cached page
+        """
+        with self._lock:
+            for key in list(self._load_entries()):
+                self._remove(key)
+
+
+_default_cache: Optional[PageCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def default_page_cache() -> Optional[PageCache]:
+    """
+    Page cache shared by every client of the process, configured from settings
+
+    :return: Page cache, or None if ``PAGE_CACHE_MODE`` is off
+    """
+    global _default_cache
+    if settings.PAGE_CACHE_MODE not in CACHE_MODES:
+        raise ValueError(
+            f"Unknown PAGE_CACHE_MODE {settings.PAGE_CACHE_MODE!r}, expected one of {CACHE_MODES}"
+        )
+    if settings.PAGE_CACHE_MODE == 'off':
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PageCache(
+                settings.PAGE_CACHE_DIR,
+                settings.PAGE_CACHE_TTL,
+                settings.PAGE_CACHE_MAX_BYTES
+            )
+        return _default_cache
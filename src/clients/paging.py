@@ -0,0 +1,100 @@
+import threading
+from collections import Counter
+from typing import Dict, Optional
+from src.config.settings import settings
+
+
+class PageSizeController:
+    """
+    Adapts the page size of a pagination to the observed responses
+
+    The size doubles after a full page that came back well within the
+    latency and payload targets, halves after a page exceeding either
+    target and drops to a quarter after a timeout. It always stays
+    between ``minimum`` and the vendor ``maximum``. Safe to share between
+    the threads of the concurrent page fetcher.
+    """
+    # Fraction of the targets a page must stay under for the size to grow
+    GROWTH_HEADROOM = 0.5
+
+    def __init__(
+        self,
+        initial: int,
+        maximum: int,
+        minimum: int = 1,
+        target_latency: Optional[float] = None,
+        max_payload_bytes: Optional[int] = None
+    ):
+        """
+        :param initial: Page size of the first requests
+        :param maximum: Largest page size the vendor accepts
+        :param minimum: Smallest page size
+        :param target_latency: Seconds a page should take at most
+        :param max_payload_bytes: Bytes a page should weigh at most
+        """
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.target_latency = settings.PAGE_SIZE_TARGET_LATENCY if target_latency is None else target_latency
+        self.max_payload_bytes = settings.PAGE_SIZE_MAX_BYTES if max_payload_bytes is None else max_payload_bytes
+        self._page_size = self._clamp(initial)
+        self._lock = threading.Lock()
+        # Pages requested at every size
+        self.sizes: Counter = Counter()
+
+    def _clamp(self, page_size: int) -> int:
+        return min(max(page_size, self.minimum), self.maximum)
+
+    @property
+    def page_size(self) -> int:
+        """
+        Page size of the next request
+        """
+        return self._page_size
+
+    def next_page_size(self) -> int:
+        """
+        Pick the size of the next request and count it
+
+        :return: Page size
+        """
+        with self._lock:
+            self.sizes[self._page_size] += 1
+            return self._page_size
+
+    def record(self, limit: int, records: int, latency: float, payload_bytes: int) -> None:
+        """
+        Adapt the page size to a fetched page
+
+        :param limit: Number of records requested
+        :param records: Number of records returned
+        :param latency: Seconds the request took
+        :param payload_bytes: Size of the response body
+        """
+        with self._lock:
+            if latency > self.target_latency or payload_bytes > self.max_payload_bytes:
+                self._page_size = self._clamp(min(self._page_size, limit // 2))
+            elif (
+                records >= limit
+                and latency <= self.target_latency * self.GROWTH_HEADROOM
+                and payload_bytes <= self.max_payload_bytes * self.GROWTH_HEADROOM
+            ):
+                # Only grow from the size that was measured, not past it
+                self._page_size = self._clamp(max(self._page_size, limit * 2))
+
+    def record_timeout(self, limit: int) -> None:
+        """
+        Shrink the page size after a request timed out
+
+        :param limit: Number of records requested
+        """
+        with self._lock:
+            self._page_size = self._clamp(min(self._page_size, limit // 4))
+
+    def summary(self) -> Dict[int, int]:
+        """
+        Number of pages requested at every size
+
+        :return: Page count by page size, smallest size first
+        """
+        with self._lock:
+            return dict(sorted(self.sizes.items()))
@@ -0,0 +1,69 @@
+import threading
+import time
+from typing import Dict, Optional
+from src.config.settings import settings
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket limiting the rate of API requests
+
+    ``reserve`` takes a token right away, going into debt if the bucket
+    is empty, and returns how long the caller has to wait before using
+    it. That keeps the bucket usable from both threads and coroutines.
+    """
+    def __init__(self, rate: float, capacity: float):
+        """
+        :param rate: Tokens added per second
+        :param capacity: Maximum number of tokens, i.e. the allowed burst
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token
+
+        :return: Seconds to wait before the token may be used
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """
+        Take a token, sleeping until it may be used
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def rate_limiter_for(source_system: str) -> Optional[TokenBucket]:
+    """
+    Token bucket shared by every client of a vendor in this process
+
+    :param source_system: Vendor name
+    :return: Token bucket, or None if ``VENDOR_RATE_LIMIT`` is 0
+    """
+    if settings.VENDOR_RATE_LIMIT <= 0:
+        return None
+    with _buckets_lock:
+        if source_system not in _buckets:
+            _buckets[source_system] = TokenBucket(
+                settings.VENDOR_RATE_LIMIT,
+                settings.VENDOR_RATE_BURST
+            )
+        return _buckets[source_system]
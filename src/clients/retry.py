@@ -0,0 +1,91 @@
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from src.config.settings import settings
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class HostFetchError(Exception):
+    """
+    A page of hosts could not be fetched, even after retrying
+    """
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a ``Retry-After`` header, given in seconds or as an HTTP date
+
+    :param value: Header value
+    :return: Seconds to wait, or None if absent or invalid
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, honoring ``Retry-After`` up to
+    its own, larger cap
+    """
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+        backoff_max: Optional[float] = None,
+        retry_after_max: Optional[float] = None
+    ):
+        """
+        :param max_retries: Number of retries after the first attempt
+        :param backoff_base: Backoff ceiling of the first retry, in seconds
+        :param backoff_max: Largest backoff, in seconds
+        :param retry_after_max: Largest ``Retry-After`` honored, in seconds
+        """
+        self.max_retries = settings.FETCH_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = settings.FETCH_BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = settings.FETCH_BACKOFF_MAX if backoff_max is None else backoff_max
+        self.retry_after_max = settings.FETCH_RETRY_AFTER_MAX if retry_after_max is None else retry_after_max
+
+    @staticmethod
+    def is_retryable(status: Optional[int]) -> bool:
+        """
+        Check whether a failed request is worth retrying
+
+        :param status: HTTP status, or None for connection errors and timeouts
+        :return: True if the request may succeed when retried
+        """
+        return status is None or status in RETRYABLE_STATUSES
+
+    def honors(self, retry_after: Optional[float]) -> bool:
+        """
+        Check whether the delay requested by the server is short enough to wait for
+
+        :param retry_after: Delay requested by the server, None if there was none
+        :return: True if the request may be retried after the delay
+        """
+        return retry_after is None or retry_after <= self.retry_after_max
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Seconds to wait before a retry
+
+        :param attempt: Number of the retry, starting at 0
+        :param retry_after: Delay requested by the server
+        :return: Delay in seconds
+        """
+        if retry_after is not None:
+            return min(retry_after, self.retry_after_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
@@ -15,6 +15,83 @@ class Settings:
     DATABASE_NAME = os.environ.get("DATABASE_NAME")
     API_REQUEST_TIMEOUT= int(os.environ.get("API_REQUEST_TIMEOUT"))
     PAGINATION_LIMIT= int(os.environ.get("PAGINATION_LIMIT"))
+    # Grow or shrink the page size with the observed latency and payload size
+    ADAPTIVE_PAGE_SIZE = os.environ.get("ADAPTIVE_PAGE_SIZE", "true").lower() in ("1", "true", "yes")
+    # Seconds an adaptively sized page should take, well below the request timeout
+    PAGE_SIZE_TARGET_LATENCY = float(os.environ.get("PAGE_SIZE_TARGET_LATENCY", API_REQUEST_TIMEOUT / 4))
+    # Response size an adaptively sized page should stay under
+    PAGE_SIZE_MAX_BYTES = int(os.environ.get("PAGE_SIZE_MAX_BYTES", 8 * 1024 * 1024))
+    # Maximum number of pages in flight per vendor
+    FETCH_CONCURRENCY = int(os.environ.get("FETCH_CONCURRENCY", 4))
+    # Number of pages buffered ahead of normalization per vendor
+    PREFETCH_PAGES = int(os.environ.get("PREFETCH_PAGES", 8))
+    # Size of the connection pool shared by the async clients
+    HTTP_CONNECTION_LIMIT = int(os.environ.get("HTTP_CONNECTION_LIMIT", 16))
+    # Number of hosts written to MongoDB per storage batch
+    STORAGE_BATCH_SIZE = int(os.environ.get("STORAGE_BATCH_SIZE", 500))
+    # Number of times failed operations of a storage batch are retried
+    STORAGE_MAX_RETRIES = int(os.environ.get("STORAGE_MAX_RETRIES", 3))
+    # Backoff ceiling of the first storage retry in seconds, doubled on every retry
+    STORAGE_BACKOFF_BASE = float(os.environ.get("STORAGE_BACKOFF_BASE", 0.1))
+    # Longest backoff between storage retries in seconds
+    STORAGE_BACKOFF_MAX = float(os.environ.get("STORAGE_BACKOFF_MAX", 5))
+    # Hostname similarity backend of deduplication: sequence, shingle or minhash
+    HOSTNAME_SIMILARITY = os.environ.get("HOSTNAME_SIMILARITY", "sequence")
+    # Entries kept per normalization cache (hostnames, IPs, MACs); 0 disables them
+    NORMALIZATION_CACHE_SIZE = int(os.environ.get("NORMALIZATION_CACHE_SIZE", 64 * 1024))
+    # Entries kept per hostname similarity cache (scored pairs, shingles,
+    # signatures); 0 disables them
+    SIMILARITY_CACHE_SIZE = int(os.environ.get("SIMILARITY_CACHE_SIZE", 64 * 1024))
+    # Number of processes scoring deduplication shards (1 disables sharding)
+    DEDUP_WORKERS = int(os.environ.get("DEDUP_WORKERS", 1))
+    # Number of times a failed vendor request is retried before the run fails
+    FETCH_MAX_RETRIES = int(os.environ.get("FETCH_MAX_RETRIES", 5))
+    # Backoff ceiling of the first retry in seconds, doubled on every retry
+    FETCH_BACKOFF_BASE = float(os.environ.get("FETCH_BACKOFF_BASE", 0.5))
+    # Longest backoff between retries in seconds
+    FETCH_BACKOFF_MAX = float(os.environ.get("FETCH_BACKOFF_MAX", 60))
+    # Longest Retry-After honored in seconds; a server asking for longer fails the run
+    FETCH_RETRY_AFTER_MAX = float(os.environ.get("FETCH_RETRY_AFTER_MAX", 900))
+    # Vendor requests per second allowed per vendor (0 disables rate limiting)
+    VENDOR_RATE_LIMIT = float(os.environ.get("VENDOR_RATE_LIMIT", 0))
+    # Number of vendor requests allowed in a burst above the rate limit
+    VENDOR_RATE_BURST = int(os.environ.get("VENDOR_RATE_BURST", 5))
+    # Vendor page cache: off, on (read-through), resume (write-through, read back
+    # only to resume an interrupted pagination) or replay (cached pages only, no network)
+    PAGE_CACHE_MODE = os.environ.get("PAGE_CACHE_MODE", "off")
+    # Directory holding the cached pages
+    PAGE_CACHE_DIR = os.environ.get("PAGE_CACHE_DIR", ".cache/pages")
+    # Seconds a cached page stays fresh (ignored in replay mode)
+    PAGE_CACHE_TTL = int(os.environ.get("PAGE_CACHE_TTL", 24 * 60 * 60))
+    # Maximum size of the page cache before least recently used pages are evicted
+    PAGE_CACHE_MAX_BYTES = int(os.environ.get("PAGE_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+    # File receiving the JSON summary of every run (only logged if unset)
+    METRICS_SUMMARY_PATH = os.environ.get("METRICS_SUMMARY_PATH")
+    # File receiving the metrics of every run in Prometheus text format, e.g. for
+    # the node exporter textfile collector
+    METRICS_PROMETHEUS_PATH = os.environ.get("METRICS_PROMETHEUS_PATH")
+    # Directory receiving a columnar snapshot of the deduplicated hosts (unset disables export)
+    EXPORT_PATH = os.environ.get("EXPORT_PATH")
+    # Snapshot file format: parquet or arrow (uncompressed, for zero-copy memory-mapped reads)
+    EXPORT_FORMAT = os.environ.get("EXPORT_FORMAT", "parquet")
+    # Number of hosts per snapshot row group
+    EXPORT_ROW_GROUP_SIZE = int(os.environ.get("EXPORT_ROW_GROUP_SIZE", 64 * 1024))
+    # Snapshot compression codec (defaults to zstd for parquet and none for arrow)
+    EXPORT_COMPRESSION = os.environ.get("EXPORT_COMPRESSION")
+    # Local key-value cache of the host identity index, for a single pipeline
+    # host (unset keeps identities in MongoDB only)
+    IDENTITY_CACHE_PATH = os.environ.get("IDENTITY_CACHE_PATH")
+    # Where raw vendor payloads are kept: memory (on every host), file (compressed
+    # in a temporary file under RAW_DATA_DIR) or mongo (compressed in the
+    # host_raw_data collection); hosts only reference offloaded payloads
+    RAW_DATA_STORE = os.environ.get("RAW_DATA_STORE", "memory")
+    # Directory of the temporary raw payload file of the file store
+    RAW_DATA_DIR = os.environ.get("RAW_DATA_DIR", ".cache/raw")
+    # zlib level of offloaded raw payloads (1 fastest, 9 smallest)
+    RAW_DATA_COMPRESSION_LEVEL = int(os.environ.get("RAW_DATA_COMPRESSION_LEVEL", 6))
+    # File recording how far an interrupted pagination got, used when the page
+    # cache is on or in resume mode
+    CHECKPOINT_PATH = os.environ.get("CHECKPOINT_PATH", ".cache/checkpoints.json")
 
 # Create a singleton settings instance
 settings = Settings()
\ No newline at end of file
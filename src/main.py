@@ -1,12 +1,22 @@
+import argparse
+import asyncio
 import logging
+from typing import Iterator, List, Optional
 from pymongo import MongoClient
-from datetime import datetime
 
 from .config.settings import settings
+from .clients.base import BaseHostClient
 from .clients.qualys import QualysClient
 from .clients.crowdstrike import CrowdstrikeClient
+from .clients.aio import AsyncCrowdstrikeClient, AsyncQualysClient, create_session
 from .services.deduplication import HostDeduplicator
-from .services.normalization import HostNormalizer
+from .services.export import export_snapshot
+from .services.identity import IdentityIndex
+from .services.metrics import PipelineMetrics
+from .services.raw_store import open_raw_store
+from .services.repository import BulkWriteSummary, HostRepository
+from .services.streaming import chunked, prefetch
+from .services.sync_state import SyncState
 from .models.host import Host 
 
 def setup_logging():
@@ -32,66 +42,350 @@ def connect_to_mongodb():
         logging.error(f"Failed to connect to MongoDB: {e}")
         raise
 
-def fetch_and_process_hosts():
+def open_identity_index(db, repository: HostRepository) -> IdentityIndex:
+    """
+    Open the host identity index, seeding a new one from the stored hosts
+    so they keep their ids
+    
+    :param db: MongoDB database
+    :param repository: Repository of the stored hosts
+    :return: Identity index
+    """
+    identity_index = IdentityIndex(db['host_identities'])
+    if identity_index.is_empty():
+        identity_index.record(repository.iter_hosts())
+    return identity_index
+
+def retire_merged_hosts(repository: HostRepository, identity_index: IdentityIndex, hosts: List[Host]) -> int:
+    """
+    Delete the stored documents of hosts merged into another host, and
+    alias their ids to the surviving host
+    
+    :param repository: Repository of the stored hosts
+    :param identity_index: Index resolving the retired ids to the survivors
+    :param hosts: Deduplicated hosts, already stored
+    :return: Number of documents deleted
+    """
+    surviving_ids = {host.id for host in hosts}
+    aliases = {
+        merged_id: host.id
+        for host in hosts for merged_id in host.merged_ids
+        if merged_id not in surviving_ids
+    }
+    retired = repository.delete_hosts(aliases)
+    identity_index.retire({merged_id: aliases[merged_id] for merged_id in retired})
+    return len(retired)
+
+def finish_sync(
+    repository: HostRepository,
+    identity_index: IdentityIndex,
+    sync_state: SyncState,
+    hosts: List[Host],
+    summaries: List[BulkWriteSummary]
+) -> bool:
+    """
+    Record the identities of the stored hosts, then retire merged-away
+    documents and advance the sync watermarks if every host was stored
+    
+    Failed hosts would fall behind the watermarks and be skipped by every
+    later incremental run, so after a storage failure the watermarks stay
+    where they were and the next run fetches the same hosts again.
+    
+    :param repository: Repository of the stored hosts
+    :param identity_index: Index of the host identities
+    :param sync_state: Watermarks of the run
+    :param hosts: Deduplicated hosts
+    :param summaries: Outcome of every storage batch
+    :return: True if the watermarks were committed
+    """
+    logger = logging.getLogger(__name__)
+    identity_index.record(hosts)
+    failed = sum(summary.failed for summary in summaries)
+    if failed:
+        logger.error(f"{failed} hosts could not be stored, keeping the previous sync watermarks")
+        return False
+    retire_merged_hosts(repository, identity_index, hosts)
+    sync_state.commit()
+    return True
+
+def iter_hosts(
+    *clients: BaseHostClient,
+    sync_state: Optional[SyncState] = None,
+    identity_index: Optional[IdentityIndex] = None,
+    metrics: Optional[PipelineMetrics] = None
+) -> Iterator[Host]:
+    """
+    Lazily fetch and normalize hosts from every client, one page at a time
+    
+    Every client starts fetching immediately into a bounded prefetch
+    buffer; hosts are yielded client by client, in page order.
+    
+    :param clients: Vendor clients to read from
+    :param sync_state: Watermarks used to skip hosts not seen since the last sync
+    :param identity_index: Index giving hosts of known machines their canonical id
+    :param metrics: Run metrics receiving the fetch, normalize, filter and resolve stages
+    :return: Iterator over normalized hosts
+    """
+    metrics = metrics or PipelineMetrics()
+    logger = logging.getLogger(__name__)
+    page_streams = [
+        prefetch(
+            client.iter_pages(settings.PAGINATION_LIMIT, concurrency=settings.FETCH_CONCURRENCY),
+            settings.PREFETCH_PAGES
+        )
+        for client in clients
+    ]
+    
+    try:
+        for client, pages in zip(clients, page_streams):
+            host_count = 0
+            unchanged_count = 0
+            for page in metrics.timed('fetch', pages):
+                with metrics.stage('normalize') as stage:
+                    hosts = client.normalize_page(page)
+                    stage.count(len(page), len(hosts))
+                host_count += len(hosts)
+                if sync_state is not None:
+                    with metrics.stage('filter') as stage:
+                        new_hosts = [host for host in hosts if sync_state.is_new(client.SOURCE_SYSTEM, host)]
+                        stage.count(len(hosts), len(new_hosts))
+                    unchanged_count += len(hosts) - len(new_hosts)
+                    hosts = new_hosts
+                if identity_index is not None:
+                    with metrics.stage('resolve') as stage:
+                        stage.count(len(hosts), identity_index.resolve(hosts))
+                yield from hosts
+            logger.info(
+                f"Fetched {host_count} hosts from {client.SOURCE_SYSTEM}, "
+                f"{unchanged_count} not seen since the last sync"
+            )
+    finally:
+        for pages in page_streams:
+            pages.close()
+
+def with_stored_matches(
+    repository: HostRepository,
+    hosts: Iterator[Host],
+    metrics: Optional[PipelineMetrics] = None
+) -> Iterator[Host]:
+    """
+    Put the stored hosts that new arrivals may duplicate in front of them,
+    looking them up one storage batch of arrivals at a time so the stream
+    is never materialized
+    
+    :param repository: Repository of the stored hosts
+    :param hosts: Newly arrived hosts
+    :param metrics: Run metrics receiving the lookup stage
+    :return: Iterator over stored matches and new arrivals
+    """
+    metrics = metrics or PipelineMetrics()
+    yielded_ids = set()
+    for batch in chunked(hosts, repository.batch_size):
+        with metrics.stage('lookup') as stage:
+            stored_hosts = [
+                host for host in repository.find_matching_hosts(batch)
+                if host.id not in yielded_ids
+            ]
+            yielded_ids.update(host.id for host in stored_hosts)
+            stage.count(len(batch), len(stored_hosts))
+        yield from stored_hosts
+        yield from batch
+
+def fetch_and_process_hosts(full_resync: bool = False):
     """
     Main data pipeline: fetch, normalize, and deduplicate hosts
     
+    By default only hosts seen since the last sync are processed: they are
+    deduplicated together with the stored hosts they may match, and
+    unchanged documents are not rewritten.
+    
+    :param full_resync: Process and rewrite the whole inventory
     :return: List of deduplicated Host objects
     """
     # Setup logging
     setup_logging()
     logger = logging.getLogger(__name__)
+    metrics = PipelineMetrics()
+    clients = []
+    identity_index = None
+    raw_store = None
     
     try:
-        # Initialize clients
+        # Connect to MongoDB and make sure the hosts collection is indexed
+        db = connect_to_mongodb()
+        repository = HostRepository(db['hosts'])
+        repository.ensure_indexes()
+        sync_state = SyncState(db['sync_state'], full_resync=full_resync)
+        identity_index = open_identity_index(db, repository)
+        
+        # Initialize clients, offloading raw payloads if configured
         qualys_client = QualysClient()
         crowdstrike_client = CrowdstrikeClient()
+        clients = [qualys_client, crowdstrike_client]
+        raw_store = open_raw_store(db)
+        for client in clients:
+            client.raw_store = raw_store
         
-        # Fetch hosts from both sources
-        logger.info("Fetching hosts from Qualys")
-        qualys_hosts = qualys_client.get_normalized_hosts()
-        logger.info(f"Fetched {len(qualys_hosts)} hosts from Qualys")
+        # Stream hosts from both sources; each vendor is prefetched on its own
+        # thread into a bounded page buffer, so both are fetched at the same
+        # time without materializing the inventory
+        logger.info("Fetching hosts from Qualys and Crowdstrike")
+        host_stream = iter_hosts(
+            qualys_client, crowdstrike_client,
+            sync_state=sync_state, identity_index=identity_index, metrics=metrics
+        )
         
-        logger.info("Fetching hosts from Crowdstrike")
-        crowdstrike_hosts = crowdstrike_client.get_normalized_hosts()
-        logger.info(f"Fetched {len(crowdstrike_hosts)} hosts from Crowdstrike")
+        if not full_resync:
+            # Stored duplicates of the new arrivals go ahead of them, so
+            # merges keep updating the existing documents
+            host_stream = with_stored_matches(repository, host_stream, metrics)
         
-        # Combine hosts from both sources
-        all_hosts = qualys_hosts + crowdstrike_hosts
+        # Deduplicate hosts, merging those resolved to the same machine
+        # first; fetching and normalization run lazily inside this stage
+        # and are timed as their own stages
+        deduplicator = HostDeduplicator()
+        with metrics.stage('deduplicate') as stage:
+            deduplicated_hosts = deduplicator.deduplicate_hosts(host_stream)
+            stage.count(deduplicator.stats.hosts_in, len(deduplicated_hosts))
         
+        # Store hosts in MongoDB in bounded bulk batches
+        with metrics.stage('store') as stage:
+            summaries = repository.upsert_hosts(deduplicated_hosts, skip_unchanged=not full_resync)
+            stage.count(len(deduplicated_hosts), sum(s.matched + s.upserted for s in summaries))
+        finish_sync(repository, identity_index, sync_state, deduplicated_hosts, summaries)
         
-        # Normalize hosts (if not done within the client already)
-        normalized_hosts = []
-        for host in all_hosts:
-            logger.debug(f"Normalizing host: {host}")
-            normalized_host_data = HostNormalizer.normalize_host_data(host.raw_data)
-            # Filter out unwanted keys
-            allowed_keys = {field.name for field in Host.__dataclass_fields__.values()}
-            filtered_data = {k: v for k, v in normalized_host_data.items() if k in allowed_keys}
-            normalized_hosts.append(Host(**filtered_data))
+        # Snapshot the inventory for columnar analytics; incremental runs
+        # only hold the new arrivals, so the stored inventory is streamed
+        if settings.EXPORT_PATH:
+            with metrics.stage('export') as stage:
+                exported = export_snapshot(deduplicated_hosts if full_resync else repository.iter_hosts())
+                stage.count(exported, exported)
+        
+        logger.info(f"Processed {len(deduplicated_hosts)} unique hosts")
+        return deduplicated_hosts
+    
+    except Exception as e:
+        logger.error(f"Error in host processing pipeline: {e}")
+        logger.exception(e)
+        return []
+    
+    finally:
+        if identity_index is not None:
+            identity_index.close()
+        if raw_store is not None:
+            raw_store.flush()
+        for client in clients:
+            metrics.record_client(client)
+        metrics.report(settings.METRICS_SUMMARY_PATH, settings.METRICS_PROMETHEUS_PATH)
+
+async def _fetch_normalized_hosts_async(
+    client,
+    identity_index: IdentityIndex,
+    sync_state: Optional[SyncState] = None
+) -> List[Host]:
+    """
+    Fetch every page of a vendor, normalizing and resolving each page as
+    it arrives while the following pages are still in flight
+    
+    :param client: Async vendor client
+    :param identity_index: Index giving hosts of known machines their canonical id
+    :param sync_state: Watermarks used to skip hosts not seen since the last sync
+    :return: Normalized Host objects
+    """
+    logger = logging.getLogger(__name__)
+    hosts = []
+    host_count = 0
+    async for page in client.iter_normalized_pages(
+        settings.PAGINATION_LIMIT,
+        concurrency=settings.FETCH_CONCURRENCY
+    ):
+        host_count += len(page)
+        if sync_state is not None:
+            page = [host for host in page if sync_state.is_new(client.SOURCE_SYSTEM, host)]
+        await asyncio.to_thread(identity_index.resolve, page)
+        hosts.extend(page)
+    logger.info(
+        f"Fetched {host_count} hosts from {client.SOURCE_SYSTEM}, "
+        f"{host_count - len(hosts)} not seen since the last sync"
+    )
+    return hosts
+
+async def async_fetch_and_process_hosts(full_resync: bool = False):
+    """
+    Asyncio variant of the data pipeline: both vendors are fetched over one
+    pooled HTTP session with normalization interleaved between pages, and
+    MongoDB writes run as concurrent batches off the event loop
+    
+    Like ``fetch_and_process_hosts``, only hosts seen since the last sync
+    are processed by default.
+    
+    :param full_resync: Process and rewrite the whole inventory
+    :return: List of deduplicated Host objects
+    """
+    setup_logging()
+    logger = logging.getLogger(__name__)
+    metrics = PipelineMetrics()
+    clients = []
+    identity_index = None
+    raw_store = None
+    
+    try:
+        # Connect to MongoDB and make sure the hosts collection is indexed
+        db = connect_to_mongodb()
+        repository = HostRepository(db['hosts'])
+        await asyncio.to_thread(repository.ensure_indexes)
+        sync_state = await asyncio.to_thread(SyncState, db['sync_state'], full_resync)
+        identity_index = await asyncio.to_thread(open_identity_index, db, repository)
+        raw_store = open_raw_store(db)
+        
+        logger.info("Fetching hosts from Qualys and Crowdstrike")
+        async with create_session() as session:
+            clients = [AsyncQualysClient(session), AsyncCrowdstrikeClient(session)]
+            for client in clients:
+                client.raw_store = raw_store
+            # Pages are normalized and filtered as they arrive, so this stage
+            # includes normalization
+            with metrics.stage('fetch') as stage:
+                qualys_hosts, crowdstrike_hosts = await asyncio.gather(
+                    *(_fetch_normalized_hosts_async(client, identity_index, sync_state) for client in clients)
+                )
+                host_count = len(qualys_hosts) + len(crowdstrike_hosts)
+                stage.count(host_count, host_count)
+        hosts = qualys_hosts + crowdstrike_hosts
+        
+        if not full_resync:
+            # Stored duplicates of the new arrivals go first, so merges keep
+            # updating the existing documents
+            with metrics.stage('lookup') as stage:
+                stored_hosts = await asyncio.to_thread(repository.find_matching_hosts, hosts)
+                stage.count(len(hosts), len(stored_hosts))
+            hosts = stored_hosts + hosts
         
         # Deduplicate hosts
         deduplicator = HostDeduplicator()
-        deduplicated_hosts = deduplicator.deduplicate_hosts(normalized_hosts)
+        with metrics.stage('deduplicate') as stage:
+            deduplicated_hosts = deduplicator.deduplicate_hosts(hosts)
+            stage.count(deduplicator.stats.hosts_in, len(deduplicated_hosts))
         
-        # Connect to MongoDB
-        db = connect_to_mongodb()
-        hosts_collection = db['hosts']
+        # Store hosts in MongoDB, one bulk batch per worker thread
+        with metrics.stage('store') as stage:
+            summaries = await asyncio.gather(*(
+                asyncio.to_thread(repository.upsert_batch, batch, not full_resync)
+                for batch in chunked(deduplicated_hosts, repository.batch_size)
+            ))
+            stage.count(len(deduplicated_hosts), sum(s.matched + s.upserted for s in summaries))
+        await asyncio.to_thread(
+            finish_sync, repository, identity_index, sync_state, deduplicated_hosts, summaries
+        )
         
-        # Store hosts in MongoDB
-        for host in deduplicated_hosts:
-            host_data = host.to_dict()
-            host_data['processed_at'] = datetime.utcnow()
-            
-            # Upsert based on source system and source ID
-            hosts_collection.update_one(
-                {
-                    'source_system': host.source_system,
-                    'source_id': host.source_id
-                },
-                {'$set': host_data},
-                upsert=True
-            )
+        # Snapshot the inventory for columnar analytics; incremental runs
+        # only hold the new arrivals, so the stored inventory is streamed
+        if settings.EXPORT_PATH:
+            with metrics.stage('export') as stage:
+                exported = await asyncio.to_thread(
+                    export_snapshot, deduplicated_hosts if full_resync else repository.iter_hosts()
+                )
+                stage.count(exported, exported)
         
         logger.info(f"Processed {len(deduplicated_hosts)} unique hosts")
         return deduplicated_hosts
@@ -100,6 +394,42 @@ def fetch_and_process_hosts():
         logger.error(f"Error in host processing pipeline: {e}")
         logger.exception(e)
         return []
+    
+    finally:
+        if identity_index is not None:
+            identity_index.close()
+        if raw_store is not None:
+            await asyncio.to_thread(raw_store.flush)
+        for client in clients:
+            metrics.record_client(client)
+        metrics.report(settings.METRICS_SUMMARY_PATH, settings.METRICS_PROMETHEUS_PATH)
+
+def parse_args() -> argparse.Namespace:
+    """
+    Parse command line arguments
+    
+    :return: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Fetch, deduplicate and store hosts")
+    parser.add_argument(
+        '--async', dest='use_async', action='store_true',
+        help="Run the asyncio pipeline (requires aiohttp)"
+    )
+    parser.add_argument(
+        '--full-resync', action='store_true',
+        help="Ignore sync watermarks and reprocess the whole inventory"
+    )
+    parser.add_argument(
+        '--replay', action='store_true',
+        help="Read vendor pages from the page cache only, without network access"
+    )
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    hosts = fetch_and_process_hosts()
\ No newline at end of file
+    args = parse_args()
+    if args.replay:
+        settings.PAGE_CACHE_MODE = 'replay'
+    if args.use_async:
+        hosts = asyncio.run(async_fetch_and_process_hosts(full_resync=args.full_resync))
+    else:
+        hosts = fetch_and_process_hosts(full_resync=args.full_resync)
\ No newline at end of file
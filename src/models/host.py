@@ -1,14 +1,23 @@
-from dataclasses import dataclass, field, asdict
+import sys
+from dataclasses import dataclass, field, fields
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Mapping, Tuple, Union
 import uuid
+from src.models.raw_data import LazyRawData
+from src.services.timestamps import as_utc, parse_timestamp
 
-@dataclass
+@dataclass(slots=True)
 class Host:
     """
     Unified host model representing normalized host information
     from multiple security scanning tools
+
+    Slotted, so large fleets do not pay for a ``__dict__`` per host, and
+    the low-cardinality strings are interned so hosts share one copy.
     """
+    # Fields with few distinct values across a fleet, interned on creation
+    INTERNED_FIELDS = ('source_system', 'operating_system', 'os_version')
+
     # Unique identifiers
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     source_system: str = ''  # Qualys/Crowdstrike
@@ -33,27 +42,66 @@ class Host:
     last_vulnerability_scan: Optional[datetime] = None
     vulnerability_count: int = 0
 
-    # Raw data for reference
-    raw_data: Dict[str, Any] = field(default_factory=dict)
+    # Raw data for reference, a LazyRawData when offloaded to a raw payload store
+    raw_data: Mapping[str, Any] = field(default_factory=dict)
+
+    # Source records of the hosts merged into this one, as (source_system, source_id)
+    merged_sources: List[Tuple[str, str]] = field(default_factory=list)
+    # Ids of the hosts merged into this one, whose stored documents are retired
+    merged_ids: List[str] = field(default_factory=list)
 
     def __post_init__(self):
         """
         Perform data validation and cleanup after initialization
         """
-        # Ensure timestamps are datetime objects
-        if isinstance(self.first_seen, str):
-            self.first_seen = self.parse_datetime(self.first_seen)
-        if isinstance(self.last_seen, str):
-            self.last_seen = self.parse_datetime(self.last_seen)
+        # Ensure timestamps are UTC-aware datetime objects
+        self.first_seen = self.parse_datetime(self.first_seen)
+        self.last_seen = self.parse_datetime(self.last_seen)
+        self.last_vulnerability_scan = self.parse_datetime(self.last_vulnerability_scan)
+        
+        # Deduplicate lists, keeping first-seen order so output is deterministic
+        self.ip_addresses = list(dict.fromkeys(filter(None, self.ip_addresses)))
+        self.mac_addresses = list(dict.fromkeys(filter(None, self.mac_addresses)))
+        # Stored documents hold the source records as lists
+        self.merged_sources = [tuple(record) for record in self.merged_sources]
+
+        # Share one copy of the OS and source names between hosts
+        for field_name in self.INTERNED_FIELDS:
+            setattr(self, field_name, self.intern(getattr(self, field_name)))
+
+    @property
+    def source_records(self) -> List[Tuple[str, str]]:
+        """
+        Vendor records this host was built from, its own one first
+        
+        :return: ``(source_system, source_id)`` of every record
+        """
+        own = [(self.source_system, self.source_id)] if self.source_id else []
+        return list(dict.fromkeys(own + self.merged_sources))
+
+    @staticmethod
+    def intern(value: Any) -> Any:
+        """
+        Intern a string value, leaving other values unchanged
         
-        # Deduplicate lists
-        self.ip_addresses = list(set(filter(None, self.ip_addresses)))
-        self.mac_addresses = list(set(filter(None, self.mac_addresses)))
+        :param value: Field value
+        :return: The interned string, or the value itself
+        """
+        return sys.intern(value) if type(value) is str else value
 
     @staticmethod
-    def parse_datetime(date_str: str) -> datetime:
-        from dateutil.parser import parse
-        return parse(date_str)
+    def parse_datetime(value: Union[str, datetime, None]) -> Optional[datetime]:
+        """
+        Convert a timestamp to a UTC-aware datetime, treating naive values as UTC
+        
+        :param value: Timestamp string or datetime
+        :return: UTC-aware datetime, or None if no timestamp is given
+        """
+        if isinstance(value, str):
+            return parse_timestamp(value)
+        if isinstance(value, datetime):
+            return as_utc(value)
+        return value
 
     def merge(self, other: 'Host') -> 'Host':
         """
@@ -62,45 +110,102 @@ class Host:
         :param other: Another Host object to merge with
         :return: Merged Host object
         """
-        merged_data = asdict(self)
-        
-        # Merge strategies for different fields
-        merged_data['ip_addresses'] = list(set(self.ip_addresses + other.ip_addresses))
-        merged_data['mac_addresses'] = list(set(self.mac_addresses + other.mac_addresses))
-        
-        # Prefer non-empty string values
-        for field in ['hostname', 'operating_system', 'os_version', 'architecture']:
-            merged_data[field] = (
-                self.__dict__.get(field) or 
-                other.__dict__.get(field)
-            )
+        return Host.merge_many([self, other])
+
+    @staticmethod
+    def merge_many(hosts: List['Host']) -> 'Host':
+        """
+        Merge any number of host records in a single pass
         
-        # Use most recent timestamps
-        merged_data['first_seen'] = min(
-            self.first_seen or datetime.max, 
-            other.first_seen or datetime.max
-        )
-        merged_data['last_seen'] = max(
-            self.last_seen or datetime.min, 
-            other.last_seen or datetime.min
-        )
+        The merged host keeps the id and source record of the first host,
+        while field values come from the most recently seen hosts (earlier
+        hosts first among equals), so a stored host merged with a newer
+        arrival takes the arrival's values. Timestamps cover the widest
+        observed range.
         
-        # Aggregate vulnerability information
-        merged_data['vulnerability_count'] = max(
-            self.vulnerability_count, 
-            other.vulnerability_count
+        :param hosts: Non-empty list of Host objects to merge
+        :return: Merged Host object
+        """
+        first = hosts[0]
+        if len(hosts) == 1:
+            return first
+
+        ip_addresses: Dict[str, None] = {}
+        mac_addresses: Dict[str, None] = {}
+        for host in hosts:
+            ip_addresses.update(dict.fromkeys(host.ip_addresses))
+            mac_addresses.update(dict.fromkeys(host.mac_addresses))
+        # Offloaded payloads are merged by reference, without loading them
+        raw_data = LazyRawData.merge([host.raw_data for host in hosts])
+
+        # Most recently seen first; the sort is stable, so hosts without a
+        # newer timestamp keep their order
+        by_recency = sorted(
+            hosts,
+            key=lambda host: host.last_seen.timestamp() if host.last_seen else float('-inf'),
+            reverse=True
         )
-        
-        # Combine raw data
-        merged_data['raw_data'] = {**self.raw_data, **other.raw_data}
-        
-        # Prefer the first source system 
-        merged_data['source_system'] = (
-            self.source_system or 
-            other.source_system
+        newest = by_recency[0]
+        newest_hosts = [host for host in by_recency if host.last_seen == newest.last_seen]
+
+        # Prefer non-empty string values of the newest hosts
+        def first_non_empty(field_name: str) -> str:
+            return next(
+                (getattr(host, field_name) for host in by_recency if getattr(host, field_name)),
+                getattr(first, field_name)
+            )
+
+        # Use the widest observed time range
+        first_seen_values = [host.first_seen for host in hosts if host.first_seen]
+        last_seen_values = [host.last_seen for host in hosts if host.last_seen]
+        scan_values = [host.last_vulnerability_scan for host in hosts if host.last_vulnerability_scan]
+
+        # Keep every member's source record and id, so all of them stay
+        # resolvable and the documents of merged ids can be retired
+        source_system = first.source_system or first_non_empty('source_system')
+        own_record = (source_system, first.source_id)
+        merged_sources = [
+            record for record in dict.fromkeys(record for host in hosts for record in host.source_records)
+            if record != own_record
+        ]
+        merged_ids = [
+            host_id for host_id in dict.fromkeys(
+                host_id for host in hosts for host_id in [host.id, *host.merged_ids]
+            )
+            if host_id != first.id
+        ]
+
+        return Host(
+            id=first.id,
+            source_system=source_system,
+            source_id=first.source_id,
+            hostname=first_non_empty('hostname'),
+            ip_addresses=list(ip_addresses),
+            mac_addresses=list(mac_addresses),
+            operating_system=first_non_empty('operating_system'),
+            os_version=first_non_empty('os_version'),
+            architecture=first_non_empty('architecture'),
+            first_seen=min(first_seen_values) if first_seen_values else None,
+            last_seen=max(last_seen_values) if last_seen_values else None,
+            is_active=newest.is_active,
+            last_vulnerability_scan=max(scan_values) if scan_values else None,
+            # Latest vulnerability information, so counts can go down again
+            vulnerability_count=max(host.vulnerability_count for host in newest_hosts),
+            raw_data=raw_data,
+            merged_sources=merged_sources,
+            merged_ids=merged_ids
         )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Host':
+        """
+        Build a Host from a stored document, ignoring unknown keys
         
-        return Host(**merged_data)
+        :param data: Dictionary representation of the Host
+        :return: Host object
+        """
+        known_fields = {host_field.name for host_field in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in known_fields and v is not None})
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -0,0 +1,106 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple, Union
+
+
+class RawPayloadSource(Protocol):
+    """
+    Store that raw payloads are loaded back from
+    """
+    def get(self, key: str) -> Dict[str, Any]:
+        ...
+
+
+# A payload held by a store, or a payload kept inline
+RawPart = Union[Tuple[RawPayloadSource, str], Dict[str, Any]]
+
+
+class LazyRawData(Mapping):
+    """
+    Read-only ``raw_data`` of a host whose payloads were offloaded to a
+    store, loaded when it is first read instead of held in memory
+
+    A merged host keeps the parts of every host it was merged from, in
+    merge order, so later payloads override earlier keys exactly like
+    merging the dicts would, without loading any of them. The first read
+    decodes every part once and keeps the result, so iterating, ``len``,
+    ``in`` and ``.get`` do not decode again; ``unload`` drops it.
+    """
+    __slots__ = ('parts', '_loaded')
+
+    def __init__(self, parts: Iterable[RawPart]):
+        """
+        :param parts: ``(store, key)`` references or inline payloads
+        """
+        self.parts: Tuple[RawPart, ...] = tuple(parts)
+        self._loaded: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def merge(payloads: List[Mapping]) -> Union['LazyRawData', Dict[str, Any]]:
+        """
+        Merge the raw data of several hosts, staying lazy if any of them is
+
+        :param payloads: ``raw_data`` of every host, earliest first
+        :return: Lazy raw data, or a plain dict when none was offloaded
+        """
+        if not any(isinstance(payload, LazyRawData) for payload in payloads):
+            raw_data: Dict[str, Any] = {}
+            for payload in payloads:
+                raw_data.update(payload)
+            return raw_data
+
+        parts: List[RawPart] = []
+        for payload in payloads:
+            if isinstance(payload, LazyRawData):
+                parts.extend(payload.parts)
+            elif payload:
+                parts.append(dict(payload))
+        return LazyRawData(parts)
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Load and merge every part
+
+        :return: Raw data as a plain dict
+        """
+        raw_data: Dict[str, Any] = {}
+        for part in self.parts:
+            if isinstance(part, tuple):
+                store, key = part
+                raw_data.update(store.get(key))
+            else:
+                raw_data.update(part)
+        return raw_data
+
+    def _data(self) -> Dict[str, Any]:
+        """
+        Raw data loaded on the first read
+
+        :return: Raw data as a plain dict
+        """
+        if self._loaded is None:
+            self._loaded = self.load()
+        return self._loaded
+
+    def unload(self) -> None:
+        """
+        Drop the loaded raw data, leaving only the references to the store
+        """
+        self._loaded = None
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data())
+
+    def __len__(self) -> int:
+        return len(self._data())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data()
+
+    def __bool__(self) -> bool:
+        return bool(self.parts)
+
+    def __repr__(self) -> str:
+        return f"LazyRawData({len(self.parts)} parts)"
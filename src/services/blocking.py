@@ -0,0 +1,164 @@
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, Optional, Set, Tuple
+from src.models.host import Host
+from src.services.normalization import HostNormalizer
+from src.services.similarity import HostnameSimilarity
+
+BlockingKey = Tuple[str, Hashable]
+
+
+class BlockingIndex:
+    """
+    Inverted index from blocking keys to host slots, used to generate
+    candidate pairs for deduplication without comparing every host
+    against every other host.
+
+    Exact keys (IP, MAC and normalized hostname) are always indexed. Fuzzy
+    hostname keys (prefix and character n-grams) are only indexed when
+    ``hostname_keys`` is enabled, because they fan out much wider. If the
+    hostname similarity backend provides LSH keys, those replace the
+    prefix and n-gram keys.
+
+    With exact keys only, every pair that can reach the threshold shares
+    a key, so blocking finds the same matches as comparing every pair.
+    Fuzzy keys are an approximation: similar hostnames sharing no prefix,
+    n-gram or LSH band are never compared, and neither are pairs only
+    sharing fuzzy keys whose block outgrew ``max_block_size``.
+    """
+    # Kinds of keys only shared by hosts with an identical attribute
+    EXACT_KINDS = frozenset({'ip', 'mac', 'hostname'})
+
+    def __init__(
+        self,
+        hostname_keys: bool = False,
+        prefix_length: int = 4,
+        ngram_size: int = 3,
+        max_block_size: int = 1000,
+        hostname_similarity: Optional[HostnameSimilarity] = None
+    ):
+        self.hostname_keys = hostname_keys
+        self.hostname_similarity = hostname_similarity
+        self.prefix_length = prefix_length
+        self.ngram_size = ngram_size
+        self.max_block_size = max_block_size
+        self._postings: Dict[BlockingKey, Set[int]] = defaultdict(set)
+
+    def exact_keys(self, host: Host) -> Set[BlockingKey]:
+        """
+        Compute the exact-match blocking keys for a host
+
+        :param host: Host to compute keys for
+        :return: Set of exact blocking keys
+        """
+        keys = {('ip', ip) for ip in host.ip_addresses}
+        keys.update(('mac', mac) for mac in host.mac_addresses)
+        if host.hostname:
+            keys.add(('hostname', HostNormalizer.normalize_hostname(host.hostname)))
+        return keys
+
+    def fuzzy_keys(self, host: Host) -> Set[BlockingKey]:
+        """
+        Compute the hostname LSH, or prefix and n-gram, blocking keys for a host
+
+        :param host: Host to compute keys for
+        :return: Set of fuzzy blocking keys
+        """
+        if self.hostname_similarity is not None and host.hostname:
+            lsh_keys = self.hostname_similarity.lsh_keys(host.hostname)
+            if lsh_keys is not None:
+                return {('lsh', key) for key in lsh_keys}
+
+        hostname = HostNormalizer.normalize_hostname(host.hostname or '')
+        if not hostname:
+            return set()
+
+        keys = {('prefix', hostname[:self.prefix_length])}
+        if len(hostname) <= self.ngram_size:
+            keys.add(('ngram', hostname))
+        else:
+            keys.update(
+                ('ngram', hostname[i:i + self.ngram_size])
+                for i in range(len(hostname) - self.ngram_size + 1)
+            )
+        return keys
+
+    def is_fuzzy(self, key: BlockingKey) -> bool:
+        """
+        Check whether a key is a fuzzy hostname key, subject to ``max_block_size``
+
+        :param key: Blocking key
+        :return: True for fuzzy keys
+        """
+        return key[0] not in self.EXACT_KINDS
+
+    def keys(self, host: Host) -> Set[BlockingKey]:
+        """
+        Compute every blocking key indexed for a host
+
+        :param host: Host to compute keys for
+        :return: Set of blocking keys
+        """
+        keys = self.exact_keys(host)
+        if self.hostname_keys:
+            keys |= self.fuzzy_keys(host)
+        return keys
+
+    def add(self, slot: int, host: Host) -> None:
+        """
+        Index a host under the given slot
+
+        :param slot: Slot identifier of the host
+        :param host: Host to index
+        """
+        for key in self.keys(host):
+            self._postings[key].add(slot)
+
+    def discard(self, slot: int, host: Host) -> None:
+        """
+        Remove a host from the index, e.g. once it has been merged away
+
+        :param slot: Slot identifier the host was indexed under
+        :param host: Host that was indexed
+        """
+        for key in self.keys(host):
+            block = self._postings.get(key)
+            if block is not None:
+                block.discard(slot)
+                if not block:
+                    del self._postings[key]
+
+    def candidates(self, host: Host) -> Set[int]:
+        """
+        Find slots sharing at least one blocking key with a host
+
+        Fuzzy keys whose block has grown beyond ``max_block_size`` are
+        skipped, since they no longer discriminate between hosts; matches
+        only reachable through them are missed.
+
+        :param host: Host to find candidates for
+        :return: Set of candidate slots
+        """
+        slots: Set[int] = set()
+        for key in self.exact_keys(host):
+            slots.update(self._postings.get(key, ()))
+        if self.hostname_keys:
+            for key in self.fuzzy_keys(host):
+                block = self._postings.get(key, ())
+                if len(block) <= self.max_block_size:
+                    slots.update(block)
+        return slots
+
+    def candidate_pairs(self, hosts: Iterable[Host]) -> Set[Tuple[int, int]]:
+        """
+        Index a sequence of hosts and return every pair sharing a key
+
+        Slots are the positions of the hosts in the sequence.
+
+        :param hosts: Hosts to index
+        :return: Set of ``(i, j)`` position pairs with ``i < j``
+        """
+        pairs: Set[Tuple[int, int]] = set()
+        for position, host in enumerate(hosts):
+            pairs.update((slot, position) for slot in self.candidates(host))
+            self.add(position, host)
+        return pairs
@@ -0,0 +1,55 @@
+from collections import defaultdict
+from typing import Dict, List
+
+
+class DisjointSet:
+    """
+    Union-find structure over the integers ``0..size-1`` with union by
+    rank and path halving
+    """
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.rank = [0] * size
+
+    def find(self, item: int) -> int:
+        """
+        Find the representative of an item's set
+
+        :param item: Item to look up
+        :return: Representative item of the set
+        """
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int) -> bool:
+        """
+        Merge the sets containing two items
+
+        :param first: First item
+        :param second: Second item
+        :return: True if the items were in different sets
+        """
+        root_first, root_second = self.find(first), self.find(second)
+        if root_first == root_second:
+            return False
+
+        if self.rank[root_first] < self.rank[root_second]:
+            root_first, root_second = root_second, root_first
+        self.parent[root_second] = root_first
+        if self.rank[root_first] == self.rank[root_second]:
+            self.rank[root_first] += 1
+        return True
+
+    def groups(self) -> List[List[int]]:
+        """
+        Collect every set as a sorted list of items
+
+        :return: Sets ordered by their smallest item
+        """
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for item in range(len(self.parent)):
+            groups[self.find(item)].append(item)
+        return list(groups.values())
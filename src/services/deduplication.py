@@ -1,13 +1,87 @@
 import logging
-from typing import List, Dict, Any
-from difflib import SequenceMatcher
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
 from src.models.host import Host
+from src.config.settings import settings
+from src.services.blocking import BlockingIndex
+from src.services.clustering import DisjointSet
+from src.services.memo import LRUCache
+from src.services.scoring import MatchRule, ScoringStats, SimilarityCheck, WeightedScorer
+from src.services.sharding import parallel_matches
+from src.services.similarity import HostnameSimilarity, get_hostname_similarity
+
+
+@dataclass
+class DeduplicationStats:
+    """
+    Counters describing the work done by a deduplication run
+    """
+    hosts_in: int = 0
+    hosts_out: int = 0
+    identity_merges: int = 0
+    pairs_scored: int = 0
+    pairs_pruned: int = 0
+    scoring: ScoringStats = field(default_factory=ScoringStats)
+
 
 class HostDeduplicator:
     """
     Service to deduplicate and merge hosts from multiple sources
     """
-    def __init__(self):
+    # Weight of every similarity check; equal weights give the plain average
+    DEFAULT_WEIGHTS = {'ip': 1.0, 'mac': 1.0, 'hostname': 1.0, 'os': 1.0}
+
+    def __init__(
+        self,
+        use_blocking: bool = True,
+        clustering: bool = False,
+        hostname_similarity: Optional[HostnameSimilarity] = None,
+        weights: Optional[Dict[str, float]] = None,
+        rules: Sequence[MatchRule] = (),
+        workers: Optional[int] = None
+    ):
+        """
+        :param use_blocking: Only score pairs sharing a blocking key instead
+            of comparing every host against every kept host. Exact when IP
+            and MAC weights alone decide whether the threshold is reachable;
+            when weights and threshold let hosts without a shared address
+            match, fuzzy hostname keys are used and blocking becomes an
+            approximation (see ``BlockingIndex``)
+        :param clustering: Group matching hosts into clusters with union-find
+            and merge each cluster once, independent of input order
+        :param hostname_similarity: Hostname similarity backend (defaults to
+            the ``HOSTNAME_SIMILARITY`` setting)
+        :param weights: Weights of the ip, mac, hostname and os checks,
+            overriding ``DEFAULT_WEIGHTS``
+        :param rules: Deterministic match rules, e.g. ``SAME_MAC_RULE``;
+            blocking only finds pairs that share an IP, MAC or hostname key
+        :param workers: Number of processes scoring candidate pairs (defaults
+            to the ``DEDUP_WORKERS`` setting). Above one, hosts are sharded by
+            blocking key and deduplicated by clustering, which requires
+            ``use_blocking``
+        """
+        self.use_blocking = use_blocking
+        self.workers = settings.DEDUP_WORKERS if workers is None else workers
+        self.clustering = clustering or self.workers > 1
+        if self.workers > 1 and not use_blocking:
+            raise ValueError("Sharded deduplication requires use_blocking")
+        self.hostname_similarity = hostname_similarity or get_hostname_similarity(
+            settings.HOSTNAME_SIMILARITY
+        )
+        weights = {**self.DEFAULT_WEIGHTS, **(weights or {})}
+        # Listed in the order scores are summed; cost sets the order they are evaluated in
+        self.scorer = WeightedScorer(
+            [
+                SimilarityCheck('ip', self._ip_address_similarity, weights['ip'], cost=1),
+                SimilarityCheck('mac', self._mac_address_similarity, weights['mac'], cost=1),
+                SimilarityCheck('hostname', self._hostname_similarity, weights['hostname'], cost=3),
+                SimilarityCheck('os', self._os_similarity, weights['os'], cost=2),
+            ],
+            rules
+        )
+        # Hostname scores by unordered pair; the same pairs recur across a fleet
+        self._hostname_scores = LRUCache('hostname_similarity', settings.SIMILARITY_CACHE_SIZE)
+        self.stats = DeduplicationStats()
         self.logger = logging.getLogger(self.__class__.__name__)
 
     def compute_similarity_score(self, host1: Host, host2: Host) -> float:
@@ -18,14 +92,19 @@ class HostDeduplicator:
         :param host2: Second host
         :return: Similarity score (0-1)
         """
-        similarity_checks = [
-            self._ip_address_similarity(host1, host2),
-            self._mac_address_similarity(host1, host2),
-            self._hostname_similarity(host1, host2),
-            self._os_similarity(host1, host2)
-        ]
+        return self.scorer.score(host1, host2)
+
+    def is_duplicate(self, host1: Host, host2: Host, similarity_threshold: float) -> bool:
+        """
+        Decide whether two hosts are duplicates, applying the match rules and
+        stopping as soon as the outcome is certain
         
-        return sum(similarity_checks) / len(similarity_checks)
+        :param host1: First host
+        :param host2: Second host
+        :param similarity_threshold: Minimum similarity to consider hosts duplicates
+        :return: True if the hosts are duplicates
+        """
+        return self.scorer.is_match(host1, host2, similarity_threshold)
 
     def _ip_address_similarity(self, host1: Host, host2: Host) -> float:
         """
@@ -51,13 +130,20 @@ class HostDeduplicator:
 
     def _hostname_similarity(self, host1: Host, host2: Host) -> float:
         """
-        Compute hostname similarity using SequenceMatcher
+        Compute hostname similarity with the configured backend, cached per
+        unordered pair of hostnames
+        
+        The backend always sees the pair in sorted order, so the score does
+        not depend on which host comes first.
         
         :param host1: First host
         :param host2: Second host
         :return: Hostname similarity score (0-1)
         """
-        return SequenceMatcher(None, host1.hostname, host2.hostname).ratio()
+        pair = (host1.hostname, host2.hostname)
+        if pair[1] < pair[0]:
+            pair = (pair[1], pair[0])
+        return self._hostname_scores.get_or_compute(pair, lambda: self.hostname_similarity.similarity(*pair))
 
     def _os_similarity(self, host1: Host, host2: Host) -> float:
         """
@@ -73,15 +159,109 @@ class HostDeduplicator:
         )
         return 1.0 if os_match else 0.0
 
+    def _requires_hostname_blocking(self, similarity_threshold: float) -> bool:
+        """
+        Check whether hosts without a shared IP or MAC can still match
+
+        IP and MAC similarity are zero unless an address is shared, so
+        without one the score is capped by the weights of the other checks.
+
+        :param similarity_threshold: Minimum similarity to consider hosts duplicates
+        :return: True if fuzzy hostname keys are needed to find every match
+        """
+        return self.scorer.max_score_without('ip', 'mac') >= similarity_threshold
+
+    def _blocking_index(self, similarity_threshold: float) -> BlockingIndex:
+        """
+        Build the blocking index used to find candidate pairs
+
+        :param similarity_threshold: Minimum similarity to consider hosts duplicates
+        :return: Empty blocking index
+        """
+        return BlockingIndex(
+            hostname_keys=self._requires_hostname_blocking(similarity_threshold),
+            hostname_similarity=self.hostname_similarity
+        )
+
+    def _count_hosts(self, hosts: Iterable[Host]) -> Iterator[Host]:
+        """
+        Count hosts as they are consumed, so streams can be deduplicated
+        without materializing them first
+
+        :param hosts: Hosts to count
+        :return: Iterator over the same hosts
+        """
+        for host in hosts:
+            self.stats.hosts_in += 1
+            yield host
+
+    def _merge_same_identity(self, hosts: Iterable[Host]) -> List[Host]:
+        """
+        Merge hosts sharing an id before any scoring
+
+        Hosts resolved to the same machine by an ``IdentityIndex`` carry
+        its canonical id, so they are merged with a dict lookup; hosts
+        with fresh ids pass through unchanged.
+
+        :param hosts: Hosts to group
+        :return: One host per id, in order of first appearance
+        """
+        groups: Dict[str, List[Host]] = {}
+        for host in hosts:
+            groups.setdefault(host.id, []).append(host)
+        self.stats.identity_merges = self.stats.hosts_in - len(groups)
+        return [Host.merge_many(group) for group in groups.values()]
+
     def deduplicate_hosts(
         self, 
-        hosts: List[Host], 
+        hosts: Iterable[Host], 
         similarity_threshold: float = 0.7
     ) -> List[Host]:
         """
         Deduplicate hosts by merging similar hosts
         
-        :param hosts: List of hosts to deduplicate
+        :param hosts: Hosts to deduplicate, as a list or a lazy stream
+        :param similarity_threshold: Minimum similarity to consider hosts duplicates
+        :return: Deduplicated list of hosts
+        """
+        self.stats = DeduplicationStats(scoring=self.scorer.reset_stats())
+        hosts = self._merge_same_identity(self._count_hosts(hosts))
+
+        if self.clustering:
+            deduplicated_hosts = self._deduplicate_by_clustering(hosts, similarity_threshold)
+        elif self.use_blocking:
+            deduplicated_hosts = self._deduplicate_with_blocking(hosts, similarity_threshold)
+        else:
+            deduplicated_hosts = self._deduplicate_brute_force(hosts, similarity_threshold)
+
+        self.stats.hosts_out = len(deduplicated_hosts)
+        self.logger.info(f"Deduplication reduced host count from {self.stats.hosts_in} to {len(deduplicated_hosts)}")
+        self.logger.info(
+            f"Merged {self.stats.identity_merges} hosts by canonical id, "
+            f"scored {self.stats.pairs_scored} host pairs, "
+            f"pruned {self.stats.pairs_pruned} by blocking"
+        )
+        scoring = self.stats.scoring
+        self.logger.info(
+            f"Decided {scoring.decisions} pairs: {scoring.rule_matches} by rules, "
+            f"{scoring.early_accepts} accepted and {scoring.early_rejects} rejected early"
+        )
+        for name, check_stats in scoring.checks.items():
+            self.logger.info(
+                f"Check {name}: {check_stats.evaluations} evaluated, "
+                f"{check_stats.hits} hits, {check_stats.skipped} skipped"
+            )
+        return deduplicated_hosts
+
+    def _deduplicate_brute_force(
+        self,
+        hosts: Iterable[Host],
+        similarity_threshold: float
+    ) -> List[Host]:
+        """
+        Deduplicate hosts by comparing each host against every kept host
+
+        :param hosts: Hosts to deduplicate
         :param similarity_threshold: Minimum similarity to consider hosts duplicates
         :return: Deduplicated list of hosts
         """
@@ -91,9 +271,9 @@ class HostDeduplicator:
             duplicate_found = False
             
             for existing_host in deduplicated_hosts:
-                similarity = self.compute_similarity_score(host, existing_host)
+                self.stats.pairs_scored += 1
                 
-                if similarity >= similarity_threshold:
+                if self.is_duplicate(host, existing_host, similarity_threshold):
                     # Merge hosts if similar enough
                     merged_host = existing_host.merge(host)
                     deduplicated_hosts.remove(existing_host)
@@ -104,5 +284,151 @@ class HostDeduplicator:
             if not duplicate_found:
                 deduplicated_hosts.append(host)
         
-        self.logger.info(f"Deduplication reduced host count from {len(hosts)} to {len(deduplicated_hosts)}")
-        return deduplicated_hosts
\ No newline at end of file
+        return deduplicated_hosts
+
+    def _deduplicate_with_blocking(
+        self,
+        hosts: Iterable[Host],
+        similarity_threshold: float
+    ) -> List[Host]:
+        """
+        Deduplicate hosts, scoring only pairs that share a blocking key
+
+        Kept hosts live in slots numbered in the order the brute-force list
+        would hold them: a merged host takes a fresh, higher slot just like
+        it is moved to the end of the list. Candidates are scored in slot
+        order, so the first match is the same one the brute-force scan finds.
+
+        :param hosts: Hosts to deduplicate
+        :param similarity_threshold: Minimum similarity to consider hosts duplicates
+        :return: Deduplicated list of hosts
+        """
+        index = self._blocking_index(similarity_threshold)
+        slots: Dict[int, Host] = {}
+        next_slot = 0
+
+        for host in hosts:
+            candidates = sorted(index.candidates(host))
+            self.stats.pairs_pruned += len(slots) - len(candidates)
+            kept_host = host
+
+            for slot in candidates:
+                existing_host = slots[slot]
+                self.stats.pairs_scored += 1
+
+                if self.is_duplicate(host, existing_host, similarity_threshold):
+                    kept_host = existing_host.merge(host)
+                    index.discard(slot, existing_host)
+                    del slots[slot]
+                    break
+
+            slots[next_slot] = kept_host
+            index.add(next_slot, kept_host)
+            next_slot += 1
+
+        return list(slots.values())
+
+    @staticmethod
+    def _cluster_sort_key(host: Host):
+        """
+        Build a total ordering key so clustering does not depend on input order
+
+        :param host: Host to build the key for
+        :return: Sort key
+        """
+        return (
+            host.source_system,
+            host.source_id,
+            host.hostname,
+            sorted(host.ip_addresses),
+            sorted(host.mac_addresses)
+        )
+
+    def _deduplicate_by_clustering(
+        self,
+        hosts: Iterable[Host],
+        similarity_threshold: float
+    ) -> List[Host]:
+        """
+        Deduplicate hosts by clustering pairwise matches with union-find
+
+        Every candidate pair is scored on the original hosts, matches are
+        recorded in a disjoint-set structure, and each resulting cluster is
+        merged once with ``Host.merge_many``. Hosts are put in a canonical
+        order first, so the output does not depend on how the input
+        sources were interleaved.
+
+        :param hosts: Hosts to deduplicate
+        :param similarity_threshold: Minimum similarity to consider hosts duplicates
+        :return: Deduplicated list of hosts
+        """
+        ordered_hosts = sorted(hosts, key=self._cluster_sort_key)
+        total_pairs = len(ordered_hosts) * (len(ordered_hosts) - 1) // 2
+
+        if self.workers > 1:
+            return self._cluster_in_shards(ordered_hosts, similarity_threshold, total_pairs)
+
+        if self.use_blocking:
+            index = self._blocking_index(similarity_threshold)
+            pairs = sorted(index.candidate_pairs(ordered_hosts))
+        else:
+            pairs = [
+                (i, j)
+                for j in range(len(ordered_hosts))
+                for i in range(j)
+            ]
+        self.stats.pairs_pruned += total_pairs - len(pairs)
+
+        clusters = DisjointSet(len(ordered_hosts))
+        for i, j in pairs:
+            # Hosts already in the same cluster need no further evidence
+            if clusters.find(i) == clusters.find(j):
+                continue
+            self.stats.pairs_scored += 1
+            if self.is_duplicate(ordered_hosts[i], ordered_hosts[j], similarity_threshold):
+                clusters.union(i, j)
+
+        return [
+            Host.merge_many([ordered_hosts[i] for i in group])
+            for group in clusters.groups()
+        ]
+
+    def _cluster_in_shards(
+        self,
+        ordered_hosts: List[Host],
+        similarity_threshold: float,
+        total_pairs: int
+    ) -> List[Host]:
+        """
+        Cluster hosts with candidate pairs scored across worker processes
+
+        Hosts are sharded by blocking key and each shard is scored in a
+        process pool. Clusters spanning several shards are joined by
+        replaying every shard's matches into one disjoint set, so the
+        result is the same as the single-process clustering.
+
+        :param ordered_hosts: Hosts in canonical order
+        :param similarity_threshold: Minimum similarity to consider hosts duplicates
+        :param total_pairs: Number of pairs without blocking
+        :return: Deduplicated list of hosts
+        """
+        results = parallel_matches(
+            self,
+            ordered_hosts,
+            self._blocking_index(similarity_threshold),
+            similarity_threshold,
+            self.workers
+        )
+
+        clusters = DisjointSet(len(ordered_hosts))
+        for result in results:
+            self.stats.pairs_scored += result.pairs_scored
+            self.stats.scoring.add(result.scoring)
+            for i, j in result.matches:
+                clusters.union(i, j)
+        self.stats.pairs_pruned += total_pairs - sum(result.candidate_pairs for result in results)
+
+        return [
+            Host.merge_many([ordered_hosts[i] for i in group])
+            for group in clusters.groups()
+        ]
@@ -0,0 +1,281 @@
+import glob
+import logging
+import os
+import shutil
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote
+from src.models.host import Host
+from src.config.settings import settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    from pyarrow import fs
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+EXPORT_FORMATS = ('parquet', 'arrow')
+# Hive-style directory levels of a snapshot, outermost first
+PARTITION_COLUMNS = ('source_system', 'operating_system')
+# Directory name of empty partition values; read back as null
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+FILE_EXTENSIONS = {'parquet': '.parquet', 'arrow': '.arrow'}
+# Parquet is compressed for size; Arrow files stay uncompressed so
+# memory-mapped reads are zero-copy
+DEFAULT_COMPRESSION = {'parquet': 'zstd', 'arrow': None}
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError(
+            "pyarrow is required for snapshot export; "
+            "install it with `poetry install --extras parquet`"
+        )
+
+
+def host_schema() -> 'pa.Schema':
+    """
+    Column types of the snapshot files, without the partition columns
+
+    :return: Arrow schema
+    """
+    _require_pyarrow()
+    timestamp = pa.timestamp('us', tz='UTC')
+    return pa.schema([
+        ('id', pa.string()),
+        ('source_id', pa.string()),
+        ('hostname', pa.string()),
+        ('ip_addresses', pa.list_(pa.string())),
+        ('mac_addresses', pa.list_(pa.string())),
+        ('os_version', pa.string()),
+        ('architecture', pa.string()),
+        ('first_seen', timestamp),
+        ('last_seen', timestamp),
+        ('is_active', pa.bool_()),
+        ('last_vulnerability_scan', timestamp),
+        ('vulnerability_count', pa.int64()),
+    ])
+
+
+class SnapshotWriter:
+    """
+    Streams hosts into a partitioned Parquet or Arrow snapshot
+
+    Hosts are buffered per partition and written one row group at a
+    time, so memory stays bounded by ``row_group_size`` rows per
+    partition. Files are written to a new version directory next to the
+    snapshot, and ``close`` points the snapshot path, a symlink, at it
+    with an atomic rename, so readers never see a partial or missing
+    snapshot. The previous version is kept until the next export, for
+    readers still listing it.
+    """
+    def __init__(
+        self,
+        directory: str,
+        file_format: Optional[str] = None,
+        row_group_size: Optional[int] = None,
+        compression: Optional[str] = None
+    ):
+        """
+        :param directory: Snapshot path, a symlink replaced on close
+        :param file_format: 'parquet' or 'arrow' (defaults to ``EXPORT_FORMAT``)
+        :param row_group_size: Rows per row group (defaults to ``EXPORT_ROW_GROUP_SIZE``)
+        :param compression: Codec (defaults to zstd for Parquet, none for Arrow)
+        """
+        _require_pyarrow()
+        self.file_format = file_format or settings.EXPORT_FORMAT
+        if self.file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {self.file_format!r}, expected one of {EXPORT_FORMATS}")
+        self.row_group_size = row_group_size or settings.EXPORT_ROW_GROUP_SIZE
+        self.compression = compression or settings.EXPORT_COMPRESSION or DEFAULT_COMPRESSION[self.file_format]
+        self.schema = host_schema()
+        self.directory = directory.rstrip(os.sep)
+        self.staging_directory = f"{self.directory}.v{time.time_ns()}"
+        self._buffers: Dict[Tuple[Optional[str], ...], Dict[str, List[Any]]] = {}
+        self._writers: Dict[Tuple[Optional[str], ...], Any] = {}
+        self.rows = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def __enter__(self) -> 'SnapshotWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write(self, host: Host) -> None:
+        """
+        Add a host to the snapshot
+
+        :param host: Host to export
+        """
+        partition = tuple(getattr(host, column) or None for column in PARTITION_COLUMNS)
+        buffer = self._buffers.get(partition)
+        if buffer is None:
+            buffer = self._buffers[partition] = {name: [] for name in self.schema.names}
+        for name, column in buffer.items():
+            column.append(getattr(host, name))
+        if len(buffer['id']) >= self.row_group_size:
+            self._flush(partition)
+
+    def write_all(self, hosts: Iterable[Host]) -> int:
+        """
+        Add every host to the snapshot
+
+        :param hosts: Hosts to export
+        :return: Number of rows written so far
+        """
+        for host in hosts:
+            self.write(host)
+        return self.rows
+
+    def _partition_path(self, partition: Tuple[Optional[str], ...]) -> str:
+        segments = [
+            f"{column}={quote(value, safe='') if value else NULL_PARTITION}"
+            for column, value in zip(PARTITION_COLUMNS, partition)
+        ]
+        return os.path.join(self.staging_directory, *segments, f"part-0{FILE_EXTENSIONS[self.file_format]}")
+
+    def _open(self, partition: Tuple[Optional[str], ...]):
+        path = self._partition_path(partition)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if self.file_format == 'parquet':
+            return pq.ParquetWriter(path, self.schema, compression=self.compression or 'none')
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(path, self.schema, options=options)
+
+    def _flush(self, partition: Tuple[Optional[str], ...]) -> None:
+        """
+        Write the buffered hosts of a partition as one row group
+
+        :param partition: Partition values
+        """
+        buffer = self._buffers.pop(partition)
+        table = pa.Table.from_pydict(buffer, schema=self.schema)
+        writer = self._writers.get(partition)
+        if writer is None:
+            writer = self._writers[partition] = self._open(partition)
+        if self.file_format == 'parquet':
+            writer.write_table(table, row_group_size=self.row_group_size)
+        else:
+            writer.write_table(table, max_chunksize=self.row_group_size)
+        self.rows += table.num_rows
+
+    def close(self) -> None:
+        """
+        Write the remaining hosts and publish the snapshot
+        """
+        for partition in list(self._buffers):
+            self._flush(partition)
+        for writer in self._writers.values():
+            writer.close()
+        os.makedirs(self.staging_directory, exist_ok=True)
+        previous = self._publish()
+        self._prune(keep={self.staging_directory, previous})
+        self.logger.info(
+            f"Exported {self.rows} hosts in {len(self._writers)} partitions to {self.directory}"
+        )
+
+    def _publish(self) -> Optional[str]:
+        """
+        Point the snapshot path at the written version
+
+        :return: Version directory the snapshot pointed at before, if any
+        """
+        previous = None
+        if os.path.islink(self.directory):
+            previous = os.path.join(os.path.dirname(self.directory), os.readlink(self.directory))
+        elif os.path.isdir(self.directory):
+            # Snapshot written before versions were symlinked: move it
+            # aside once, so the symlink can take its place
+            previous = f"{self.directory}.v0"
+            os.replace(self.directory, previous)
+        link = f"{self.directory}.link-{os.getpid()}"
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(os.path.basename(self.staging_directory), link)
+        os.replace(link, self.directory)
+        return previous
+
+    def _prune(self, keep: Iterable[Optional[str]]) -> None:
+        """
+        Remove the version directories of older snapshots
+
+        :param keep: Version directories to keep
+        """
+        keep = {os.path.normpath(version) for version in keep if version}
+        prefix = f"{self.directory}.v"
+        for version in glob.glob(f"{glob.escape(prefix)}*"):
+            if version[len(prefix):].isdigit() and os.path.normpath(version) not in keep:
+                shutil.rmtree(version, ignore_errors=True)
+
+    def abort(self) -> None:
+        """
+        Discard the snapshot being written, keeping the previous one
+        """
+        for writer in self._writers.values():
+            writer.close()
+        shutil.rmtree(self.staging_directory, ignore_errors=True)
+
+
+def export_snapshot(hosts: Iterable[Host], directory: Optional[str] = None, **options) -> int:
+    """
+    Write hosts as a partitioned columnar snapshot
+
+    :param hosts: Hosts to export
+    :param directory: Snapshot directory (defaults to ``EXPORT_PATH``)
+    :param options: ``SnapshotWriter`` options
+    :return: Number of hosts exported
+    """
+    with SnapshotWriter(directory or settings.EXPORT_PATH, **options) as writer:
+        writer.write_all(hosts)
+    return writer.rows
+
+
+def _snapshot_format(directory: str) -> str:
+    """
+    Detect the file format of a snapshot from its first file
+
+    :param directory: Snapshot directory
+    :return: 'parquet' or 'arrow'
+    """
+    for _, _, files in os.walk(directory):
+        for file in files:
+            for file_format, extension in FILE_EXTENSIONS.items():
+                if file.endswith(extension):
+                    return file_format
+    return 'parquet'
+
+
+def read_snapshot(
+    directory: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    filter: Optional['ds.Expression'] = None
+) -> 'pa.Table':
+    """
+    Load a snapshot through memory-mapped files
+
+    Partition columns are restored from the directory names, and
+    ``filter`` on them skips whole partitions. Uncompressed Arrow
+    snapshots load without copying; Parquet pages are decoded from the
+    mapped files.
+
+    :param directory: Snapshot directory (defaults to ``EXPORT_PATH``)
+    :param columns: Columns to load (None for all)
+    :param filter: Row filter, e.g. ``ds.field('source_system') == 'Qualys'``
+    :return: Arrow table
+    """
+    _require_pyarrow()
+    directory = directory or settings.EXPORT_PATH
+    file_format = _snapshot_format(directory)
+    dataset = ds.dataset(
+        directory,
+        format='ipc' if file_format == 'arrow' else 'parquet',
+        partitioning=ds.HivePartitioning.discover(null_fallback=NULL_PARTITION),
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+    return dataset.to_table(columns=list(columns) if columns is not None else None, filter=filter)
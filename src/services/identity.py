@@ -0,0 +1,267 @@
+import logging
+import os
+import shelve
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+from src.models.host import Host
+from src.config.settings import settings
+from src.services.normalization import HostNormalizer
+from src.services.streaming import chunked
+from src.services.timestamps import utc_now
+
+# Keys naming a single machine: one of them is enough to resolve a host
+STRONG_KINDS = ('source', 'mac')
+# Keys that can move between machines (DHCP leases, reused names): two of
+# them have to agree before a host is resolved through them
+WEAK_KINDS = ('hostname', 'ip')
+
+
+class IdentityIndex:
+    """
+    Persistent map from the identifying keys of a host (source record,
+    MAC, hostname and IP addresses) to the canonical id of the machine
+
+    Keys are stored one document each in MongoDB, with the key as
+    ``_id``, and optionally mirrored in a local ``shelve`` file so later
+    runs resolve known keys without a round trip. Keys looked up during a
+    run are kept in memory, so resolving a host is a few dict lookups.
+    The id of a host merged into another one becomes an ``alias:`` key
+    pointing at the surviving id, so keys still naming it resolve to the
+    survivor.
+    Safe to share between the vendor tasks of the async pipeline.
+    """
+    def __init__(
+        self,
+        collection: Collection,
+        cache_path: Optional[str] = None,
+        batch_size: Optional[int] = None
+    ):
+        """
+        :param collection: Collection holding one document per key
+        :param cache_path: Local key-value cache file (defaults to
+            ``IDENTITY_CACHE_PATH``; None keeps keys in MongoDB only)
+        :param batch_size: Number of keys written per ``bulk_write`` call
+        """
+        self.collection = collection
+        self.batch_size = batch_size or settings.STORAGE_BATCH_SIZE
+        cache_path = cache_path or settings.IDENTITY_CACHE_PATH
+        if cache_path:
+            directory = os.path.dirname(cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self.cache = shelve.open(cache_path)
+        else:
+            self.cache = None
+        # Canonical id by key, None for keys known to be unassigned
+        self._ids: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @staticmethod
+    def keys(host: Host) -> Dict[str, List[str]]:
+        """
+        Build the identifying keys of a host
+
+        :param host: Host to build the keys for
+        :return: Keys by kind
+        """
+        keys = {
+            'source': [
+                f"source:{source_system}:{source_id}" for source_system, source_id in host.source_records
+            ],
+            'mac': [f"mac:{mac.lower()}" for mac in host.mac_addresses],
+            'hostname': [],
+            'ip': [f"ip:{ip}" for ip in host.ip_addresses],
+        }
+        if host.hostname:
+            keys['hostname'].append(f"hostname:{HostNormalizer.normalize_hostname(host.hostname)}")
+        return keys
+
+    def _load(self, keys: Iterable[str]) -> None:
+        """
+        Look up keys not seen yet in this run, from the local cache first
+        and from MongoDB in one query for the rest
+
+        :param keys: Keys to look up
+        """
+        missing = [key for key in dict.fromkeys(keys) if key not in self._ids]
+        if self.cache is not None:
+            for key in missing:
+                self._ids[key] = self.cache.get(key)
+            missing = [key for key in missing if self._ids[key] is None]
+
+        for key in missing:
+            self._ids[key] = None
+        if missing:
+            for document in self.collection.find({'_id': {'$in': missing}}, {'host_id': 1}):
+                self._ids[document['_id']] = document['host_id']
+                if self.cache is not None:
+                    self.cache[document['_id']] = document['host_id']
+
+    def _load_aliases(self, host_ids: Iterable[Optional[str]]) -> None:
+        """
+        Look up the aliases of ids, following chains of merges
+
+        :param host_ids: Ids keys point at
+        """
+        pending = {host_id for host_id in host_ids if host_id is not None}
+        seen = set()
+        while pending:
+            seen |= pending
+            alias_keys = [f"alias:{host_id}" for host_id in pending]
+            self._load(alias_keys)
+            pending = {self._ids[key] for key in alias_keys if self._ids[key] is not None} - seen
+
+    def _current_id(self, key: str) -> Optional[str]:
+        """
+        Id a loaded key points at, after following aliases
+
+        :param key: Identifying key
+        :return: Surviving id, or None for an unassigned key
+        """
+        host_id = self._ids.get(key)
+        seen = set()
+        while host_id is not None and host_id not in seen:
+            seen.add(host_id)
+            alias = self._ids.get(f"alias:{host_id}")
+            if alias is None:
+                break
+            host_id = alias
+        return host_id
+
+    def _canonical_id(self, keys: Dict[str, List[str]]) -> Optional[str]:
+        """
+        Pick the canonical id of a host from its loaded keys
+
+        :param keys: Keys of the host by kind
+        :return: Canonical id, or None for an unknown machine
+        """
+        for kind in STRONG_KINDS:
+            for key in keys[kind]:
+                host_id = self._current_id(key)
+                if host_id is not None:
+                    return host_id
+
+        votes = Counter(
+            host_id for kind in WEAK_KINDS for key in keys[kind]
+            for host_id in [self._current_id(key)] if host_id is not None
+        )
+        if votes:
+            host_id, count = votes.most_common(1)[0]
+            if count >= 2:
+                return host_id
+        return None
+
+    def resolve(self, hosts: List[Host]) -> int:
+        """
+        Give hosts of known machines their canonical id, in place
+
+        Hosts of unknown machines keep their id, which becomes canonical
+        once ``record`` stores it.
+
+        :param hosts: Newly arrived hosts
+        :return: Number of hosts resolved to a known machine
+        """
+        host_keys = [self.keys(host) for host in hosts]
+        resolved = 0
+        with self._lock:
+            all_keys = [key for keys in host_keys for kind_keys in keys.values() for key in kind_keys]
+            self._load(all_keys)
+            self._load_aliases(self._ids[key] for key in all_keys)
+            for host, keys in zip(hosts, host_keys):
+                host_id = self._canonical_id(keys)
+                if host_id is not None:
+                    host.id = host_id
+                    resolved += 1
+        return resolved
+
+    def record(self, hosts: Iterable[Host]) -> int:
+        """
+        Point every key of the hosts at their id, writing only keys that
+        are new or moved to another machine
+
+        :param hosts: Stored hosts with their canonical id
+        :return: Number of keys written
+        """
+        written = 0
+        for batch in chunked(hosts, self.batch_size):
+            with self._lock:
+                written += self._record_batch(batch)
+
+        self.logger.info(f"Recorded {written} identity keys")
+        return written
+
+    def _record_batch(self, hosts: List[Host]) -> int:
+        """
+        Write the moved and new keys of one batch of hosts
+
+        :param hosts: Stored hosts with their canonical id
+        :return: Number of keys written
+        """
+        host_keys = [self.keys(host) for host in hosts]
+        self._load(key for keys in host_keys for kind_keys in keys.values() for key in kind_keys)
+
+        assignments: Dict[str, str] = {}
+        for host, keys in zip(hosts, host_keys):
+            for kind_keys in keys.values():
+                for key in kind_keys:
+                    if self._ids.get(key) != host.id:
+                        assignments[key] = host.id
+        if not assignments:
+            return 0
+
+        updated_at = utc_now()
+        self.collection.bulk_write([
+            UpdateOne({'_id': key}, {'$set': {'host_id': host_id, 'updated_at': updated_at}}, upsert=True)
+            for key, host_id in assignments.items()
+        ], ordered=False)
+        self._ids.update(assignments)
+        if self.cache is not None:
+            for key, host_id in assignments.items():
+                self.cache[key] = host_id
+        return len(assignments)
+
+    def retire(self, aliases: Dict[str, str]) -> int:
+        """
+        Point the ids of hosts merged into another host at the survivor
+
+        :param aliases: Surviving id by merged id
+        :return: Number of aliases written
+        """
+        written = 0
+        for batch in chunked(aliases.items(), self.batch_size):
+            updated_at = utc_now()
+            assignments = {f"alias:{merged_id}": host_id for merged_id, host_id in batch}
+            with self._lock:
+                self.collection.bulk_write([
+                    UpdateOne({'_id': key}, {'$set': {'host_id': host_id, 'updated_at': updated_at}}, upsert=True)
+                    for key, host_id in assignments.items()
+                ], ordered=False)
+                self._ids.update(assignments)
+                if self.cache is not None:
+                    for key, host_id in assignments.items():
+                        self.cache[key] = host_id
+            written += len(assignments)
+
+        if written:
+            self.logger.info(f"Retired {written} host ids merged into other hosts")
+        return written
+
+    def is_empty(self) -> bool:
+        """
+        Check whether no key has been recorded yet
+
+        :return: True for a new index
+        """
+        return self.collection.find_one({}, {'_id': 1}) is None
+
+    def close(self) -> None:
+        """
+        Flush and close the local cache
+        """
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
@@ -0,0 +1,168 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Optional
+
+# Returned by ``LRUCache.get`` for keys not in the cache
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """
+    Lookups of every cache sharing a name, since the process started
+    """
+    maxsize: int = 0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+# Statistics of every cache by name
+_STATS: Dict[str, Callable[[], CacheStats]] = {}
+# Counters shared by the ``LRUCache`` instances of every name
+_SHARED_STATS: Dict[str, CacheStats] = {}
+_STATS_LOCK = threading.Lock()
+
+
+class LRUCache:
+    """
+    Size-bounded mapping evicting the least recently used entry
+
+    Lookups and evictions are counted in the ``CacheStats`` registered
+    under the cache name, so caches owned by short-lived objects (one
+    deduplicator per run) add up to one set of counters. A ``maxsize`` of
+    zero disables the cache. Safe to share between threads; a pickled
+    cache, e.g. sent to a worker process, arrives empty.
+    """
+    def __init__(self, name: str, maxsize: int):
+        """
+        :param name: Name the statistics are reported under
+        :param maxsize: Maximum number of entries (0 disables caching)
+        """
+        self.name = name
+        self.maxsize = max(maxsize, 0)
+        with _STATS_LOCK:
+            stats = self.stats = _SHARED_STATS.setdefault(name, CacheStats())
+            stats.maxsize = self.maxsize
+            _STATS[name] = lambda: stats
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        return LRUCache, (self.name, self.maxsize)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """
+        Look up a key, marking it as recently used
+
+        :param key: Cache key
+        :param default: Value returned for a miss
+        :return: Cached value, or ``default``
+        """
+        if not self.maxsize:
+            return default
+        with self._lock:
+            value = self._entries.get(key, MISSING)
+            if value is MISSING:
+                self.stats.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entry when full
+
+        :param key: Cache key
+        :param value: Value to store
+        """
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Look up a key, computing and storing its value on a miss
+
+        :param key: Cache key
+        :param compute: Function computing the value
+        :return: Cached or computed value
+        """
+        value = self.get(key)
+        if value is MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """
+        Drop every entry, keeping the statistics
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+def memoized(name: str, maxsize: int) -> Callable[[Callable], Callable]:
+    """
+    Memoize a function of hashable arguments with ``functools.lru_cache``,
+    reporting its statistics under ``name``
+
+    Meant for cheap functions called very often, where the C
+    implementation of ``lru_cache`` is the only cache faster than
+    recomputing. A ``maxsize`` of zero leaves the function uncached.
+
+    :param name: Name the statistics are reported under
+    :param maxsize: Maximum number of entries (0 disables caching)
+    :return: Decorator
+    """
+    def decorator(function: Callable) -> Callable:
+        if maxsize <= 0:
+            return function
+        cached = lru_cache(maxsize=maxsize)(function)
+
+        def stats() -> CacheStats:
+            info = cached.cache_info()
+            # Every miss adds an entry, so entries beyond the current size were evicted
+            return CacheStats(info.maxsize, info.hits, info.misses, info.misses - info.currsize)
+
+        with _STATS_LOCK:
+            _STATS[name] = stats
+        return cached
+    return decorator
+
+
+def cache_statistics(baseline: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Statistics of every named cache, optionally since an earlier snapshot
+
+    :param baseline: Earlier result of this function to subtract
+    :return: Size limit, hits, misses, evictions and hit rate by cache name
+    """
+    baseline = baseline or {}
+    with _STATS_LOCK:
+        sources = dict(_STATS)
+    statistics = {}
+    for name, source in sorted(sources.items()):
+        cache_stats = source()
+        before = baseline.get(name, {})
+        hits = cache_stats.hits - before.get('hits', 0)
+        misses = cache_stats.misses - before.get('misses', 0)
+        statistics[name] = {
+            'maxsize': cache_stats.maxsize,
+            'hits': hits,
+            'misses': misses,
+            'evictions': cache_stats.evictions - before.get('evictions', 0),
+            'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+        }
+    return statistics
@@ -0,0 +1,317 @@
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+from src.services.memo import cache_statistics
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# Latency quantiles reported for every client
+QUANTILES = (0.5, 0.9, 0.99)
+# Request latencies kept per client to estimate the quantiles from
+LATENCY_RESERVOIR_SIZE = 1024
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """
+    Peak resident set size of the process so far
+
+    :return: Peak RSS in bytes, or None where it cannot be measured
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS and in KiB elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+@dataclass
+class StageMetrics:
+    """
+    Work done by one pipeline stage
+
+    ``wall_seconds`` excludes the time spent in stages nested inside it,
+    so no time is counted in two stages. ``max_rss_so_far_bytes`` is the
+    process-wide RSS high-water mark when the stage last ended, which may
+    have been reached by an earlier stage.
+    """
+    name: str
+    wall_seconds: float = 0.0
+    records_in: int = 0
+    records_out: int = 0
+    max_rss_so_far_bytes: Optional[int] = None
+
+    def count(self, records_in: int, records_out: int) -> None:
+        """
+        Add to the records of the stage
+
+        :param records_in: Records the stage received
+        :param records_out: Records the stage produced
+        """
+        self.records_in += records_in
+        self.records_out += records_out
+
+    @property
+    def records_per_second(self) -> float:
+        """
+        Input records processed per second of the stage
+        """
+        return self.records_in / self.wall_seconds if self.wall_seconds else 0.0
+
+
+@dataclass
+class RequestStats:
+    """
+    HTTP requests of one client, including retried attempts
+
+    Latencies are kept as a uniform sample of at most
+    ``LATENCY_RESERVOIR_SIZE`` requests, so memory stays bounded however
+    long the run is.
+    """
+    requests: int = 0
+    errors: int = 0
+    latencies: List[float] = field(default_factory=list)
+    _random: random.Random = field(default_factory=random.Random, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, latency: float, ok: bool = True) -> None:
+        """
+        Record one request
+
+        :param latency: Seconds the request took
+        :param ok: Whether the request succeeded
+        """
+        with self._lock:
+            self.requests += 1
+            if len(self.latencies) < LATENCY_RESERVOIR_SIZE:
+                self.latencies.append(latency)
+            else:
+                # Reservoir sampling: every request is kept with equal probability
+                slot = self._random.randrange(self.requests)
+                if slot < LATENCY_RESERVOIR_SIZE:
+                    self.latencies[slot] = latency
+            if not ok:
+                self.errors += 1
+
+    def quantiles(self) -> Dict[float, float]:
+        """
+        Latency quantiles of the sampled requests, by nearest rank
+
+        :return: Latency in seconds by quantile, empty without requests
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return {}
+        return {
+            quantile: latencies[min(int(quantile * len(latencies)), len(latencies) - 1)]
+            for quantile in QUANTILES
+        }
+
+
+class PipelineMetrics:
+    """
+    Per-stage timings, record counts and memory, request statistics of
+    every client and memoization cache hits, for one pipeline run
+
+    Stages are timed with ``stage``, which may be entered many times (for
+    example once per page) and nested: the time of a nested stage is not
+    counted in the enclosing one. Stages are timed on the thread running
+    the pipeline; work done by prefetch threads shows up as the time the
+    pipeline spent waiting for it. Cache statistics count the lookups
+    made in this process since the run started.
+    """
+    PROMETHEUS_PREFIX = 'host_pipeline'
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.stages: Dict[str, StageMetrics] = {}
+        self.clients: Dict[str, Dict[str, Any]] = {}
+        self._cache_baseline = cache_statistics()
+        # Time of nested stages, to subtract from the enclosing stage
+        self._nested: List[float] = []
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageMetrics]:
+        """
+        Time a stage
+
+        :param name: Stage name
+        :return: Context manager yielding the metrics of the stage
+        """
+        metrics = self.stages.get(name)
+        if metrics is None:
+            metrics = self.stages[name] = StageMetrics(name)
+        started = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield metrics
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.wall_seconds += elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+            metrics.max_rss_so_far_bytes = peak_rss_bytes()
+
+    def timed(self, name: str, items: Iterator[Any]) -> Iterator[Any]:
+        """
+        Time the production of every item of a lazy stage
+
+        :param name: Stage name
+        :param items: Items produced by the stage
+        :return: The same items
+        """
+        iterator = iter(items)
+        while True:
+            with self.stage(name) as stage:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                records = len(item) if isinstance(item, list) else 1
+                stage.count(records, records)
+            yield item
+
+    def record_client(self, client) -> None:
+        """
+        Add the request statistics and page sizes of a client
+
+        :param client: Vendor client, sync or async
+        """
+        stats: RequestStats = client.request_stats
+        client_metrics: Dict[str, Any] = {
+            'requests': stats.requests,
+            'errors': stats.errors,
+            'latency_seconds': {str(quantile): latency for quantile, latency in stats.quantiles().items()},
+        }
+        if client.page_sizer is not None:
+            client_metrics['page_sizes'] = {str(size): pages for size, pages in client.page_sizer.summary().items()}
+        self.clients[client.SOURCE_SYSTEM] = client_metrics
+
+    def finish(self) -> None:
+        """
+        Stop the run clock
+        """
+        self.finished = time.perf_counter()
+
+    @property
+    def wall_seconds(self) -> float:
+        """
+        Wall time of the run so far, or until ``finish``
+        """
+        return (self.finished or time.perf_counter()) - self.started
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Structured summary of the run
+
+        :return: JSON-serializable summary
+        """
+        return {
+            'wall_seconds': round(self.wall_seconds, 6),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'stages': {
+                name: {
+                    'wall_seconds': round(stage.wall_seconds, 6),
+                    'records_in': stage.records_in,
+                    'records_out': stage.records_out,
+                    'records_per_second': round(stage.records_per_second, 2),
+                    'max_rss_so_far_bytes': stage.max_rss_so_far_bytes,
+                }
+                for name, stage in self.stages.items()
+            },
+            'clients': self.clients,
+            'caches': cache_statistics(self._cache_baseline),
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Render the run in the Prometheus text exposition format
+
+        :return: Metrics text
+        """
+        prefix = self.PROMETHEUS_PREFIX
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{label}"' for key, label in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}")
+
+        metric('run_seconds', 'gauge', "Wall time of the last run", [({}, self.wall_seconds)])
+        peak = peak_rss_bytes()
+        if peak is not None:
+            metric('peak_rss_bytes', 'gauge', "Peak resident set size of the last run", [({}, peak)])
+        stages = self.stages.values()
+        metric('stage_seconds', 'gauge', "Wall time spent in each stage",
+               [({'stage': stage.name}, stage.wall_seconds) for stage in stages])
+        metric('stage_records_in', 'gauge', "Records received by each stage",
+               [({'stage': stage.name}, stage.records_in) for stage in stages])
+        metric('stage_records_out', 'gauge', "Records produced by each stage",
+               [({'stage': stage.name}, stage.records_out) for stage in stages])
+        metric('client_requests', 'gauge', "HTTP requests sent to each vendor, retries included",
+               [({'source': source}, client['requests']) for source, client in self.clients.items()])
+        metric('client_request_errors', 'gauge', "Failed HTTP requests to each vendor",
+               [({'source': source}, client['errors']) for source, client in self.clients.items()])
+        metric('client_request_latency_seconds', 'gauge', "Request latency quantiles of each vendor", [
+            ({'source': source, 'quantile': quantile}, latency)
+            for source, client in self.clients.items()
+            for quantile, latency in client['latency_seconds'].items()
+        ])
+        caches = cache_statistics(self._cache_baseline)
+        metric('cache_hits', 'gauge', "Lookups answered by each memoization cache",
+               [({'cache': name}, cache['hits']) for name, cache in caches.items()])
+        metric('cache_misses', 'gauge', "Lookups missing each memoization cache",
+               [({'cache': name}, cache['misses']) for name, cache in caches.items()])
+        metric('cache_evictions', 'gauge', "Entries evicted from each memoization cache",
+               [({'cache': name}, cache['evictions']) for name, cache in caches.items()])
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Write the metrics to a file read by the node exporter textfile collector
+
+        :param path: File to write, replaced atomically
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, 'w') as metrics_file:
+            metrics_file.write(self.to_prometheus())
+        os.replace(temporary_path, path)
+
+    def report(self, summary_path: Optional[str] = None, prometheus_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Log the run summary and write it to the configured files
+
+        :param summary_path: File receiving the JSON summary
+        :param prometheus_path: File receiving the Prometheus metrics
+        :return: Run summary
+        """
+        if self.finished is None:
+            self.finish()
+        summary = self.summary()
+        self.logger.info(f"Run summary: {json.dumps(summary)}")
+        if summary_path:
+            directory = os.path.dirname(summary_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(summary_path, 'w') as summary_file:
+                json.dump(summary, summary_file, indent=2)
+        if prometheus_path:
+            self.write_prometheus(prometheus_path)
+        return summary
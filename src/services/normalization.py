@@ -1,11 +1,88 @@
 import re
-from typing import Dict, Any
+from dataclasses import dataclass, field, fields
+from typing import Dict, Any, List, Optional
+from src.models.host import Host
+from src.config.settings import settings
+from src.services.memo import memoized
+
+_IP_PATTERN = re.compile(r'^(\d{1,3}\.){3}\d{1,3}$')
+_MAC_SEPARATORS = re.compile(r'[.:-]')
+_MAC_PATTERN = re.compile(r'^([0-9a-f]{12})$')
+# Line-wise forms of the patterns above, applied to a whole column joined
+# with newlines
+_INVALID_IP_LINE = re.compile(r'^(?!(?:\d{1,3}\.){3}\d{1,3}$).*$', re.MULTILINE)
+_INVALID_MAC_LINE = re.compile(r'^(?![0-9a-f]{12}$).*$', re.MULTILINE)
+_HOST_FIELDS = frozenset(host_field.name for host_field in fields(Host))
+
+
+@dataclass
+class HostBatch:
+    """
+    Columnar page of normalized hosts
+
+    Each column holds one entry per record, or ``None`` where the record
+    did not have that key. ``records`` keeps the remaining keys of every
+    record untouched.
+    """
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    hostnames: List[Optional[str]] = field(default_factory=list)
+    ip_addresses: List[Optional[List[str]]] = field(default_factory=list)
+    mac_addresses: List[Optional[List[str]]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Row-wise view of the batch, the same as calling
+        ``HostNormalizer.normalize_host_data`` on every record
+
+        :return: Normalized host data dictionaries
+        """
+        normalized_records = []
+        for record, hostname, ips, macs in zip(
+            self.records, self.hostnames, self.ip_addresses, self.mac_addresses
+        ):
+            normalized_data = record.copy()
+            if hostname is not None:
+                normalized_data['hostname'] = hostname
+            if ips is not None:
+                normalized_data['ip_addresses'] = ips
+            if macs is not None:
+                normalized_data['mac_addresses'] = macs
+            normalized_records.append(normalized_data)
+        return normalized_records
+
+    def to_hosts(self) -> List[Host]:
+        """
+        Build Host objects from the batch, ignoring keys Host does not define
+
+        Each Host is built straight from its record and the normalized
+        columns, without an intermediate copy of the record.
+
+        :return: List of Host objects
+        """
+        hosts = []
+        for record, hostname, ips, macs in zip(
+            self.records, self.hostnames, self.ip_addresses, self.mac_addresses
+        ):
+            host_data = {k: v for k, v in record.items() if k in _HOST_FIELDS}
+            if hostname is not None:
+                host_data['hostname'] = hostname
+            if ips is not None:
+                host_data['ip_addresses'] = ips
+            if macs is not None:
+                host_data['mac_addresses'] = macs
+            hosts.append(Host(**host_data))
+        return hosts
+
 
 class HostNormalizer:
     """
     Service to normalize host data from different sources
     """
     @staticmethod
+    @memoized('normalize_hostname', settings.NORMALIZATION_CACHE_SIZE)
     def normalize_hostname(hostname: str) -> str:
         """
         Normalize hostname by removing domain and converting to lowercase
@@ -14,10 +91,11 @@ class HostNormalizer:
         :return: Normalized hostname
         """
         # Remove domain if present
-        hostname = hostname.split('.')[0]
+        hostname = hostname.split('.', 1)[0]
         return hostname.lower().strip()
 
     @staticmethod
+    @memoized('normalize_ip', settings.NORMALIZATION_CACHE_SIZE)
     def normalize_ip(ip: str) -> str:
         """
         Validate and normalize IP address
@@ -25,12 +103,12 @@ class HostNormalizer:
         :param ip: Input IP address
         :return: Normalized IP address or empty string
         """
-        ip_pattern = r'^(\d{1,3}\.){3}\d{1,3}$'
-        if re.match(ip_pattern, ip):
+        if _IP_PATTERN.match(ip):
             return ip.strip()
         return ''
 
     @staticmethod
+    @memoized('normalize_mac', settings.NORMALIZATION_CACHE_SIZE)
     def normalize_mac(mac: str) -> str:
         """
         Normalize MAC address
@@ -39,11 +117,10 @@ class HostNormalizer:
         :return: Normalized MAC address
         """
         # Remove separators and convert to lowercase
-        mac = re.sub(r'[.:-]', '', mac.lower())
+        mac = _MAC_SEPARATORS.sub('', mac.lower())
         
         # Validate MAC address format
-        mac_pattern = r'^([0-9a-f]{12})$'
-        if re.match(mac_pattern, mac):
+        if _MAC_PATTERN.match(mac):
             return ':'.join(mac[i:i+2] for i in range(0, 12, 2))
         return ''
 
@@ -66,15 +143,106 @@ class HostNormalizer:
         # Normalize IP addresses
         if 'ip_addresses' in normalized_data:
             normalized_data['ip_addresses'] = [
-                cls.normalize_ip(ip) for ip in normalized_data.get('ip_addresses', [])
-                if cls.normalize_ip(ip)
+                ip for ip in map(cls.normalize_ip, normalized_data.get('ip_addresses', []))
+                if ip
             ]
         
         # Normalize MAC addresses
         if 'mac_addresses' in normalized_data:
             normalized_data['mac_addresses'] = [
-                cls.normalize_mac(mac) for mac in normalized_data.get('mac_addresses', [])
-                if cls.normalize_mac(mac)
+                mac for mac in map(cls.normalize_mac, normalized_data.get('mac_addresses', []))
+                if mac
             ]
         
-        return normalized_data
\ No newline at end of file
+        return normalized_data
+
+    @staticmethod
+    def _joinable(values: List[str]) -> bool:
+        """
+        Check that a column can be processed as one newline-joined string
+        
+        :param values: Column values
+        :return: True if no value contains a newline
+        """
+        return not any('\n' in value for value in values)
+
+    @classmethod
+    def normalize_ips(cls, ips: List[str]) -> List[str]:
+        """
+        Normalize a column of IP addresses with a single regex pass
+        
+        :param ips: Input IP addresses
+        :return: Normalized IP addresses, empty strings for invalid ones
+        """
+        if not cls._joinable(ips):
+            return [cls.normalize_ip(ip) for ip in ips]
+        return _INVALID_IP_LINE.sub('', '\n'.join(ips)).split('\n')
+
+    @classmethod
+    def normalize_macs(cls, macs: List[str]) -> List[str]:
+        """
+        Normalize a column of MAC addresses with a single regex pass
+        
+        :param macs: Input MAC addresses
+        :return: Normalized MAC addresses, empty strings for invalid ones
+        """
+        if not cls._joinable(macs):
+            return [cls.normalize_mac(mac) for mac in macs]
+        column = _MAC_SEPARATORS.sub('', '\n'.join(macs).lower())
+        return [
+            f"{mac[0:2]}:{mac[2:4]}:{mac[4:6]}:{mac[6:8]}:{mac[8:10]}:{mac[10:12]}" if mac else ''
+            for mac in _INVALID_MAC_LINE.sub('', column).split('\n')
+        ]
+
+    @staticmethod
+    def _normalize_column(column: List[Optional[List[str]]], normalize) -> List[Optional[List[str]]]:
+        """
+        Normalize a column of value lists, computing each distinct value once
+        
+        :param column: One list of values per record, or None where absent
+        :param normalize: Function normalizing a list of values
+        :return: Normalized column with invalid values dropped
+        """
+        distinct_values = list(dict.fromkeys(
+            value for values in column if values for value in values
+        ))
+        normalized_values = dict(zip(distinct_values, normalize(distinct_values)))
+        return [
+            None if values is None else [
+                normalized for normalized in map(normalized_values.__getitem__, values)
+                if normalized
+            ]
+            for values in column
+        ]
+
+    @classmethod
+    def normalize_batch(cls, raw_hosts: List[Dict[str, Any]]) -> HostBatch:
+        """
+        Normalize a page of host data column by column
+        
+        Produces the same values as ``normalize_host_data`` on every record,
+        but each distinct IP and MAC in the page is normalized only once, and
+        each address column is validated with one regex pass.
+        
+        :param raw_hosts: Page of raw host data
+        :return: Columnar batch of normalized host data
+        """
+        hostnames = [
+            cls.normalize_hostname(raw_host['hostname']) if 'hostname' in raw_host else None
+            for raw_host in raw_hosts
+        ]
+        ip_column = [
+            (raw_host.get('ip_addresses') or []) if 'ip_addresses' in raw_host else None
+            for raw_host in raw_hosts
+        ]
+        mac_column = [
+            (raw_host.get('mac_addresses') or []) if 'mac_addresses' in raw_host else None
+            for raw_host in raw_hosts
+        ]
+        
+        return HostBatch(
+            records=raw_hosts,
+            hostnames=hostnames,
+            ip_addresses=cls._normalize_column(ip_column, cls.normalize_ips),
+            mac_addresses=cls._normalize_column(mac_column, cls.normalize_macs)
+        )
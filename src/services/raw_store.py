@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import zlib
+from typing import Any, Dict, Optional, Tuple
+from pymongo import UpdateOne
+from pymongo.collection import Collection
+from src.config.settings import settings
+from src.models.raw_data import LazyRawData
+from src.services.timestamps import utc_now
+
+RAW_DATA_STORES = ('memory', 'file', 'mongo')
+
+
+def compress_payload(raw_data: Dict[str, Any]) -> bytes:
+    """
+    Serialize a raw payload as zlib-compressed JSON
+
+    :param raw_data: Raw vendor payload
+    :return: Compressed bytes
+    """
+    return zlib.compress(
+        json.dumps(raw_data, separators=(',', ':'), default=str).encode(),
+        settings.RAW_DATA_COMPRESSION_LEVEL
+    )
+
+
+def decompress_payload(blob: bytes) -> Dict[str, Any]:
+    """
+    Read back a payload written by ``compress_payload``
+
+    :param blob: Compressed bytes
+    :return: Raw vendor payload
+    """
+    return json.loads(zlib.decompress(blob))
+
+
+class RawPayloadStore:
+    """
+    Side store for raw vendor payloads, so hosts only hold a reference
+    """
+    @staticmethod
+    def key(source_system: str, source_id: str) -> str:
+        """
+        Build the store key of a vendor record
+
+        :param source_system: Vendor name
+        :param source_id: Vendor record id
+        :return: Store key
+        """
+        return f"{source_system}:{source_id}"
+
+    def offload(self, source_system: str, source_id: str, raw_data: Dict[str, Any]) -> LazyRawData:
+        """
+        Store a payload and return the lazy ``raw_data`` replacing it
+
+        :param source_system: Vendor name
+        :param source_id: Vendor record id
+        :param raw_data: Raw vendor payload
+        :return: Lazy raw data loading the payload from this store
+        """
+        key = self.key(source_system, source_id)
+        self.put(key, raw_data)
+        return LazyRawData(((self, key),))
+
+    def put(self, key: str, raw_data: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def get(self, key: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """
+        Write any buffered payloads
+        """
+
+    def close(self) -> None:
+        """
+        Flush and release the store
+        """
+        self.flush()
+
+
+class FileRawStore(RawPayloadStore):
+    """
+    Payloads compressed into one anonymous temporary file per store
+
+    Payloads are appended to the file and located through an in-memory
+    offset index. The file is deleted once the store is closed or
+    garbage collected, i.e. when no host references it any more. Safe to
+    share between threads.
+    """
+    def __init__(self, directory: Optional[str] = None):
+        """
+        :param directory: Directory of the temporary file (defaults to ``RAW_DATA_DIR``)
+        """
+        directory = directory or settings.RAW_DATA_DIR
+        os.makedirs(directory, exist_ok=True)
+        self._file = tempfile.TemporaryFile(dir=directory, prefix='raw-')
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def put(self, key: str, raw_data: Dict[str, Any]) -> None:
+        blob = compress_payload(raw_data)
+        with self._lock:
+            self._file.seek(self._end)
+            self._file.write(blob)
+            self._offsets[key] = (self._end, len(blob))
+            self._end += len(blob)
+
+    def get(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            offset, length = self._offsets[key]
+            self._file.seek(offset)
+            blob = self._file.read(length)
+        return decompress_payload(blob)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class MongoRawStore(RawPayloadStore):
+    """
+    Payloads compressed into a MongoDB collection, one document per
+    vendor record keyed by source system and source id
+
+    Writes are buffered and upserted in ``bulk_write`` batches; payloads
+    still in the buffer are read from it. Payloads persist across runs.
+    Safe to share between threads.
+    """
+    def __init__(self, collection: Collection, batch_size: Optional[int] = None):
+        """
+        :param collection: Collection holding the payloads
+        :param batch_size: Number of payloads per ``bulk_write`` call
+        """
+        self.collection = collection
+        self.batch_size = batch_size or settings.STORAGE_BATCH_SIZE
+        self._pending: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def put(self, key: str, raw_data: Dict[str, Any]) -> None:
+        blob = compress_payload(raw_data)
+        with self._lock:
+            self._pending[key] = blob
+            if len(self._pending) >= self.batch_size:
+                self._write_pending()
+
+    def get(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            blob = self._pending.get(key)
+        if blob is None:
+            document = self.collection.find_one({'_id': key}, {'data': 1})
+            if document is None:
+                raise KeyError(key)
+            blob = document['data']
+        return decompress_payload(blob)
+
+    def _write_pending(self) -> None:
+        updated_at = utc_now()
+        self.collection.bulk_write([
+            UpdateOne({'_id': key}, {'$set': {'data': blob, 'updated_at': updated_at}}, upsert=True)
+            for key, blob in self._pending.items()
+        ], ordered=False)
+        self.logger.debug(f"Stored {len(self._pending)} raw payloads")
+        self._pending = {}
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._pending:
+                self._write_pending()
+
+
+def open_raw_store(db) -> Optional[RawPayloadStore]:
+    """
+    Open the raw payload store selected by ``RAW_DATA_STORE``
+
+    :param db: MongoDB database, used by the 'mongo' store
+    :return: Store, or None to keep payloads in memory
+    """
+    if settings.RAW_DATA_STORE not in RAW_DATA_STORES:
+        raise ValueError(
+            f"Unknown raw data store {settings.RAW_DATA_STORE!r}, expected one of {RAW_DATA_STORES}"
+        )
+    if settings.RAW_DATA_STORE == 'file':
+        return FileRawStore()
+    if settings.RAW_DATA_STORE == 'mongo':
+        return MongoRawStore(db['host_raw_data'])
+    return None
@@ -0,0 +1,386 @@
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from pymongo import ASCENDING, IndexModel, UpdateOne
+from pymongo.collection import Collection
+from pymongo.errors import BulkWriteError, OperationFailure
+from src.clients.retry import RetryPolicy
+from src.models.host import Host
+from src.config.settings import settings
+from src.services.streaming import chunked
+from src.services.timestamps import utc_now
+
+# Write error codes worth retrying: network errors, elections, shutdowns and
+# write conflicts. Anything else, such as a duplicate key (11000), fails
+# the same way every time.
+TRANSIENT_WRITE_ERRORS = frozenset({
+    6, 7, 50, 89, 91, 112, 189, 262, 9001, 10107, 11600, 11602, 13435, 13436
+})
+
+
+@dataclass
+class BulkWriteSummary:
+    """
+    Outcome of writing one batch of hosts
+    """
+    batch: int
+    operations: int
+    matched: int = 0
+    modified: int = 0
+    upserted: int = 0
+    skipped: int = 0
+    failed: int = 0
+    retries: int = 0
+
+
+class HostRepository:
+    """
+    Storage layer for unified hosts, writing upserts in unordered
+    ``bulk_write`` batches
+    """
+    # Upserts filter on the canonical id; the others back host lookups.
+    # Source fields are not unique: records without a source id share them,
+    # and a merged host is written before the documents merged into it are
+    # deleted
+    INDEXES = [
+        IndexModel([('id', ASCENDING)], name='id', unique=True),
+        IndexModel(
+            [('source_system', ASCENDING), ('source_id', ASCENDING)],
+            name='source_system_source_id'
+        ),
+        IndexModel([('hostname', ASCENDING)], name='hostname'),
+        IndexModel([('ip_addresses', ASCENDING)], name='ip_addresses'),
+        IndexModel([('mac_addresses', ASCENDING)], name='mac_addresses'),
+        IndexModel([('last_seen', ASCENDING)], name='last_seen'),
+    ]
+
+    def __init__(
+        self,
+        collection: Collection,
+        batch_size: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None
+    ):
+        """
+        :param collection: Collection holding the unified hosts
+        :param batch_size: Number of upserts per ``bulk_write`` call
+        :param max_retries: Number of times failed operations are retried
+        :param backoff_base: Backoff ceiling of the first retry, in seconds
+        """
+        self.collection = collection
+        self.batch_size = batch_size or settings.STORAGE_BATCH_SIZE
+        self.max_retries = settings.STORAGE_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_policy = RetryPolicy(
+            max_retries=self.max_retries,
+            backoff_base=settings.STORAGE_BACKOFF_BASE if backoff_base is None else backoff_base,
+            backoff_max=settings.STORAGE_BACKOFF_MAX
+        )
+        self._batch_numbers = count(1)
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def ensure_indexes(self) -> List[str]:
+        """
+        Create any missing indexes of the hosts collection
+
+        Safe to call on every startup: existing indexes are left alone and
+        only the missing ones are built.
+
+        :return: Names of indexes that are still missing afterwards
+        """
+        missing = self._missing_indexes()
+        if not missing:
+            self.logger.debug("All host indexes are present")
+            return []
+
+        existing = self._existing_indexes()
+        for index in missing:
+            self.logger.warning(f"Missing index {index.document['name']} on {self.collection.name}, building it")
+
+        start = time.perf_counter()
+        for index in missing:
+            try:
+                outdated = existing.get(self._index_key(index))
+                if outdated is not None:
+                    # Same key with other options, e.g. an index that used to be unique
+                    self.logger.warning(f"Dropping index {outdated} to rebuild it with new options")
+                    self.collection.drop_index(outdated)
+                self.collection.create_indexes([index])
+            except OperationFailure as e:
+                self.logger.error(f"Could not build index {index.document['name']}: {e}")
+        elapsed = time.perf_counter() - start
+
+        still_missing = [index.document['name'] for index in self._missing_indexes()]
+        self.logger.info(f"Built {len(missing) - len(still_missing)} host indexes in {elapsed:.2f}s")
+        for name in still_missing:
+            self.logger.warning(f"Index {name} is missing; upserts and lookups on it will scan the collection")
+        return still_missing
+
+    @staticmethod
+    def _index_key(index: IndexModel) -> tuple:
+        """
+        Key pattern of an index model
+
+        :param index: Index model
+        :return: Key pattern as a tuple of (field, direction) pairs
+        """
+        return tuple(index.document['key'].items())
+
+    def _existing_indexes(self) -> Dict[tuple, str]:
+        """
+        Look up the indexes of the hosts collection
+
+        :return: Index name by key pattern
+        """
+        return {
+            tuple(tuple(key) for key in info['key']): name
+            for name, info in self.collection.index_information().items()
+        }
+
+    def _missing_indexes(self) -> List[IndexModel]:
+        """
+        Find expected indexes whose key pattern is not indexed yet, or
+        indexed with another uniqueness, so indexes created under another
+        name still count
+
+        :return: Missing index models
+        """
+        existing = {
+            tuple(tuple(key) for key in info['key']): bool(info.get('unique'))
+            for info in self.collection.index_information().values()
+        }
+        return [
+            index for index in self.INDEXES
+            if existing.get(self._index_key(index)) != bool(index.document.get('unique'))
+        ]
+
+    @staticmethod
+    def document(host: Host) -> Dict[str, Any]:
+        """
+        Build the stored fields of a host, including a hash of its content
+
+        The hash leaves out the ``id`` and ``processed_at``, so it only
+        changes when the host itself does.
+
+        :param host: Host to store
+        :return: Document fields
+        """
+        host_data = host.to_dict()
+        host_data['source_id'] = host.source_id
+        host_data['merged_sources'] = [list(record) for record in host.merged_sources]
+        hashed = dict(host_data)
+        del hashed['id']
+        hashed['ip_addresses'] = sorted(hashed['ip_addresses'])
+        hashed['mac_addresses'] = sorted(hashed['mac_addresses'])
+        host_data['content_hash'] = hashlib.sha1(
+            json.dumps(hashed, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return host_data
+
+    @staticmethod
+    def upsert_operation(host: Host, host_data: Optional[Dict[str, Any]] = None) -> UpdateOne:
+        """
+        Build the upsert for a host, keyed on its canonical id
+
+        :param host: Host to store
+        :param host_data: Precomputed document fields of the host
+        :return: Update operation
+        """
+        host_data = dict(host_data or HostRepository.document(host))
+        host_data['processed_at'] = utc_now()
+        return UpdateOne(
+            {'id': host.id},
+            {'$set': host_data},
+            upsert=True
+        )
+
+    def find_matching_hosts(self, hosts: Iterable[Host]) -> List[Host]:
+        """
+        Load stored hosts sharing an IP or MAC address with any of the given
+        hosts, using the address indexes
+
+        :param hosts: Newly arrived hosts
+        :return: Stored hosts that may be duplicates of them
+        """
+        matches: Dict[Any, Host] = {}
+        for batch in chunked(hosts, self.batch_size):
+            ip_addresses = list({ip for host in batch for ip in host.ip_addresses})
+            mac_addresses = list({mac for host in batch for mac in host.mac_addresses})
+            query = {'$or': [
+                {'ip_addresses': {'$in': ip_addresses}},
+                {'mac_addresses': {'$in': mac_addresses}}
+            ]}
+            for document in self.collection.find(query):
+                matches[document['_id']] = Host.from_dict(document)
+
+        self.logger.debug(f"Found {len(matches)} stored hosts matching new arrivals")
+        return list(matches.values())
+
+    def iter_hosts(self) -> Iterator[Host]:
+        """
+        Stream every stored host, ``batch_size`` documents per round trip
+
+        :return: Iterator over stored hosts
+        """
+        projection = {'_id': 0, 'content_hash': 0, 'processed_at': 0}
+        for document in self.collection.find({}, projection, batch_size=self.batch_size):
+            yield Host.from_dict(document)
+
+    def delete_hosts(self, host_ids: Iterable[str]) -> List[str]:
+        """
+        Delete the documents of hosts that were merged into another host
+
+        :param host_ids: Ids of the merged hosts
+        :return: Ids that had a stored document
+        """
+        deleted: List[str] = []
+        for batch in chunked(host_ids, self.batch_size):
+            stored_ids = self.collection.distinct('id', {'id': {'$in': batch}})
+            if stored_ids:
+                self.collection.delete_many({'id': {'$in': stored_ids}})
+                deleted.extend(stored_ids)
+
+        if deleted:
+            self.logger.info(f"Deleted {len(deleted)} hosts merged into other hosts")
+        return deleted
+
+    def host_statistics(self, now: Optional[datetime] = None, active_days: int = 30) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Aggregate the stored hosts server side, for dashboards
+
+        A single ``$facet`` aggregation returns the host count, active
+        count and mean vulnerability count of every operating system
+        (missing, null and empty ones grouped as 'Unknown', like
+        ``HostDataVisualizer.summarize_frame`` does), and the number of
+        hosts last seen on every day. Timestamps are
+        stored as UTC ISO 8601 strings, so they are compared and cut to
+        days as strings.
+
+        :param now: Reference time (defaults to the current UTC time)
+        :param active_days: Hosts seen within this many days count as active
+        :return: ``by_os`` and ``by_last_seen_day`` rows
+        """
+        cutoff = ((now or utc_now()) - timedelta(days=active_days)).isoformat()
+        pipeline = [{'$facet': {
+            'by_os': [
+                {'$group': {
+                    '_id': {'$cond': [
+                        {'$in': [{'$ifNull': ['$operating_system', None]}, [None, '']]},
+                        'Unknown',
+                        '$operating_system'
+                    ]},
+                    'hosts': {'$sum': 1},
+                    'active': {'$sum': {'$cond': [{'$gt': ['$last_seen', cutoff]}, 1, 0]}},
+                    'mean_vulnerability_count': {'$avg': '$vulnerability_count'},
+                }},
+                {'$sort': {'hosts': -1, '_id': 1}},
+            ],
+            'by_last_seen_day': [
+                {'$group': {'_id': {'$substr': ['$last_seen', 0, 10]}, 'hosts': {'$sum': 1}}},
+                {'$sort': {'_id': 1}},
+            ],
+        }}]
+        return next(self.collection.aggregate(pipeline))
+
+    def upsert_hosts(
+        self,
+        hosts: Iterable[Host],
+        skip_unchanged: bool = False
+    ) -> List[BulkWriteSummary]:
+        """
+        Upsert hosts in batches of ``batch_size``
+
+        :param hosts: Hosts to store
+        :param skip_unchanged: Skip hosts whose stored document has the same content hash
+        :return: Summary of every batch written
+        """
+        return [
+            self.upsert_batch(batch, skip_unchanged=skip_unchanged)
+            for batch in chunked(hosts, self.batch_size)
+        ]
+
+    def upsert_batch(self, hosts: List[Host], skip_unchanged: bool = False) -> BulkWriteSummary:
+        """
+        Upsert one batch of hosts with a single unordered ``bulk_write``
+
+        When some operations fail with a transient error, only those are
+        retried, up to ``max_retries`` times after a jittered exponential
+        backoff, so a failover or write conflict is not hammered. Other
+        errors, such as duplicate keys, are logged and counted as failed
+        right away.
+
+        :param hosts: Hosts to store
+        :param skip_unchanged: Skip hosts whose stored document has the same content hash
+        :return: Summary of the batch
+        """
+        documents = [self.document(host) for host in hosts]
+        summary = BulkWriteSummary(batch=next(self._batch_numbers), operations=len(documents))
+
+        if skip_unchanged:
+            stored_hashes = {
+                document['id']: document.get('content_hash') for document in self.collection.find(
+                    {'id': {'$in': [host.id for host in hosts]}},
+                    {'id': 1, 'content_hash': 1}
+                )
+            }
+        else:
+            stored_hashes = {}
+
+        operations = [
+            self.upsert_operation(host, host_data)
+            for host, host_data in zip(hosts, documents)
+            if stored_hashes.get(host.id) != host_data['content_hash']
+        ]
+        summary.skipped = summary.operations - len(operations)
+
+        pending = operations
+        while pending:
+            try:
+                result = self.collection.bulk_write(pending, ordered=False)
+                details = result.bulk_api_result
+                pending = []
+            except BulkWriteError as e:
+                details = e.details
+                errors = details.get('writeErrors', [])
+                permanent = [error for error in errors if error.get('code') not in TRANSIENT_WRITE_ERRORS]
+                for error in permanent:
+                    self.logger.error(
+                        f"Batch {summary.batch}: operation {error['index']} failed "
+                        f"with error {error.get('code')}: {error.get('errmsg')}"
+                    )
+                summary.failed += len(permanent)
+                transient_indexes = sorted({
+                    error['index'] for error in errors if error.get('code') in TRANSIENT_WRITE_ERRORS
+                })
+                if transient_indexes:
+                    self.logger.warning(
+                        f"Batch {summary.batch}: {len(transient_indexes)} of {len(pending)} "
+                        f"operations failed with transient errors"
+                    )
+                pending = [pending[index] for index in transient_indexes]
+
+            summary.matched += details.get('nMatched', 0)
+            summary.modified += details.get('nModified', 0)
+            summary.upserted += details.get('nUpserted', 0)
+
+            if pending and summary.retries >= self.max_retries:
+                summary.failed += len(pending)
+                self.logger.error(
+                    f"Batch {summary.batch}: giving up on {len(pending)} operations "
+                    f"after {summary.retries} retries"
+                )
+                break
+            if pending:
+                time.sleep(self.retry_policy.delay(summary.retries))
+                summary.retries += 1
+
+        self.logger.info(
+            f"Batch {summary.batch}: {summary.operations} operations, "
+            f"{summary.matched} matched, {summary.upserted} upserted, "
+            f"{summary.modified} modified, {summary.skipped} unchanged, {summary.failed} failed"
+        )
+        return summary
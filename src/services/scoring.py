@@ -0,0 +1,197 @@
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Sequence
+from src.models.host import Host
+
+# Early exits need to beat the threshold by this margin, so a decision
+# never hinges on the rounding of partial sums
+_EPSILON = 1e-9
+
+
+@dataclass
+class CheckStats:
+    """
+    Counters of one similarity check or match rule
+    """
+    evaluations: int = 0
+    hits: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class ScoringStats:
+    """
+    Counters describing how duplicate decisions were reached
+    """
+    decisions: int = 0
+    rule_matches: int = 0
+    early_accepts: int = 0
+    early_rejects: int = 0
+    checks: Dict[str, CheckStats] = field(default_factory=dict)
+
+    def add(self, other: 'ScoringStats') -> None:
+        """
+        Add the counters of another run, e.g. of a worker process
+
+        :param other: Counters to add
+        """
+        self.decisions += other.decisions
+        self.rule_matches += other.rule_matches
+        self.early_accepts += other.early_accepts
+        self.early_rejects += other.early_rejects
+        for name, other_check in other.checks.items():
+            check = self.checks.setdefault(name, CheckStats())
+            check.evaluations += other_check.evaluations
+            check.hits += other_check.hits
+            check.skipped += other_check.skipped
+
+
+@dataclass
+class SimilarityCheck:
+    """
+    Weighted check contributing a 0-1 score to the host similarity
+    """
+    name: str
+    function: Callable[[Host, Host], float]
+    weight: float = 1.0
+    # Relative cost, used to evaluate cheap checks first
+    cost: int = 1
+
+
+@dataclass
+class MatchRule:
+    """
+    Deterministic rule: hosts it holds for are duplicates regardless of score
+    """
+    name: str
+    predicate: Callable[[Host, Host], bool]
+
+
+def same_mac_address(host1: Host, host2: Host) -> bool:
+    """
+    Hosts sharing a MAC address are the same machine
+
+    :param host1: First host
+    :param host2: Second host
+    :return: True if the hosts share a MAC address
+    """
+    return not set(host1.mac_addresses).isdisjoint(host2.mac_addresses)
+
+
+SAME_MAC_RULE = MatchRule('same_mac', same_mac_address)
+
+
+class WeightedScorer:
+    """
+    Weighted average of similarity checks with early exit
+
+    Deciding whether two hosts are duplicates evaluates the checks from
+    cheap to expensive and stops as soon as the threshold is guaranteed to
+    be met, or can no longer be met. Match rules are tried before any
+    check. Scores are summed in the order the checks were given, so an
+    undecided pair gets exactly the score ``score`` computes.
+    """
+    def __init__(self, checks: Sequence[SimilarityCheck], rules: Sequence[MatchRule] = ()):
+        """
+        :param checks: Similarity checks; checks with a zero weight are dropped
+        :param rules: Deterministic match rules
+        """
+        self.checks = [check for check in checks if check.weight > 0]
+        self._evaluation_order = sorted(self.checks, key=lambda check: check.cost)
+        self.rules = list(rules)
+        self.total_weight = sum(check.weight for check in self.checks)
+        if not self.total_weight:
+            raise ValueError("At least one similarity check needs a positive weight")
+        self.stats = ScoringStats()
+
+    def reset_stats(self) -> ScoringStats:
+        """
+        Start a new set of counters
+
+        :return: The new counters
+        """
+        self.stats = ScoringStats(checks={
+            name: CheckStats()
+            for name in [rule.name for rule in self.rules] + [check.name for check in self.checks]
+        })
+        return self.stats
+
+    def _check_stats(self, name: str) -> CheckStats:
+        return self.stats.checks.setdefault(name, CheckStats())
+
+    def score(self, host1: Host, host2: Host) -> float:
+        """
+        Weighted similarity of two hosts, evaluating every check
+
+        :param host1: First host
+        :param host2: Second host
+        :return: Similarity score (0-1)
+        """
+        return sum(
+            check.weight * check.function(host1, host2) for check in self.checks
+        ) / self.total_weight
+
+    def max_score_without(self, *names: str) -> float:
+        """
+        Highest score reachable when the named checks score zero
+
+        :param names: Names of checks assumed to score zero
+        :return: Upper bound of the score (0-1)
+        """
+        return sum(
+            check.weight for check in self.checks if check.name not in names
+        ) / self.total_weight
+
+    def is_match(self, host1: Host, host2: Host, threshold: float) -> bool:
+        """
+        Decide whether two hosts are duplicates
+
+        :param host1: First host
+        :param host2: Second host
+        :param threshold: Minimum similarity to consider hosts duplicates
+        :return: True if the hosts are duplicates
+        """
+        stats = self.stats
+        stats.decisions += 1
+
+        for rule in self.rules:
+            rule_stats = self._check_stats(rule.name)
+            rule_stats.evaluations += 1
+            if rule.predicate(host1, host2):
+                rule_stats.hits += 1
+                stats.rule_matches += 1
+                return True
+
+        required = threshold * self.total_weight
+        achieved = 0.0
+        remaining = self.total_weight
+        scores: Dict[str, float] = {}
+        last = len(self._evaluation_order) - 1
+
+        for position, check in enumerate(self._evaluation_order):
+            check_stats = self._check_stats(check.name)
+            check_stats.evaluations += 1
+            check_score = check.function(host1, host2)
+            if check_score > 0:
+                check_stats.hits += 1
+            scores[check.name] = check_score
+            achieved += check.weight * check_score
+            remaining -= check.weight
+            if position == last:
+                break
+
+            exit_early = None
+            if achieved >= required + _EPSILON:
+                stats.early_accepts += 1
+                exit_early = True
+            elif achieved + remaining < required - _EPSILON:
+                stats.early_rejects += 1
+                exit_early = False
+            if exit_early is not None:
+                for skipped in self._evaluation_order[position + 1:]:
+                    self._check_stats(skipped.name).skipped += 1
+                return exit_early
+
+        # Undecided until the end: compare the full score exactly as score() does
+        return sum(
+            check.weight * scores[check.name] for check in self.checks
+        ) / self.total_weight >= threshold
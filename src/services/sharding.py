@@ -0,0 +1,203 @@
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+from src.models.host import Host
+from src.services.blocking import BlockingIndex, BlockingKey
+from src.services.clustering import DisjointSet
+from src.services.scoring import ScoringStats
+
+if TYPE_CHECKING:  # pragma: no cover - import cycle at runtime
+    from src.services.deduplication import HostDeduplicator
+
+# Rank of a host in the block of each of its keys
+HostKeys = Dict[BlockingKey, int]
+
+
+@dataclass
+class Shard:
+    """
+    Blocks of the keys hashed to one shard, with the hosts they contain
+    """
+    blocks: Dict[BlockingKey, List[int]] = field(default_factory=dict)
+    hosts: Dict[int, Host] = field(default_factory=dict)
+    host_keys: Dict[int, HostKeys] = field(default_factory=dict)
+
+
+@dataclass
+class ShardResult:
+    """
+    Matches found in one shard
+    """
+    matches: List[Tuple[int, int]]
+    candidate_pairs: int
+    pairs_scored: int
+    scoring: ScoringStats
+
+
+def shard_of(key: BlockingKey, shards: int) -> int:
+    """
+    Shard a blocking key is assigned to, stable across processes
+
+    :param key: Blocking key
+    :param shards: Number of shards
+    :return: Shard number
+    """
+    return zlib.crc32(repr(key).encode()) % shards
+
+
+def build_shards(hosts: Sequence[Host], index: BlockingIndex, shards: int) -> List[Shard]:
+    """
+    Partition hosts into shards by blocking key
+
+    A host is copied into every shard holding one of its keys, without
+    its raw payload, which scoring does not use.
+
+    :param hosts: Hosts in canonical order; positions identify them
+    :param index: Blocking index defining the keys of every host
+    :param shards: Number of shards
+    :return: Shards, some possibly empty
+    """
+    blocks: Dict[BlockingKey, List[int]] = defaultdict(list)
+    host_keys: List[HostKeys] = []
+    for position, host in enumerate(hosts):
+        ranks = {}
+        for key in index.keys(host):
+            block = blocks[key]
+            ranks[key] = len(block)
+            block.append(position)
+        host_keys.append(ranks)
+
+    slim_hosts: Dict[int, Host] = {}
+    partitions = [Shard() for _ in range(shards)]
+    for key, block in blocks.items():
+        if len(block) < 2:
+            continue
+        shard = partitions[shard_of(key, shards)]
+        shard.blocks[key] = block
+        for position in block:
+            if position not in shard.hosts:
+                if position not in slim_hosts:
+                    slim_hosts[position] = replace(hosts[position], raw_data={})
+                shard.hosts[position] = slim_hosts[position]
+                shard.host_keys[position] = host_keys[position]
+    return partitions
+
+
+def _first_generating_key(
+    index: BlockingIndex,
+    first_keys: List[BlockingKey],
+    second: HostKeys
+) -> Optional[BlockingKey]:
+    """
+    Smallest shared key under which ``BlockingIndex.candidate_pairs``
+    pairs two hosts
+
+    :param index: Blocking index defining the keys
+    :param first_keys: Sorted keys of the earlier host
+    :param second: Key ranks of the later host
+    :return: Smallest generating key
+    """
+    for key in first_keys:
+        rank = second.get(key)
+        if rank is not None and (not index.is_fuzzy(key) or rank <= index.max_block_size):
+            return key
+    return None
+
+
+def match_shard(
+    deduplicator: 'HostDeduplicator',
+    index: BlockingIndex,
+    shard: Shard,
+    similarity_threshold: float
+) -> ShardResult:
+    """
+    Score the candidate pairs of a shard
+
+    A pair is scored only in the shard of its smallest shared key, so
+    every pair is scored once overall. Pairs already connected through
+    earlier matches of the shard are skipped, and only the matches that
+    join two clusters are returned.
+
+    :param deduplicator: Deduplicator providing the scorer
+    :param index: Blocking index defining the keys
+    :param shard: Shard to score
+    :param similarity_threshold: Minimum similarity to consider hosts duplicates
+    :return: Matches of the shard
+    """
+    scoring = deduplicator.scorer.reset_stats()
+    positions = sorted(shard.hosts)
+    local = {position: i for i, position in enumerate(positions)}
+    clusters = DisjointSet(len(positions))
+    result = ShardResult(matches=[], candidate_pairs=0, pairs_scored=0, scoring=scoring)
+
+    sorted_keys = {position: sorted(keys) for position, keys in shard.host_keys.items()}
+
+    for key, block in shard.blocks.items():
+        limit = index.max_block_size if index.is_fuzzy(key) else None
+        for rank, second in enumerate(block):
+            if limit is not None and rank > limit:
+                break
+            second_keys = shard.host_keys[second]
+            for first in block[:rank]:
+                first_keys = sorted_keys[first]
+                # Fast path: the block key is the smallest key of the earlier host
+                if first_keys[0] != key and _first_generating_key(index, first_keys, second_keys) != key:
+                    continue
+                result.candidate_pairs += 1
+                if clusters.find(local[first]) == clusters.find(local[second]):
+                    continue
+                result.pairs_scored += 1
+                if deduplicator.is_duplicate(shard.hosts[first], shard.hosts[second], similarity_threshold):
+                    clusters.union(local[first], local[second])
+                    result.matches.append((first, second))
+    return result
+
+
+# Per-process state of the worker pool
+_worker_deduplicator: Optional['HostDeduplicator'] = None
+
+
+def _init_worker(deduplicator: 'HostDeduplicator') -> None:
+    global _worker_deduplicator
+    _worker_deduplicator = deduplicator
+
+
+def _match_shard_in_worker(args) -> ShardResult:
+    index, shard, similarity_threshold = args
+    return match_shard(_worker_deduplicator, index, shard, similarity_threshold)
+
+
+def parallel_matches(
+    deduplicator: 'HostDeduplicator',
+    hosts: Sequence[Host],
+    index: BlockingIndex,
+    similarity_threshold: float,
+    workers: int,
+    shards_per_worker: int = 4
+) -> List[ShardResult]:
+    """
+    Score the candidate pairs of every shard in a process pool
+
+    :param deduplicator: Deduplicator providing the scorer
+    :param hosts: Hosts in canonical order
+    :param index: Empty blocking index defining the keys
+    :param similarity_threshold: Minimum similarity to consider hosts duplicates
+    :param workers: Number of worker processes
+    :param shards_per_worker: Shards per worker, more balance the load better
+    :return: Result of every non-empty shard
+    """
+    shards = [
+        shard for shard in build_shards(hosts, index, workers * shards_per_worker)
+        if shard.blocks
+    ]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(deduplicator,)
+    ) as executor:
+        return list(executor.map(
+            _match_shard_in_worker,
+            [(index, shard, similarity_threshold) for shard in shards]
+        ))
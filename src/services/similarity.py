@@ -0,0 +1,196 @@
+import hashlib
+import random
+from operator import eq
+from difflib import SequenceMatcher
+from typing import FrozenSet, Hashable, Optional, Set, Tuple
+from src.config.settings import settings
+from src.services.memo import MISSING, LRUCache
+
+# Mersenne prime used for the MinHash permutations
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+class HostnameSimilarity:
+    """
+    Pluggable hostname similarity backend used by ``HostDeduplicator``
+
+    Backends may precompute a representation once per hostname and may
+    provide locality-sensitive hashing keys for candidate lookup.
+    """
+    name = ''
+
+    def similarity(self, hostname1: str, hostname2: str) -> float:
+        """
+        Compute the similarity of two hostnames
+
+        :param hostname1: First hostname
+        :param hostname2: Second hostname
+        :return: Similarity score (0-1)
+        """
+        raise NotImplementedError
+
+    def lsh_keys(self, hostname: str) -> Optional[Set[Hashable]]:
+        """
+        Compute LSH bucket keys for a hostname
+
+        :param hostname: Hostname to bucket
+        :return: Bucket keys, or None if the backend does not support LSH
+        """
+        return None
+
+
+class SequenceMatcherSimilarity(HostnameSimilarity):
+    """
+    ``difflib.SequenceMatcher`` ratio, the historical behaviour
+    """
+    name = 'sequence'
+
+    def similarity(self, hostname1: str, hostname2: str) -> float:
+        return SequenceMatcher(None, hostname1, hostname2).ratio()
+
+
+class ShingleSimilarity(HostnameSimilarity):
+    """
+    Jaccard similarity of character shingle sets
+
+    The shingle set of every hostname is computed once and kept in an LRU
+    cache, so scoring a pair is a single set intersection.
+    """
+    name = 'shingle'
+
+    def __init__(self, shingle_size: int = 2):
+        """
+        :param shingle_size: Number of characters per shingle
+        """
+        self.shingle_size = shingle_size
+        self._shingles = LRUCache('hostname_shingles', settings.SIMILARITY_CACHE_SIZE)
+
+    def shingles(self, hostname: str) -> FrozenSet[str]:
+        """
+        Character shingles of a hostname, cached per hostname
+
+        :param hostname: Hostname to split
+        :return: Set of shingles
+        """
+        shingles = self._shingles.get(hostname)
+        if shingles is MISSING:
+            size = self.shingle_size
+            if len(hostname) <= size:
+                shingles = frozenset([hostname]) if hostname else frozenset()
+            else:
+                shingles = frozenset(hostname[i:i + size] for i in range(len(hostname) - size + 1))
+            self._shingles.put(hostname, shingles)
+        return shingles
+
+    def similarity(self, hostname1: str, hostname2: str) -> float:
+        if hostname1 == hostname2:
+            return 1.0
+        shingles1 = self.shingles(hostname1)
+        shingles2 = self.shingles(hostname2)
+        union = len(shingles1 | shingles2)
+        return len(shingles1 & shingles2) / union if union else 0.0
+
+
+class MinHashSimilarity(ShingleSimilarity):
+    """
+    MinHash estimate of the shingle Jaccard similarity
+
+    Signatures are computed once per hostname. With ``bands`` set, the
+    signature is split into bands whose hashes serve as LSH keys, so
+    hostnames with a high Jaccard similarity share a bucket.
+    """
+    name = 'minhash'
+
+    def __init__(
+        self,
+        shingle_size: int = 2,
+        num_permutations: int = 128,
+        bands: Optional[int] = 32,
+        seed: int = 1
+    ):
+        """
+        :param shingle_size: Number of characters per shingle
+        :param num_permutations: Length of the MinHash signatures
+        :param bands: Number of LSH bands (None disables LSH keys)
+        :param seed: Seed of the hash permutations, fixed so signatures
+            are stable across processes
+        """
+        super().__init__(shingle_size)
+        if bands is not None and num_permutations % bands:
+            raise ValueError("num_permutations must be a multiple of bands")
+        self.num_permutations = num_permutations
+        self.bands = bands
+        rng = random.Random(seed)
+        self._permutations = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(_MERSENNE_PRIME))
+            for _ in range(num_permutations)
+        ]
+        self._signatures = LRUCache('hostname_signatures', settings.SIMILARITY_CACHE_SIZE)
+
+    def signature(self, hostname: str) -> Tuple[int, ...]:
+        """
+        MinHash signature of a hostname, cached per hostname
+
+        :param hostname: Hostname to sign
+        :return: Signature of ``num_permutations`` values
+        """
+        signature = self._signatures.get(hostname)
+        if signature is MISSING:
+            # blake2b rather than hash() so signatures do not depend on
+            # PYTHONHASHSEED; crc32 values of similar shingles are too
+            # regular for the linear permutations and biased the estimate low
+            hashes = [
+                int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big') % _MERSENNE_PRIME
+                for shingle in self.shingles(hostname)
+            ]
+            if hashes:
+                signature = tuple(
+                    min((a * value + b) % _MERSENNE_PRIME for value in hashes)
+                    for a, b in self._permutations
+                )
+            else:
+                signature = ()
+            self._signatures.put(hostname, signature)
+        return signature
+
+    def similarity(self, hostname1: str, hostname2: str) -> float:
+        if hostname1 == hostname2:
+            return 1.0
+        signature1 = self.signature(hostname1)
+        signature2 = self.signature(hostname2)
+        if not signature1 or not signature2:
+            return 0.0
+        return sum(map(eq, signature1, signature2)) / self.num_permutations
+
+    def lsh_keys(self, hostname: str) -> Optional[Set[Hashable]]:
+        if self.bands is None:
+            return None
+        signature = self.signature(hostname)
+        if not signature:
+            return set()
+        rows = self.num_permutations // self.bands
+        return {
+            (band, signature[band * rows:(band + 1) * rows])
+            for band in range(self.bands)
+        }
+
+
+HOSTNAME_SIMILARITIES = {
+    backend.name: backend
+    for backend in (SequenceMatcherSimilarity, ShingleSimilarity, MinHashSimilarity)
+}
+
+
+def get_hostname_similarity(name: str) -> HostnameSimilarity:
+    """
+    Build a hostname similarity backend by name
+
+    :param name: Backend name ('sequence', 'shingle' or 'minhash')
+    :return: Hostname similarity backend
+    """
+    try:
+        return HOSTNAME_SIMILARITIES[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown hostname similarity {name!r}, expected one of {sorted(HOSTNAME_SIMILARITIES)}"
+        ) from None
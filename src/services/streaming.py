@@ -0,0 +1,99 @@
+import queue
+import threading
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar('T')
+
+_END = object()
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """
+    Split an iterable into lists of at most ``size`` items
+
+    :param items: Items to split
+    :param size: Maximum number of items per chunk
+    :return: Iterator over chunks
+    """
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class PrefetchIterator(Iterator[T]):
+    """
+    Iterator that consumes an iterable on a background thread, buffering
+    at most ``buffer_size`` items ahead of the reader
+
+    The producer starts on construction, so several prefetched streams
+    make progress at the same time while each one stays bounded.
+    Exceptions raised by the producer are re-raised in the reader.
+    """
+    def __init__(self, items: Iterable[T], buffer_size: int):
+        self._buffer: queue.Queue = queue.Queue(maxsize=max(buffer_size, 1))
+        self._stopped = threading.Event()
+        self._done = False
+        threading.Thread(target=self._produce, args=(items,), daemon=True).start()
+
+    def _produce(self, items: Iterable[T]) -> None:
+        """
+        Push items into the buffer until exhausted or closed
+
+        :param items: Items to produce
+        """
+        try:
+            for item in items:
+                if not self._put(item):
+                    return
+            self._put(_END)
+        except BaseException as e:
+            self._put(e)
+
+    def _put(self, item) -> bool:
+        """
+        Wait for room in the buffer, giving up once the reader has closed
+
+        :param item: Item to buffer
+        :return: False if the iterator was closed
+        """
+        while not self._stopped.is_set():
+            try:
+                self._buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def __next__(self) -> T:
+        if self._done:
+            raise StopIteration
+        item = self._buffer.get()
+        if item is _END:
+            self.close()
+            raise StopIteration
+        if isinstance(item, BaseException):
+            self.close()
+            raise item
+        return item
+
+    def close(self) -> None:
+        """
+        Stop the producer and discard anything still buffered
+        """
+        self._done = True
+        self._stopped.set()
+
+
+def prefetch(items: Iterable[T], buffer_size: int) -> PrefetchIterator[T]:
+    """
+    Start consuming an iterable in the background with a bounded buffer
+
+    :param items: Items to produce in the background
+    :param buffer_size: Maximum number of items buffered ahead
+    :return: Iterator over the same items, in order
+    """
+    return PrefetchIterator(items, buffer_size)
@@ -0,0 +1,75 @@
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+from pymongo.collection import Collection
+from src.models.host import Host
+from src.services.timestamps import as_utc, utc_now
+
+
+class SyncState:
+    """
+    Per-source ``last_seen`` high-watermarks for incremental syncs,
+    persisted in MongoDB
+
+    Only ``last_seen`` values from before the state was created can
+    advance a watermark. Records without a timestamp get the current time
+    when they are normalized, and vendor clocks may run ahead; either
+    would move the watermark past hosts that were not fetched yet.
+    """
+    def __init__(self, collection: Collection, full_resync: bool = False):
+        """
+        :param collection: Collection holding one watermark document per source
+        :param full_resync: Ignore stored watermarks and treat every host as new
+        """
+        self.collection = collection
+        self.full_resync = full_resync
+        self.watermarks: Dict[str, datetime] = {} if full_resync else self._load()
+        self.observed: Dict[str, datetime] = {}
+        self.started_at = utc_now()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _load(self) -> Dict[str, datetime]:
+        """
+        Read the stored watermarks
+
+        :return: Watermark per source system
+        """
+        return {
+            document['source_system']: as_utc(document['last_seen'])
+            for document in self.collection.find()
+            if document.get('last_seen')
+        }
+
+    def is_new(self, source_system: str, host: Host) -> bool:
+        """
+        Check whether a host was seen after the watermark of its source,
+        recording its ``last_seen`` as a candidate for the next watermark
+
+        :param source_system: Source the host was fetched from
+        :param host: Host to check
+        :return: True if the host has to be processed
+        """
+        if host.last_seen is None:
+            return True
+
+        last_seen = as_utc(host.last_seen)
+        if last_seen < self.started_at:
+            observed = self.observed.get(source_system)
+            if observed is None or last_seen > observed:
+                self.observed[source_system] = last_seen
+
+        watermark = self.watermarks.get(source_system)
+        return watermark is None or last_seen > watermark
+
+    def commit(self) -> None:
+        """
+        Advance the stored watermarks to the newest ``last_seen`` observed;
+        call once the run has been stored successfully
+        """
+        for source_system, last_seen in self.observed.items():
+            self.collection.update_one(
+                {'source_system': source_system},
+                {'$max': {'last_seen': last_seen}},
+                upsert=True
+            )
+            self.logger.info(f"Advanced {source_system} watermark to {last_seen.isoformat()}")
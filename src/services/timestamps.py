@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+from functools import partial
+from typing import Callable, List, Optional, Sequence
+from dateutil.parser import parse as dateutil_parse
+
+Parser = Callable[[str], datetime]
+
+
+def as_utc(value: datetime) -> datetime:
+    """
+    Make a timestamp timezone-aware in UTC, treating naive values as UTC
+
+    :param value: Timestamp to convert
+    :return: Timezone-aware UTC timestamp
+    """
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def utc_now() -> datetime:
+    """
+    Current time as a timezone-aware UTC timestamp
+
+    :return: Current UTC time
+    """
+    return datetime.now(timezone.utc)
+
+
+def _parse_iso_zulu(value: str) -> datetime:
+    """
+    Parse an ISO 8601 timestamp with a ``Z`` suffix, which
+    ``datetime.fromisoformat`` only accepts from Python 3.11 on
+
+    :param value: Raw timestamp
+    :return: Parsed timestamp
+    """
+    if not value.endswith(('Z', 'z')):
+        raise ValueError(f"Not a Zulu timestamp: {value!r}")
+    return datetime.fromisoformat(value[:-1] + '+00:00')
+
+
+def _parse_with_format(value: str, timestamp_format: str) -> datetime:
+    return datetime.strptime(value, timestamp_format)
+
+
+class TimestampParser:
+    """
+    Timestamp parser for one source, returning UTC-aware datetimes
+
+    Tries ``datetime.fromisoformat``, then the known vendor formats, and
+    only then falls back to ``dateutil``. The first parser that succeeds
+    is cached and tried first for the next value, since a source formats
+    all of its timestamps the same way.
+    """
+    def __init__(self, formats: Sequence[str] = ()):
+        """
+        :param formats: Known ``strptime`` formats of the source
+        """
+        self._parsers: List[Parser] = [datetime.fromisoformat, _parse_iso_zulu] + [
+            partial(_parse_with_format, timestamp_format=timestamp_format)
+            for timestamp_format in formats
+        ]
+        self._cached: Optional[Parser] = None
+
+    def parse(self, value: str) -> datetime:
+        """
+        Parse a timestamp
+
+        :param value: Raw timestamp
+        :return: Timezone-aware UTC timestamp
+        :raises ValueError: If the value is not a recognizable timestamp
+        """
+        cached = self._cached
+        if cached is not None:
+            try:
+                return as_utc(cached(value))
+            except ValueError:
+                pass
+
+        for parser in self._parsers:
+            if parser is cached:
+                continue
+            try:
+                parsed = parser(value)
+            except ValueError:
+                continue
+            self._cached = parser
+            return as_utc(parsed)
+
+        # Unknown format: not cached, so the fast parsers stay first
+        return as_utc(dateutil_parse(value))
+
+
+# Parser for timestamps of unknown origin, such as stored documents
+default_parser = TimestampParser()
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parse a timestamp of unknown origin
+
+    :param value: Raw timestamp
+    :return: Timezone-aware UTC timestamp
+    """
+    return default_parser.parse(value)
@@ -0,0 +1,152 @@
+"""
+Shared fixtures: a stub vendor API serving a synthetic fleet over HTTP,
+and the pipeline wired to an in-memory MongoDB
+"""
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+os.environ.setdefault("API_REQUEST_TIMEOUT", "10")
+os.environ.setdefault("PAGINATION_LIMIT", "50")
+
+import mongomock  # noqa: E402
+import pytest  # noqa: E402
+
+from benchmarks import synthetic  # noqa: E402
+from src.clients import checkpoints, page_cache  # noqa: E402
+from src.config.settings import settings  # noqa: E402
+
+
+class VendorServer:
+    """
+    Stub Qualys and Crowdstrike host APIs serving a synthetic fleet
+
+    Qualys reads pagination params from the query string and Crowdstrike
+    from a JSON body, like the real APIs. ``page_cap`` truncates every
+    page to that many records, like a server-side limit, and ``failures``
+    maps a ``(vendor, skip)`` to statuses returned before the page is served;
+    a 200 among them answers with a truncated JSON body.
+    """
+    def __init__(self, total: int = 200, duplicate_rate: float = 0.3, noise: float = 0.3, seed: int = 0):
+        self.total = total
+        self.duplicate_rate = duplicate_rate
+        self.noise = noise
+        self.seed = seed
+        self.page_cap: Optional[int] = None
+        self.failures: Dict[Tuple[str, int], List[int]] = {}
+        self.retry_after: Optional[str] = None
+        self.requests: List[Tuple[str, int, int]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                url = urlparse(self.path)
+                body = self.rfile.read(int(self.headers.get('content-length') or 0))
+                if 'qualys' in url.path:
+                    vendor = 'Qualys'
+                    query = parse_qs(url.query)
+                    skip, limit = int(query['skip'][0]), int(query['limit'][0])
+                else:
+                    vendor = 'Crowdstrike'
+                    params = json.loads(body)
+                    skip, limit = params['skip'], params['limit']
+                status = server.record(vendor, skip, limit)
+                if status == 200:
+                    payload = json.dumps(server.page(vendor, skip, limit)).encode()[:-1]
+                    self.send_response(200)
+                    self.send_header('content-length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                if status is not None:
+                    self.send_response(status)
+                    if server.retry_after is not None:
+                        self.send_header('Retry-After', server.retry_after)
+                    self.send_header('content-length', '0')
+                    self.end_headers()
+                    return
+                payload = json.dumps(server.page(vendor, skip, limit)).encode()
+                self.send_response(200)
+                self.send_header('content-type', 'application/json')
+                self.send_header('content-length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def record(self, vendor: str, skip: int, limit: int) -> Optional[int]:
+        with self._lock:
+            self.requests.append((vendor, skip, limit))
+            statuses = self.failures.get((vendor, skip))
+            return statuses.pop(0) if statuses else None
+
+    def page(self, vendor: str, skip: int, limit: int) -> List[dict]:
+        if self.page_cap is not None:
+            limit = min(limit, self.page_cap)
+        return synthetic.fleet_page(
+            vendor, skip, limit, self.total, self.duplicate_rate, self.noise, self.seed
+        )
+
+    def start(self) -> None:
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def vendor_server(monkeypatch):
+    server = VendorServer()
+    server.start()
+    monkeypatch.setattr(settings, 'BASE_URL', server.base_url)
+    monkeypatch.setattr(settings, 'PAGE_CACHE_MODE', 'off')
+    monkeypatch.setattr(settings, 'ADAPTIVE_PAGE_SIZE', False)
+    monkeypatch.setattr(settings, 'FETCH_BACKOFF_BASE', 0.01)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def cache_dirs(monkeypatch, tmp_path):
+    """
+    Page cache and checkpoints under a temporary directory; tests pick the
+    ``PAGE_CACHE_MODE``
+    """
+    monkeypatch.setattr(settings, 'PAGE_CACHE_DIR', str(tmp_path / 'pages'))
+    monkeypatch.setattr(settings, 'CHECKPOINT_PATH', str(tmp_path / 'checkpoints.json'))
+    monkeypatch.setattr(page_cache, '_default_cache', None)
+    monkeypatch.setattr(checkpoints, '_default_checkpoints', None)
+    return tmp_path
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient()['hosts_test']
+
+
+@pytest.fixture
+def pipeline(monkeypatch, vendor_server, db):
+    """
+    The pipeline entry points of ``src.main``, reading from the stub
+    vendor API and writing to the in-memory database
+    """
+    from src import main
+
+    monkeypatch.setattr(main, 'connect_to_mongodb', lambda: db)
+    monkeypatch.setattr(main, 'setup_logging', lambda: None)
+    for name in ('EXPORT_PATH', 'IDENTITY_CACHE_PATH', 'METRICS_SUMMARY_PATH', 'METRICS_PROMETHEUS_PATH'):
+        monkeypatch.setattr(settings, name, None)
+    monkeypatch.setattr(settings, 'RAW_DATA_STORE', 'memory')
+    return main
@@ -0,0 +1,58 @@
+from src.clients.checkpoints import PaginationCheckpoints
+from src.clients.qualys import QualysClient
+from src.config.settings import settings
+
+
+def test_checkpoints_are_saved_per_source_and_cleared(tmp_path):
+    path = str(tmp_path / 'state' / 'checkpoints.json')
+    store = PaginationCheckpoints(path)
+    assert store.get('Qualys') == 0
+
+    store.save('Qualys', 100)
+    store.save('Crowdstrike', 50)
+    assert PaginationCheckpoints(path).get('Qualys') == 100
+
+    store.clear('Qualys')
+    assert store.get('Qualys') == 0
+    assert store.get('Crowdstrike') == 50
+
+
+def test_unreadable_checkpoints_are_ignored(tmp_path):
+    path = tmp_path / 'checkpoints.json'
+    path.write_text('{not json')
+    assert PaginationCheckpoints(str(path)).get('Qualys') == 0
+
+
+def interrupt_after(client, pages):
+    stream = client.iter_pages(10)
+    for _ in range(pages):
+        next(stream)
+    stream.close()
+
+
+def test_resume_mode_fetches_fresh_pages_after_the_checkpoint(vendor_server, cache_dirs, monkeypatch):
+    monkeypatch.setattr(settings, 'PAGE_CACHE_MODE', 'resume')
+    interrupt_after(QualysClient(), 3)
+    assert QualysClient().checkpoints.get('Qualys') == 30
+
+    vendor_server.requests.clear()
+    pages = list(QualysClient().iter_pages(10))
+    assert sum(len(page) for page in pages) == vendor_server.total
+    assert min(skip for _, skip, _ in vendor_server.requests) == 30
+    assert QualysClient().checkpoints.get('Qualys') == 0
+
+    # A completed pagination leaves nothing to resume, so every page is fetched again
+    vendor_server.requests.clear()
+    list(QualysClient().iter_pages(10))
+    assert min(skip for _, skip, _ in vendor_server.requests) == 0
+
+
+def test_expired_pages_before_the_checkpoint_are_used(vendor_server, cache_dirs, monkeypatch):
+    monkeypatch.setattr(settings, 'PAGE_CACHE_MODE', 'on')
+    monkeypatch.setattr(settings, 'PAGE_CACHE_TTL', -1)
+    interrupt_after(QualysClient(), 2)
+
+    vendor_server.requests.clear()
+    pages = list(QualysClient().iter_pages(10))
+    assert sum(len(page) for page in pages) == vendor_server.total
+    assert min(skip for _, skip, _ in vendor_server.requests) == 20
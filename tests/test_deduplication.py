@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from benchmarks import synthetic
+from src.clients.crowdstrike import CrowdstrikeClient
+from src.clients.qualys import QualysClient
+from src.models.host import Host
+from src.services.blocking import BlockingIndex
+from src.services.deduplication import HostDeduplicator
+
+
+@pytest.fixture(scope='module')
+def fleet():
+    hosts = []
+    for client in (QualysClient(), CrowdstrikeClient()):
+        page = synthetic.fleet_page(client.SOURCE_SYSTEM, 0, 150, 150, duplicate_rate=0.4, noise=0.3)
+        hosts.extend(client.normalize_page(page))
+    random.Random(0).shuffle(hosts)
+    return hosts
+
+
+def outcome(hosts):
+    return [(host.id, host.source_records, host.to_dict()) for host in hosts]
+
+
+@pytest.mark.parametrize('threshold', [0.5, 0.7, 0.9])
+def test_blocking_matches_brute_force(fleet, threshold):
+    brute_force = HostDeduplicator(use_blocking=False)
+    blocking = HostDeduplicator(use_blocking=True)
+
+    expected = brute_force.deduplicate_hosts(fleet, threshold)
+    assert outcome(blocking.deduplicate_hosts(fleet, threshold)) == outcome(expected)
+    assert len(expected) < len(fleet)
+
+
+def test_blocking_prunes_pairs(fleet):
+    deduplicator = HostDeduplicator(use_blocking=True)
+    deduplicator.deduplicate_hosts(fleet)
+    assert deduplicator.stats.pairs_pruned > deduplicator.stats.pairs_scored
+
+
+def test_blocking_accepts_a_stream(fleet):
+    expected = HostDeduplicator().deduplicate_hosts(fleet)
+    deduplicator = HostDeduplicator()
+    assert outcome(deduplicator.deduplicate_hosts(iter(fleet))) == outcome(expected)
+    assert deduplicator.stats.hosts_in == len(fleet)
+
+
+def test_clustering_with_blocking_matches_brute_force(fleet):
+    expected = HostDeduplicator(clustering=True, use_blocking=False).deduplicate_hosts(fleet)
+    clustered = HostDeduplicator(clustering=True, use_blocking=True).deduplicate_hosts(fleet)
+    assert outcome(clustered) == outcome(expected)
+    assert len(expected) < len(fleet)
+
+
+def test_clustering_does_not_depend_on_input_order(fleet):
+    expected = HostDeduplicator(clustering=True).deduplicate_hosts(fleet)
+    reordered = sorted(fleet, key=lambda host: (host.source_system != 'Crowdstrike', host.source_id))
+    assert outcome(HostDeduplicator(clustering=True).deduplicate_hosts(reordered)) == outcome(expected)
+
+
+@pytest.mark.parametrize('workers', [2, 4])
+def test_sharded_clustering_matches_single_process(fleet, workers):
+    single = HostDeduplicator(clustering=True, workers=1)
+    sharded = HostDeduplicator(workers=workers)
+
+    expected = single.deduplicate_hosts(fleet)
+    assert outcome(sharded.deduplicate_hosts(fleet)) == outcome(expected)
+    assert sharded.stats.pairs_pruned == single.stats.pairs_pruned
+
+
+@pytest.mark.parametrize('weights, threshold', [
+    ({'hostname': 3.0}, 0.6),
+    ({'hostname': 2.0, 'ip': 0.5}, 0.65),
+])
+def test_fuzzy_blocking_matches_brute_force_on_the_fleet(fleet, weights, threshold):
+    blocking = HostDeduplicator(use_blocking=True, weights=weights)
+    assert blocking._requires_hostname_blocking(threshold)
+
+    expected = HostDeduplicator(use_blocking=False, weights=weights).deduplicate_hosts(fleet, threshold)
+    assert outcome(blocking.deduplicate_hosts(fleet, threshold)) == outcome(expected)
+
+
+def test_oversized_fuzzy_blocks_are_skipped():
+    index = BlockingIndex(hostname_keys=True, max_block_size=2)
+    hosts = [Host(hostname=f"webserver-{i}") for i in range(3)]
+    for slot, host in enumerate(hosts):
+        index.add(slot, host)
+
+    # Only the shared fuzzy keys would pair these, and their blocks are too large
+    assert index.candidates(Host(hostname='webserver-9')) == set()
+    # Exact keys are never capped
+    assert index.candidates(Host(hostname='webserver-1')) == {1}
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from src.models.host import Host
+from src.services.export import export_snapshot, read_snapshot
+
+
+def make_hosts(count, os_version='22.04'):
+    return [
+        Host(source_system='Qualys', source_id=str(i), hostname=f"host-{i}",
+             operating_system='Ubuntu', os_version=os_version)
+        for i in range(count)
+    ]
+
+
+def versions(tmp_path):
+    return sorted(path.name for path in tmp_path.iterdir() if path.name.startswith('hosts.v'))
+
+
+def test_snapshot_path_is_swapped_to_the_new_version(tmp_path):
+    directory = str(tmp_path / 'hosts')
+    assert export_snapshot(make_hosts(3), directory) == 3
+    first = os.readlink(directory)
+
+    assert export_snapshot(make_hosts(5, '24.04'), directory) == 5
+    assert os.path.islink(directory)
+    assert os.readlink(directory) != first
+    assert set(read_snapshot(directory).column('os_version').to_pylist()) == {'24.04'}
+    assert first in versions(tmp_path)
+
+    export_snapshot(make_hosts(2), directory)
+    assert first not in versions(tmp_path)
+    assert len(versions(tmp_path)) == 2
+
+
+def test_snapshot_written_as_a_directory_is_replaced(tmp_path):
+    directory = tmp_path / 'hosts'
+    (directory / 'source_system=Qualys').mkdir(parents=True)
+
+    export_snapshot(make_hosts(3), str(directory))
+    assert directory.is_symlink()
+    assert read_snapshot(str(directory)).num_rows == 3
+
+
+def test_failed_export_keeps_the_previous_snapshot(tmp_path):
+    directory = str(tmp_path / 'hosts')
+    export_snapshot(make_hosts(3), directory)
+
+    def failing_hosts():
+        yield from make_hosts(2)
+        raise RuntimeError('vendor went away')
+
+    with pytest.raises(RuntimeError):
+        export_snapshot(failing_hosts(), directory)
+    assert read_snapshot(directory).num_rows == 3
+    assert len(versions(tmp_path)) == 1
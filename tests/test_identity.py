@@ -0,0 +1,52 @@
+from src.models.host import Host
+from src.services.identity import IdentityIndex
+from src.services.repository import HostRepository
+
+
+def stored_ids(db):
+    return {
+        (document['source_system'], document['source_id']): document['id']
+        for document in db.hosts.find()
+    }
+
+
+def test_identical_runs_keep_ids_and_document_count(pipeline, db):
+    first = pipeline.fetch_and_process_hosts(full_resync=True)
+    first_ids = stored_ids(db)
+    assert first
+    assert db.hosts.count_documents({}) == len(first)
+
+    second = pipeline.fetch_and_process_hosts(full_resync=True)
+    assert len(second) == len(first)
+    assert db.hosts.count_documents({}) == len(first)
+    assert stored_ids(db) == first_ids
+    assert {host.id for host in second} == {host.id for host in first}
+
+
+def test_every_merged_source_record_is_recorded(pipeline, db):
+    hosts = pipeline.fetch_and_process_hosts(full_resync=True)
+    source_keys = db.host_identities.count_documents({'_id': {'$regex': '^source:'}})
+    assert source_keys == sum(len(host.source_records) for host in hosts) == 2 * 200
+
+
+def test_merged_away_documents_are_retired(pipeline, db):
+    repository = HostRepository(db['hosts'])
+    index = IdentityIndex(db['host_identities'])
+    kept = Host(source_system='Qualys', source_id='1', hostname='web-01', mac_addresses=['00:00:00:00:00:01'])
+    merged = Host(source_system='Crowdstrike', source_id='c1', hostname='WEB-01')
+    repository.upsert_hosts([kept, merged])
+    index.record([kept, merged])
+
+    survivor = Host.merge_many([kept, merged])
+    assert survivor.source_records == [('Qualys', '1'), ('Crowdstrike', 'c1')]
+    assert survivor.merged_ids == [merged.id]
+    repository.upsert_hosts([survivor])
+    index.record([survivor])
+    assert pipeline.retire_merged_hosts(repository, index, [survivor]) == 1
+    assert [document['id'] for document in db.hosts.find()] == [kept.id]
+
+    # A key still naming the merged id resolves to the survivor
+    db.host_identities.insert_one({'_id': 'mac:00:00:00:00:00:02', 'host_id': merged.id})
+    reread = Host(source_system='Qualys', source_id='2', mac_addresses=['00:00:00:00:00:02'])
+    IdentityIndex(db['host_identities']).resolve([reread])
+    assert reread.id == kept.id
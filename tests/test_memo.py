@@ -0,0 +1,81 @@
+import pickle
+import uuid
+
+from src.services.memo import MISSING, LRUCache, cache_statistics, memoized
+from src.services.metrics import PipelineMetrics
+
+
+def unique_name():
+    return f"test_{uuid.uuid4().hex}"
+
+
+def test_least_recently_used_entry_is_evicted():
+    name = unique_name()
+    cache = LRUCache(name, 2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+
+    assert cache.get('b') is MISSING
+    assert (cache.get('a'), cache.get('c'), len(cache)) == (1, 3, 2)
+    assert cache_statistics()[name] == {
+        'maxsize': 2, 'hits': 3, 'misses': 1, 'evictions': 1, 'hit_rate': 0.75,
+    }
+
+
+def test_zero_size_disables_the_cache():
+    name = unique_name()
+    cache = LRUCache(name, 0)
+    cache.put('a', 1)
+    assert cache.get('a', 'default') == 'default'
+    assert cache.get_or_compute('a', lambda: 2) == 2
+    assert len(cache) == 0
+    assert cache_statistics()[name]['hits'] == cache_statistics()[name]['misses'] == 0
+
+
+def test_caches_of_a_name_share_counters_and_pickle_empty():
+    name = unique_name()
+    first, second = LRUCache(name, 4), LRUCache(name, 4)
+    first.get_or_compute('a', lambda: 1)
+    second.get_or_compute('a', lambda: 1)
+    first.get_or_compute('a', lambda: 1)
+    assert (cache_statistics()[name]['hits'], cache_statistics()[name]['misses']) == (1, 2)
+
+    copy = pickle.loads(pickle.dumps(first))
+    assert len(copy) == 0 and copy.maxsize == 4
+
+
+def test_memoized_functions_report_hits_misses_and_evictions():
+    name = unique_name()
+    calls = []
+
+    @memoized(name, 2)
+    def square(value):
+        calls.append(value)
+        return value * value
+
+    assert [square(value) for value in (1, 2, 1, 3, 2)] == [1, 4, 1, 9, 4]
+    assert calls == [1, 2, 3, 2]
+    assert cache_statistics()[name] == {
+        'maxsize': 2, 'hits': 1, 'misses': 4, 'evictions': 2, 'hit_rate': 0.2,
+    }
+
+    def identity(value):
+        return value
+
+    assert memoized(unique_name(), 0)(identity) is identity
+
+
+def test_run_summary_counts_lookups_since_the_run_started():
+    name = unique_name()
+    cache = LRUCache(name, 4)
+    cache.get_or_compute('a', lambda: 1)
+
+    metrics = PipelineMetrics()
+    cache.get('a')
+    cache.get('b')
+    assert metrics.summary()['caches'][name] == {
+        'maxsize': 4, 'hits': 1, 'misses': 1, 'evictions': 0, 'hit_rate': 0.5,
+    }
+    assert f'host_pipeline_cache_hits{{cache="{name}"}} 1' in metrics.to_prometheus()
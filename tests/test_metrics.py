@@ -0,0 +1,25 @@
+from src.services import metrics
+from src.services.metrics import PipelineMetrics, RequestStats
+
+
+def test_latency_sample_is_bounded(monkeypatch):
+    monkeypatch.setattr(metrics, 'LATENCY_RESERVOIR_SIZE', 100)
+    stats = RequestStats()
+    for i in range(10000):
+        stats.record(i / 10000)
+
+    assert stats.requests == 10000
+    assert len(stats.latencies) == 100
+    quantiles = stats.quantiles()
+    assert 0.3 < quantiles[0.5] < 0.7
+    assert quantiles[0.99] > quantiles[0.9] > quantiles[0.5]
+
+
+def test_stages_report_the_rss_high_water_mark():
+    run = PipelineMetrics()
+    with run.stage('fetch') as stage:
+        stage.count(3, 3)
+
+    summary = run.summary()['stages']['fetch']
+    assert 'peak_rss_bytes' not in summary
+    assert summary['max_rss_so_far_bytes'] == run.stages['fetch'].max_rss_so_far_bytes
@@ -0,0 +1,90 @@
+from datetime import datetime, timezone
+
+from benchmarks import synthetic
+from src.clients.crowdstrike import CrowdstrikeClient
+from src.clients.qualys import QualysClient
+
+QUALYS_HOST = {
+    'id': 42,
+    'hostname': 'Web-01.corp.example.com',
+    'ip_address': '10.1.2.3',
+    'mac_addresses': ['00:1A:2B:3C:4D:5E'],
+    'os': 'Linux',
+    'os_version': '22.04',
+    'first_seen': '2024-01-02T03:04:05',
+    'last_seen': '2024-02-03T04:05:06',
+    'vulnerability_count': 7,
+}
+CROWDSTRIKE_HOST = {
+    'cid': 'cs-42',
+    'hostname': 'WEB-01',
+    'local_ip': ['10.1.2.3', 'n/a'],
+    'external_ip': ['203.0.113.9'],
+    'mac_addresses': ['00-1a-2b-3c-4d-5e'],
+    'platform_name': 'Windows',
+    'platform_version': '11',
+    'first_seen': '2024-01-02T03:04:05Z',
+    'last_seen': '2024-02-03T04:05:06Z',
+    'active_vulnerabilities': 3,
+}
+
+
+def test_qualys_mapped_fields_survive_normalization():
+    host = QualysClient().normalize_host(dict(QUALYS_HOST))
+    assert (host.source_system, host.source_id) == ('Qualys', '42')
+    assert host.hostname == 'web-01'
+    assert host.ip_addresses == ['10.1.2.3']
+    assert host.mac_addresses == ['00:1a:2b:3c:4d:5e']
+    assert (host.operating_system, host.os_version) == ('Linux', '22.04')
+    assert host.first_seen == datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert host.last_seen == datetime(2024, 2, 3, 4, 5, 6, tzinfo=timezone.utc)
+    assert host.vulnerability_count == 7
+    assert host.raw_data == QUALYS_HOST
+
+
+def test_crowdstrike_mapped_fields_survive_normalization():
+    host = CrowdstrikeClient().normalize_host(dict(CROWDSTRIKE_HOST))
+    assert (host.source_system, host.source_id) == ('Crowdstrike', 'cs-42')
+    assert host.hostname == 'web-01'
+    assert host.ip_addresses == ['10.1.2.3', '203.0.113.9']
+    assert host.mac_addresses == ['00:1a:2b:3c:4d:5e']
+    assert (host.operating_system, host.os_version) == ('Windows', '11')
+    assert host.first_seen == datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert host.last_seen == datetime(2024, 2, 3, 4, 5, 6, tzinfo=timezone.utc)
+    assert host.vulnerability_count == 3
+    assert host.raw_data == CROWDSTRIKE_HOST
+
+
+def test_page_normalization_matches_record_normalization():
+    for client, vendor in ((QualysClient(), 'Qualys'), (CrowdstrikeClient(), 'Crowdstrike')):
+        page = synthetic.fleet_page(vendor, 0, 100, 100, noise=0.5)
+        page_hosts = client.normalize_page(page)
+        record_hosts = [client.normalize_host(raw_host) for raw_host in page]
+        assert [host.to_dict() | {'id': None} for host in page_hosts] == \
+            [host.to_dict() | {'id': None} for host in record_hosts]
+
+
+def test_invalid_records_are_dropped_from_the_page():
+    hosts = QualysClient().normalize_page([dict(QUALYS_HOST), {'id': 1, 'last_seen': 'not a date'}])
+    assert [host.source_id for host in hosts] == ['42']
+
+
+def test_pipeline_hosts_keep_mapped_fields(pipeline, vendor_server):
+    hosts = list(pipeline.iter_hosts(QualysClient(), CrowdstrikeClient()))
+    assert len(hosts) == 2 * vendor_server.total
+    for host in hosts:
+        assert host.source_system in ('Qualys', 'Crowdstrike')
+        assert host.source_id and host.operating_system and host.os_version
+        assert host.first_seen and host.last_seen
+        assert host.raw_data
+
+
+def test_os_and_source_strings_are_shared_between_hosts():
+    client = QualysClient()
+    first, second = client.normalize_page([
+        dict(QUALYS_HOST, os=''.join(['Lin', 'ux'])),
+        dict(QUALYS_HOST, id=43, os=''.join(['Li', 'nux'])),
+    ])
+    assert first.operating_system is second.operating_system
+    assert first.os_version is second.os_version
+    assert first.source_system is second.source_system
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from src.clients import page_cache
+from src.clients.aio import AsyncCrowdstrikeClient, AsyncQualysClient, create_session
+from src.clients.crowdstrike import CrowdstrikeClient
+from src.clients.page_cache import PageCache
+from src.clients.qualys import QualysClient
+from src.config.settings import settings
+
+
+def record_ids(pages):
+    return [raw_host.get('id', raw_host.get('cid')) for page in pages for raw_host in page]
+
+
+@pytest.mark.parametrize('client_class', [QualysClient, CrowdstrikeClient])
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_pages_cover_every_record_in_order(vendor_server, client_class, concurrency):
+    pages = list(client_class().iter_pages(7, concurrency=concurrency))
+    expected = record_ids([vendor_server.page(client_class.SOURCE_SYSTEM, 0, vendor_server.total)])
+    assert record_ids(pages) == expected
+    assert all(len(page) == 7 for page in pages[:-1])
+
+
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_short_pages_do_not_skip_records(vendor_server, concurrency):
+    vendor_server.page_cap = 5
+    pages = list(QualysClient().iter_pages(7, concurrency=concurrency))
+    assert record_ids(pages) == list(range(vendor_server.total))
+
+
+def test_concurrent_pages_stop_at_max_hosts(vendor_server):
+    pages = list(QualysClient().iter_pages(7, max_hosts=30, concurrency=4))
+    assert record_ids(pages) == list(range(30))
+    assert max(skip + limit for _, skip, limit in vendor_server.requests) == 30
+
+
+async def fetch_async(client_class, page_size, concurrency):
+    async with create_session() as session:
+        client = client_class(session)
+        return [page async for page in client.iter_pages(page_size, concurrency=concurrency)]
+
+
+@pytest.mark.parametrize('client_class', [AsyncQualysClient, AsyncCrowdstrikeClient])
+def test_async_short_pages_do_not_skip_records(vendor_server, client_class):
+    expected = record_ids([vendor_server.page(client_class.SOURCE_SYSTEM, 0, vendor_server.total)])
+    vendor_server.page_cap = 5
+    pages = asyncio.run(fetch_async(client_class, 7, 4))
+    assert record_ids(pages) == expected
+
+
+def test_async_invalid_json_is_retried(vendor_server):
+    vendor_server.failures[('Qualys', 0)] = [200]
+    pages = asyncio.run(fetch_async(AsyncQualysClient, 50, 2))
+    assert sum(len(page) for page in pages) == vendor_server.total
+    assert vendor_server.requests.count(('Qualys', 0, 50)) == 2
+
+
+@pytest.mark.parametrize('client_class', [QualysClient, AsyncQualysClient])
+def test_empty_body_is_retried(vendor_server, client_class):
+    vendor_server.failures[('Qualys', 50)] = [204]
+    if client_class is QualysClient:
+        pages = list(client_class().iter_pages(50))
+    else:
+        pages = asyncio.run(fetch_async(client_class, 50, 2))
+    assert sum(len(page) for page in pages) == vendor_server.total
+    assert vendor_server.requests.count(('Qualys', 50, 50)) == 2
+
+
+def test_async_pages_are_normalized_off_the_event_loop(vendor_server, monkeypatch):
+    threads = set()
+    normalize_page = AsyncQualysClient.normalize_page
+
+    def recording_normalize_page(self, batch):
+        threads.add(threading.get_ident())
+        return normalize_page(self, batch)
+
+    async def normalize():
+        monkeypatch.setattr(AsyncQualysClient, 'normalize_page', recording_normalize_page)
+        async with create_session() as session:
+            client = AsyncQualysClient(session)
+            return await client.get_normalized_hosts(concurrency=2)
+
+    assert len(asyncio.run(normalize())) == vendor_server.total
+    assert threads and threading.get_ident() not in threads
+
+
+def test_cached_pages_expire_after_the_ttl(vendor_server, cache_dirs, monkeypatch):
+    monkeypatch.setattr(settings, 'PAGE_CACHE_MODE', 'on')
+    list(QualysClient().iter_pages(50))
+    requests = len(vendor_server.requests)
+
+    list(QualysClient().iter_pages(50))
+    assert len(vendor_server.requests) == requests
+
+    # Every cached page is now older than the TTL
+    monkeypatch.setattr(page_cache.default_page_cache(), 'ttl', -1)
+    list(QualysClient().iter_pages(50))
+    assert len(vendor_server.requests) == 2 * requests
+
+
+def test_least_recently_used_pages_are_evicted(tmp_path):
+    cache = PageCache(str(tmp_path), ttl=60, max_bytes=10 ** 6)
+    page = [{'id': i, 'hostname': f"host-{i}"} for i in range(50)]
+    for skip in (0, 50, 100):
+        cache.put('url', skip, 50, page)
+    page_bytes = max(size for size, _ in cache._entries.values())
+
+    assert cache.get('url', 0, 50) == page
+    cache.max_bytes = 2 * page_bytes
+    cache.put('url', 150, 50, page)
+    assert cache.get('url', 50, 50) is None
+    assert cache.get('url', 100, 50) is None
+    assert cache.get('url', 0, 50) == page
+    assert cache.get('url', 150, 50) == page
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_replay_reads_cached_pages_without_requests(vendor_server, cache_dirs, monkeypatch):
+    monkeypatch.setattr(settings, 'PAGE_CACHE_MODE', 'on')
+    expected = record_ids(QualysClient().iter_pages(50))
+
+    monkeypatch.setattr(settings, 'PAGE_CACHE_MODE', 'replay')
+    monkeypatch.setattr(settings, 'PAGE_CACHE_TTL', -1)
+    vendor_server.requests.clear()
+    assert record_ids(QualysClient().iter_pages(50)) == expected
+    assert vendor_server.requests == []
+
+    # The first uncached page ends a replayed pagination
+    cache = page_cache.default_page_cache()
+    cache._remove(cache.key(f"{settings.BASE_URL}{QualysClient.ENDPOINT}", 100, 50))
+    assert record_ids(QualysClient().iter_pages(50)) == expected[:100]
+    assert vendor_server.requests == []
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from src.clients.crowdstrike import CrowdstrikeClient
+from src.clients.paging import PageSizeController
+from src.clients.qualys import QualysClient
+from src.config.settings import settings
+
+
+def controller(initial=100, maximum=1000):
+    return PageSizeController(initial, maximum, target_latency=1.0, max_payload_bytes=10_000)
+
+
+def test_full_fast_pages_double_the_size_up_to_the_vendor_maximum():
+    sizer = controller(initial=300)
+    for expected in (600, 1000, 1000):
+        limit = sizer.next_page_size()
+        sizer.record(limit, limit, latency=0.1, payload_bytes=100)
+        assert sizer.page_size == expected
+    assert sizer.summary() == {300: 1, 600: 1, 1000: 1}
+
+
+def test_size_only_grows_within_the_headroom_and_on_full_pages():
+    sizer = controller()
+    sizer.record(100, 99, latency=0.1, payload_bytes=100)
+    sizer.record(100, 100, latency=0.6, payload_bytes=100)
+    sizer.record(100, 100, latency=0.1, payload_bytes=6_000)
+    assert sizer.page_size == 100
+
+
+def test_slow_or_heavy_pages_halve_the_size():
+    sizer = controller()
+    sizer.record(100, 100, latency=1.5, payload_bytes=100)
+    assert sizer.page_size == 50
+    sizer.record(50, 50, latency=0.1, payload_bytes=20_000)
+    assert sizer.page_size == 25
+    # A late answer to a larger page cannot grow the size past what shrank it
+    sizer.record(100, 100, latency=0.1, payload_bytes=100)
+    assert sizer.page_size == 200
+
+
+def test_timeouts_quarter_the_size_down_to_the_minimum():
+    sizer = PageSizeController(100, 1000, minimum=10, target_latency=1.0, max_payload_bytes=10_000)
+    sizer.record_timeout(100)
+    assert sizer.page_size == 25
+    sizer.record_timeout(25)
+    assert sizer.page_size == 10
+
+
+def test_initial_size_is_clamped():
+    assert controller(initial=5000).page_size == 1000
+    assert PageSizeController(0, 1000).page_size == 1
+
+
+@pytest.mark.parametrize('client_class', [QualysClient, CrowdstrikeClient])
+@pytest.mark.parametrize('concurrency', [1, 4])
+def test_changing_page_sizes_lose_and_duplicate_no_host(vendor_server, monkeypatch, client_class, concurrency):
+    source = client_class.SOURCE_SYSTEM
+    expected = vendor_server.page(source, 0, vendor_server.total)
+    # Pages grow until about 40 records exceed the byte cap, then shrink again
+    record_bytes = len(json.dumps(expected)) // len(expected)
+    monkeypatch.setattr(settings, 'ADAPTIVE_PAGE_SIZE', True)
+    monkeypatch.setattr(settings, 'PAGE_SIZE_MAX_BYTES', 40 * record_bytes)
+
+    client = client_class()
+    pages = list(client.iter_pages(5, concurrency=concurrency))
+    assert [host for page in pages for host in page] == expected
+    assert len(client.page_sizer.summary()) > 2
+    assert len({skip for _, skip, _ in vendor_server.requests}) == len(vendor_server.requests)
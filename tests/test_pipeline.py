@@ -0,0 +1,93 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from mongomock.collection import Collection
+from pymongo.errors import BulkWriteError
+
+from src.models.host import Host
+from src.services.repository import HostRepository
+
+
+def test_stored_matches_are_looked_up_per_batch(pipeline, db):
+    repository = HostRepository(db['hosts'], batch_size=2)
+    stored = Host(hostname='stored', ip_addresses=['10.0.0.3'])
+    repository.upsert_hosts([stored])
+    consumed = []
+
+    def arrivals():
+        for i in range(1, 6):
+            consumed.append(i)
+            yield Host(hostname=f"new-{i}", ip_addresses=[f"10.0.0.{i}"])
+
+    stream = pipeline.with_stored_matches(repository, arrivals())
+    assert next(stream).hostname == 'new-1'
+    assert consumed == [1, 2]
+
+    hosts = [host.hostname for host in pipeline.with_stored_matches(repository, arrivals())]
+    assert hosts == ['new-1', 'new-2', 'stored', 'new-3', 'new-4', 'new-5']
+
+
+def test_incremental_run_updates_stored_hosts(pipeline, db):
+    first = pipeline.fetch_and_process_hosts(full_resync=True)
+    db.sync_state.drop()
+
+    second = pipeline.fetch_and_process_hosts()
+    assert {host.id for host in second} == {host.id for host in first}
+    assert db.hosts.count_documents({}) == len(first)
+
+
+def test_async_incremental_run_updates_stored_hosts(pipeline, db):
+    first = asyncio.run(pipeline.async_fetch_and_process_hosts(full_resync=True))
+    db.sync_state.drop()
+
+    second = asyncio.run(pipeline.async_fetch_and_process_hosts())
+    assert {host.id for host in second} == {host.id for host in first}
+    assert db.hosts.count_documents({}) == len(first)
+
+    # Nothing is new once the watermarks are committed
+    assert asyncio.run(pipeline.async_fetch_and_process_hosts()) == []
+    assert db.hosts.count_documents({}) == len(first)
+
+
+def test_updated_record_overwrites_the_stored_document(pipeline, db):
+    pipeline.fetch_and_process_hosts(full_resync=True)
+    document = db.hosts.find_one({'source_system': 'Qualys', 'merged_sources': []})
+    fresh = {key: document[key] for key in ('os_version', 'vulnerability_count')}
+    db.hosts.update_one({'id': document['id']}, {'$set': {
+        'os_version': 'stale',
+        'vulnerability_count': fresh['vulnerability_count'] + 100,
+        'last_seen': datetime(2000, 1, 1, tzinfo=timezone.utc),
+        'content_hash': 'stale',
+    }})
+    db.sync_state.drop()
+
+    pipeline.fetch_and_process_hosts()
+    stored = db.hosts.find_one({'id': document['id']})
+    assert {key: stored[key] for key in fresh} == fresh
+
+
+@pytest.mark.parametrize('use_async', [False, True])
+def test_watermarks_stay_behind_failed_writes(pipeline, db, monkeypatch, use_async):
+    def run():
+        if use_async:
+            return asyncio.run(pipeline.async_fetch_and_process_hosts())
+        return pipeline.fetch_and_process_hosts()
+
+    bulk_write = Collection.bulk_write
+
+    def failing_bulk_write(self, operations, ordered=True, **kwargs):
+        if self.name != 'hosts':
+            return bulk_write(self, operations, ordered=ordered, **kwargs)
+        raise BulkWriteError({
+            'writeErrors': [{'index': 0, 'code': 11000, 'errmsg': 'duplicate key'}],
+            'nUpserted': 0,
+        })
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Collection, 'bulk_write', failing_bulk_write)
+        run()
+    assert db.sync_state.count_documents({}) == 0
+
+    assert run()
+    assert db.sync_state.count_documents({}) == 2
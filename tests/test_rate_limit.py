@@ -0,0 +1,36 @@
+import pytest
+
+from src.clients import rate_limit
+from src.clients.rate_limit import TokenBucket, rate_limiter_for
+from src.config.settings import settings
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_burst_is_free_then_requests_are_spaced_by_the_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0]
+    assert [bucket.reserve() for _ in range(3)] == [0.5, 1.0, 1.5]
+
+
+def test_tokens_refill_up_to_the_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.reserve()
+    clock[0] += 60
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0, 0.5]
+
+
+def test_buckets_are_shared_per_vendor(monkeypatch):
+    monkeypatch.setattr(rate_limit, '_buckets', {})
+    monkeypatch.setattr(settings, 'VENDOR_RATE_LIMIT', 0)
+    assert rate_limiter_for('Qualys') is None
+
+    monkeypatch.setattr(settings, 'VENDOR_RATE_LIMIT', 5)
+    assert rate_limiter_for('Qualys') is rate_limiter_for('Qualys')
+    assert rate_limiter_for('Qualys') is not rate_limiter_for('Crowdstrike')
@@ -0,0 +1,50 @@
+import pytest
+
+from src.models.host import Host
+from src.models.raw_data import LazyRawData
+from src.services.raw_store import FileRawStore, MongoRawStore
+
+
+class CountingStore(FileRawStore):
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.reads = 0
+
+    def get(self, key):
+        self.reads += 1
+        return super().get(key)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CountingStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+def test_lazy_raw_data_decodes_each_part_once(store):
+    first = store.offload('Qualys', '1', {'id': 1, 'os': 'Linux'})
+    second = store.offload('Crowdstrike', 'c1', {'cid': 'c1', 'os': 'Windows'})
+    merged = Host.merge_many([Host(raw_data=first), Host(raw_data=second)]).raw_data
+    assert isinstance(merged, LazyRawData)
+    assert store.reads == 0
+
+    assert dict(merged) == {'id': 1, 'cid': 'c1', 'os': 'Windows'}
+    assert 'os' in merged and merged.get('missing') is None and len(merged) == 3
+    assert sorted(merged.items()) == [('cid', 'c1'), ('id', 1), ('os', 'Windows')]
+    assert store.reads == 2
+
+    merged.unload()
+    assert merged['id'] == 1
+    assert store.reads == 4
+
+
+def test_mongo_store_reads_buffered_and_written_payloads(db):
+    store = MongoRawStore(db['host_raw_data'], batch_size=2)
+    payloads = {str(i): {'id': i, 'hostname': f"host-{i}"} for i in range(3)}
+    lazy = {source_id: store.offload('Qualys', source_id, payload) for source_id, payload in payloads.items()}
+    assert db.host_raw_data.count_documents({}) == 2
+
+    store.flush()
+    assert db.host_raw_data.count_documents({}) == 3
+    assert {source_id: dict(raw_data) for source_id, raw_data in lazy.items()} == payloads
@@ -0,0 +1,112 @@
+from pymongo import ASCENDING
+from pymongo.errors import BulkWriteError
+
+from src.models.host import Host
+from src.services import repository as repository_module
+from src.services.repository import HostRepository
+
+
+def make_hosts(count):
+    return [
+        Host(source_system='Qualys', source_id=str(i), hostname=f"host-{i}", ip_addresses=[f"10.0.0.{i}"])
+        for i in range(count)
+    ]
+
+
+def test_bulk_upserts_are_batched_and_idempotent(db):
+    repository = HostRepository(db['hosts'], batch_size=4)
+    hosts = make_hosts(10)
+
+    summaries = repository.upsert_hosts(hosts)
+    assert [summary.operations for summary in summaries] == [4, 4, 2]
+    assert sum(summary.upserted for summary in summaries) == 10
+    assert db.hosts.count_documents({}) == 10
+
+    summaries = repository.upsert_hosts(hosts)
+    assert sum(summary.matched for summary in summaries) == 10
+    assert db.hosts.count_documents({}) == 10
+
+
+def test_unchanged_hosts_are_skipped(db):
+    repository = HostRepository(db['hosts'])
+    hosts = make_hosts(3)
+    repository.upsert_hosts(hosts)
+
+    hosts[0].vulnerability_count = 5
+    summary, = repository.upsert_hosts(hosts, skip_unchanged=True)
+    assert (summary.skipped, summary.matched) == (2, 1)
+
+
+def test_transient_errors_are_retried(db, monkeypatch):
+    repository = HostRepository(db['hosts'], max_retries=3, backoff_base=0.5)
+    bulk_write = db['hosts'].bulk_write
+    calls = []
+    sleeps = []
+    monkeypatch.setattr(repository_module.time, 'sleep', sleeps.append)
+
+    def flaky_bulk_write(operations, ordered=True):
+        calls.append(len(operations))
+        if len(calls) == 1:
+            raise BulkWriteError({
+                'writeErrors': [{'index': 1, 'code': 91, 'errmsg': 'shutdown in progress'}],
+                'nUpserted': len(operations) - 1,
+            })
+        return bulk_write(operations, ordered=ordered)
+
+    monkeypatch.setattr(repository.collection, 'bulk_write', flaky_bulk_write)
+    summary = repository.upsert_batch(make_hosts(3))
+    assert calls == [3, 1]
+    assert (summary.retries, summary.failed, summary.upserted) == (1, 0, 3)
+    # One jittered backoff before the retry
+    assert len(sleeps) == 1 and 0 <= sleeps[0] <= 0.5
+
+
+def test_retries_back_off_exponentially(db, monkeypatch):
+    repository = HostRepository(db['hosts'], max_retries=3, backoff_base=1)
+    sleeps = []
+    monkeypatch.setattr(repository_module.time, 'sleep', sleeps.append)
+
+    def failing_bulk_write(operations, ordered=True):
+        raise BulkWriteError({
+            'writeErrors': [{'index': 0, 'code': 112, 'errmsg': 'write conflict'}],
+            'nUpserted': len(operations) - 1,
+        })
+
+    monkeypatch.setattr(repository.collection, 'bulk_write', failing_bulk_write)
+    summary = repository.upsert_batch(make_hosts(2))
+    assert (summary.retries, summary.failed) == (3, 1)
+    assert len(sleeps) == 3
+    assert all(0 <= delay <= 2 ** attempt for attempt, delay in enumerate(sleeps))
+
+
+def test_duplicate_keys_fail_without_retrying(db):
+    db.hosts.create_index([('hostname', ASCENDING)], unique=True)
+    repository = HostRepository(db['hosts'], max_retries=3)
+    hosts = make_hosts(2)
+    hosts[1].hostname = hosts[0].hostname
+
+    summary = repository.upsert_batch(hosts)
+    assert (summary.retries, summary.failed, summary.upserted) == (0, 1, 1)
+
+
+def test_hosts_without_source_id_share_source_fields(db):
+    repository = HostRepository(db['hosts'])
+    db.hosts.create_index(
+        [('source_system', ASCENDING), ('source_id', ASCENDING)],
+        name='source_system_source_id',
+        unique=True
+    )
+    assert repository.ensure_indexes() == []
+
+    summary = repository.upsert_batch([Host(source_system='Crowdstrike'), Host(source_system='Crowdstrike')])
+    assert (summary.failed, summary.upserted) == (0, 2)
+
+
+def test_unchanged_content_is_compared_per_host(db):
+    repository = HostRepository(db['hosts'])
+    stored, twin = Host(hostname='twin'), Host(hostname='twin')
+    repository.upsert_hosts([stored])
+
+    summary, = repository.upsert_hosts([stored, twin], skip_unchanged=True)
+    assert (summary.skipped, summary.upserted) == (1, 1)
+    assert db.hosts.count_documents({}) == 2
@@ -0,0 +1,26 @@
+import pytest
+
+from src.clients.qualys import QualysClient
+from src.clients.retry import HostFetchError, RetryPolicy
+
+
+def test_retry_after_is_honored_above_the_backoff_cap():
+    policy = RetryPolicy(backoff_max=60, retry_after_max=900)
+    assert policy.delay(0, retry_after=120) == 120
+    assert policy.honors(900)
+    assert not policy.honors(901)
+
+
+def test_retry_after_within_the_cap_is_retried(vendor_server):
+    vendor_server.failures[('Qualys', 0)] = [429]
+    vendor_server.retry_after = '0'
+    assert len(QualysClient().fetch_hosts(skip=0, limit=10)) == 10
+    assert vendor_server.requests.count(('Qualys', 0, 10)) == 2
+
+
+def test_retry_after_above_the_cap_fails(vendor_server):
+    vendor_server.failures[('Qualys', 0)] = [503]
+    vendor_server.retry_after = '3600'
+    with pytest.raises(HostFetchError, match='3600s'):
+        QualysClient().fetch_hosts(skip=0, limit=10)
+    assert vendor_server.requests == [('Qualys', 0, 10)]
@@ -0,0 +1,69 @@
+import itertools
+import random
+
+import pytest
+
+from benchmarks import synthetic
+from src.clients.crowdstrike import CrowdstrikeClient
+from src.clients.qualys import QualysClient
+from src.models.host import Host
+from src.services.deduplication import HostDeduplicator
+from src.services.scoring import SAME_MAC_RULE, SimilarityCheck, WeightedScorer, same_mac_address
+
+SCORES = (0.0, 0.1, 1 / 3, 0.5, 0.7, 1.0)
+
+
+def score_of(name):
+    return lambda host1, host2: host1.raw_data[name] * host2.raw_data[name]
+
+
+def random_host(rng, names):
+    return Host(
+        mac_addresses=[rng.choice(['00:00:00:00:00:01', '00:00:00:00:00:02', ''])],
+        raw_data={name: rng.choice(SCORES) for name in names},
+    )
+
+
+@pytest.mark.parametrize('rules', [(), (SAME_MAC_RULE,)])
+def test_early_exit_agrees_with_full_scoring(rules):
+    rng = random.Random(0)
+    names = ['a', 'b', 'c', 'd']
+    checks = [
+        SimilarityCheck(name, score_of(name), weight, cost)
+        for name, weight, cost in zip(names, (0.3, 1.0, 0.1, 2.0), (3, 1, 2, 1))
+    ]
+    scorer = WeightedScorer(checks, rules)
+    decisions = 0
+    for _ in range(2000):
+        host1, host2 = random_host(rng, names), random_host(rng, names)
+        score = scorer.score(host1, host2)
+        rule_holds = bool(rules) and same_mac_address(host1, host2)
+        # The exact score is the boundary: reached there, missed just above it
+        for threshold in (0.0, 0.25, 0.5, 0.75, 1.0, score, score + 1e-12):
+            assert scorer.is_match(host1, host2, threshold) == (rule_holds or score >= threshold)
+            decisions += 1
+
+    stats = scorer.stats
+    assert stats.decisions == decisions
+    assert stats.early_accepts and stats.early_rejects
+    assert bool(stats.rule_matches) == bool(rules)
+
+
+def test_deduplicator_scorer_agrees_with_full_scoring():
+    hosts = []
+    for client in (QualysClient(), CrowdstrikeClient()):
+        hosts.extend(client.normalize_page(synthetic.fleet_page(client.SOURCE_SYSTEM, 0, 40, 40, 0.4, 0.3)))
+    scorer = HostDeduplicator(rules=[SAME_MAC_RULE]).scorer
+
+    for host1, host2 in itertools.combinations(hosts, 2):
+        score = scorer.score(host1, host2)
+        for threshold in (0.5, 0.7, 0.9, score):
+            expected = same_mac_address(host1, host2) or score >= threshold
+            assert scorer.is_match(host1, host2, threshold) == expected
+
+
+def test_checks_without_weight_are_dropped():
+    scorer = WeightedScorer([SimilarityCheck('a', score_of('a'), 0), SimilarityCheck('b', score_of('b'))])
+    assert [check.name for check in scorer.checks] == ['b']
+    with pytest.raises(ValueError):
+        WeightedScorer([SimilarityCheck('a', score_of('a'), 0)])
@@ -0,0 +1,89 @@
+import itertools
+from difflib import SequenceMatcher
+
+import pytest
+
+from benchmarks import synthetic
+from src.clients.crowdstrike import CrowdstrikeClient
+from src.clients.qualys import QualysClient
+from src.services.deduplication import HostDeduplicator
+from src.services.similarity import (
+    MinHashSimilarity,
+    SequenceMatcherSimilarity,
+    ShingleSimilarity,
+    get_hostname_similarity,
+)
+
+
+@pytest.fixture(scope='module')
+def hostnames():
+    names = set()
+    for client in (QualysClient(), CrowdstrikeClient()):
+        page = synthetic.fleet_page(client.SOURCE_SYSTEM, 0, 120, 120, duplicate_rate=0.4, noise=0.3)
+        names.update(host.hostname for host in client.normalize_page(page) if host.hostname)
+    return sorted(names)
+
+
+def jaccard(shingles1, shingles2):
+    union = shingles1 | shingles2
+    return len(shingles1 & shingles2) / len(union) if union else 0.0
+
+
+def test_sequence_backend_is_the_sequence_matcher_ratio(hostnames):
+    backend = SequenceMatcherSimilarity()
+    for hostname1, hostname2 in itertools.combinations(hostnames[:60], 2):
+        assert backend.similarity(hostname1, hostname2) == SequenceMatcher(None, hostname1, hostname2).ratio()
+
+
+def test_deduplicator_scores_sorted_pairs_with_the_sequence_matcher(hostnames):
+    deduplicator = HostDeduplicator(hostname_similarity=SequenceMatcherSimilarity())
+    hosts = QualysClient().normalize_page([{'id': i, 'hostname': name} for i, name in enumerate(hostnames[:40])])
+    for host1, host2 in itertools.permutations(hosts, 2):
+        expected = SequenceMatcher(None, *sorted([host1.hostname, host2.hostname])).ratio()
+        assert deduplicator._hostname_similarity(host1, host2) == expected
+
+
+def test_shingle_backend_is_the_exact_jaccard_similarity(hostnames):
+    backend = ShingleSimilarity()
+    assert backend.shingles('web-01') == {'we', 'eb', 'b-', '-0', '01'}
+    assert backend.shingles('a') == {'a'}
+    for hostname1, hostname2 in itertools.combinations(hostnames[:60], 2):
+        expected = jaccard(backend.shingles(hostname1), backend.shingles(hostname2))
+        assert backend.similarity(hostname1, hostname2) == expected
+    assert backend.similarity('', '') == 1.0
+    assert backend.similarity('web', '') == 0.0
+
+
+def test_minhash_estimates_the_jaccard_similarity(hostnames):
+    backend = MinHashSimilarity()
+    errors = [
+        backend.similarity(hostname1, hostname2) - jaccard(backend.shingles(hostname1), backend.shingles(hostname2))
+        for hostname1, hostname2 in itertools.combinations(hostnames[:60], 2)
+    ]
+    assert abs(sum(errors)) / len(errors) < 0.03
+    assert sum(map(abs, errors)) / len(errors) < 0.04
+    assert max(map(abs, errors)) < 0.15
+    assert backend.signature('web-01') == MinHashSimilarity().signature('web-01')
+
+
+def test_lsh_buckets_similar_hostnames_together(hostnames):
+    backend = MinHashSimilarity()
+    keys = {hostname: backend.lsh_keys(hostname) for hostname in hostnames}
+    similar = found = 0
+    for hostname1, hostname2 in itertools.combinations(hostnames, 2):
+        shares_bucket = not keys[hostname1].isdisjoint(keys[hostname2])
+        if jaccard(backend.shingles(hostname1), backend.shingles(hostname2)) >= 0.7:
+            similar += 1
+            found += shares_bucket
+
+    assert similar
+    assert found / similar >= 0.95
+
+
+def test_backends_are_built_by_name():
+    assert isinstance(get_hostname_similarity('minhash'), MinHashSimilarity)
+    assert MinHashSimilarity(bands=None).lsh_keys('web-01') is None
+    with pytest.raises(ValueError):
+        get_hostname_similarity('soundex')
+    with pytest.raises(ValueError):
+        MinHashSimilarity(num_permutations=100, bands=32)
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip('matplotlib')
+pytest.importorskip('seaborn')
+
+from pandas.testing import assert_frame_equal, assert_series_equal  # noqa: E402
+
+from src.models.host import Host  # noqa: E402
+from src.services.repository import HostRepository  # noqa: E402
+from visualize_data import HostDataVisualizer  # noqa: E402
+
+NOW = datetime(2024, 6, 1, 9, 30, tzinfo=timezone.utc)
+
+
+def test_stored_and_in_memory_statistics_agree(db):
+    hosts = [
+        Host(operating_system=operating_system, vulnerability_count=count,
+             last_seen=NOW - timedelta(days=days, hours=hours))
+        for operating_system, count, days, hours in [
+            ('Linux', 3, 0, 1), ('Linux', 5, 40, 12), ('Windows', 7, 2, 23),
+            ('', 1, 1, 0), ('', 2, 0, 10), ('Windows', 0, 31, 1),
+        ]
+    ]
+    repository = HostRepository(db['hosts'])
+    repository.upsert_hosts(hosts)
+
+    stored_os, stored_ages = HostDataVisualizer.summarize_statistics(repository.host_statistics(now=NOW), NOW)
+    os_stats, ages = HostDataVisualizer.summarize_hosts(hosts, NOW)
+
+    assert set(stored_os.index) == {'Linux', 'Windows', 'Unknown'}
+    assert_frame_equal(stored_os.sort_index(), os_stats.sort_index(), check_dtype=False, check_names=False)
+    assert_series_equal(stored_ages, ages, check_dtype=False, check_names=False, check_index_type=False)
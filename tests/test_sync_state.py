@@ -0,0 +1,29 @@
+from datetime import datetime, timedelta, timezone
+
+from src.clients.qualys import QualysClient
+from src.services.sync_state import SyncState
+
+
+def test_hosts_without_last_seen_do_not_advance_the_watermark(db):
+    sync_state = SyncState(db['sync_state'])
+    client = QualysClient()
+    seen = client.normalize_host({'id': 1, 'hostname': 'a', 'last_seen': '2024-03-01T00:00:00Z'})
+    unseen = client.normalize_host({'id': 2, 'hostname': 'b'})
+
+    assert sync_state.is_new('Qualys', seen)
+    assert sync_state.is_new('Qualys', unseen)
+    sync_state.commit()
+    assert SyncState(db['sync_state']).watermarks == {'Qualys': datetime(2024, 3, 1, tzinfo=timezone.utc)}
+
+
+def test_only_hosts_seen_after_the_watermark_are_new(db):
+    watermark = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    db.sync_state.insert_one({'source_system': 'Qualys', 'last_seen': watermark})
+    sync_state = SyncState(db['sync_state'])
+    client = QualysClient()
+
+    old = client.normalize_host({'id': 1, 'last_seen': (watermark - timedelta(days=1)).isoformat()})
+    new = client.normalize_host({'id': 2, 'last_seen': (watermark + timedelta(days=1)).isoformat()})
+    assert not sync_state.is_new('Qualys', old)
+    assert sync_state.is_new('Qualys', new)
+    assert SyncState(db['sync_state'], full_resync=True).is_new('Qualys', old)
@@ -1,97 +1,200 @@
+import argparse
 import matplotlib.pyplot as plt
 import pandas as pd
 from datetime import datetime, timedelta
 import seaborn as sns
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 from src.models.host import Host
-from src.main import fetch_and_process_hosts
+from src.main import connect_to_mongodb, fetch_and_process_hosts
+from src.services.export import read_snapshot
+from src.services.repository import HostRepository
+from src.services.timestamps import utc_now
+
+# Hosts seen within this many days count as active (and new)
+ACTIVE_DAYS = 30
 
 
 class HostDataVisualizer:
+    @staticmethod
+    def summarize_hosts(hosts: List[Host], now: Optional[datetime] = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Aggregate in-memory hosts the way ``HostRepository.host_statistics``
+        aggregates stored ones
+
+        :param hosts: List of Host objects
+        :param now: Reference time (defaults to the current UTC time)
+        :return: Per-OS statistics and host counts by days since last seen
+        """
+        return HostDataVisualizer.summarize_frame(pd.DataFrame({
+            'operating_system': [host.operating_system for host in hosts],
+            'last_seen': [host.last_seen for host in hosts],
+            'vulnerability_count': [host.vulnerability_count for host in hosts],
+        }), now)
+
+    @staticmethod
+    def summarize_frame(df: pd.DataFrame, now: Optional[datetime] = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Aggregate a frame of hosts with ``operating_system``, ``last_seen``
+        and ``vulnerability_count`` columns
+
+        :param df: One row per host
+        :param now: Reference time (defaults to the current UTC time)
+        :return: Per-OS statistics and host counts by days since last seen
+        """
+        now = now or utc_now()
+        df = df.assign(
+            operating_system=df['operating_system'].replace('', None).fillna('Unknown'),
+            last_seen=pd.to_datetime(df['last_seen'], utc=True),
+        )
+        df['active'] = df['last_seen'] > now - timedelta(days=ACTIVE_DAYS)
+
+        os_stats = df.groupby('operating_system').agg(
+            hosts=('operating_system', 'size'),
+            active=('active', 'sum'),
+            mean_vulnerability_count=('vulnerability_count', 'mean'),
+        ).sort_values('hosts', ascending=False)
+        # Calendar days, as the MongoDB aggregation counts them
+        age_counts = (
+            pd.Timestamp(now).floor('D') - df['last_seen'].dt.floor('D')
+        ).dt.days.value_counts().sort_index()
+        return os_stats, age_counts
+
+    @staticmethod
+    def summarize_statistics(
+        statistics: Dict[str, List[Dict[str, Any]]],
+        now: Optional[datetime] = None
+    ) -> Tuple[pd.DataFrame, pd.Series]:
+        """
+        Turn the aggregation of ``HostRepository.host_statistics`` into
+        the frames plotted by ``plot_summary``
+
+        :param statistics: Aggregated host statistics
+        :param now: Reference time (defaults to the current UTC time)
+        :return: Per-OS statistics and host counts by days since last seen
+        """
+        os_stats = pd.DataFrame(
+            statistics['by_os'],
+            columns=['_id', 'hosts', 'active', 'mean_vulnerability_count']
+        ).rename(columns={'_id': 'operating_system'}).set_index('operating_system')
+
+        days = pd.DataFrame(statistics['by_last_seen_day'], columns=['_id', 'hosts'])
+        last_seen_day = pd.to_datetime(days['_id'], format='%Y-%m-%d', errors='coerce', utc=True)
+        today = pd.Timestamp(now or utc_now()).floor('D')
+        days['days_since_last_seen'] = (today - last_seen_day).dt.days
+        age_counts = days.dropna().groupby('days_since_last_seen')['hosts'].sum()
+        age_counts.index = age_counts.index.astype(int)
+        return os_stats, age_counts
+
     @staticmethod
     def visualize_host_data(hosts: List[Host], output_dir: str = '.'):
         """
         Create comprehensive visualizations for host data
-        
+
         :param hosts: List of Host objects
         :param output_dir: Directory to save visualization images
         """
         if not hosts:
             print("No hosts to visualize.")
             return
-        
-        # Debugging statement to check the content of hosts
+
         print(f"Visualizing {len(hosts)} hosts.")
-        
-        # Convert hosts to DataFrame
-        df = pd.DataFrame([host.to_dict() for host in hosts])
-        
-        # Print the DataFrame for debugging
-        print(df)
-        
-        # Convert last_seen to timezone-naive datetime
-        df['last_seen'] = pd.to_datetime(df['last_seen'], utc=True).dt.tz_localize(None)
+        HostDataVisualizer.plot_summary(*HostDataVisualizer.summarize_hosts(hosts), output_dir)
 
+    @staticmethod
+    def visualize_stored_hosts(repository: HostRepository, output_dir: str = '.'):
+        """
+        Create the visualizations from the stored hosts, aggregated by
+        MongoDB so only the aggregates are transferred
+
+        :param repository: Repository of the stored hosts
+        :param output_dir: Directory to save visualization images
+        """
+        os_stats, age_counts = HostDataVisualizer.summarize_statistics(
+            repository.host_statistics(active_days=ACTIVE_DAYS)
+        )
+        if os_stats.empty:
+            print("No hosts to visualize.")
+            return
+
+        print(f"Visualizing {os_stats['hosts'].sum()} stored hosts.")
+        HostDataVisualizer.plot_summary(os_stats, age_counts, output_dir)
+
+    @staticmethod
+    def visualize_snapshot(directory: str, output_dir: str = '.'):
+        """
+        Create the visualizations from a snapshot written by
+        ``export_snapshot``, loading only the plotted columns
+
+        :param directory: Snapshot directory
+        :param output_dir: Directory to save visualization images
+        """
+        df = read_snapshot(directory, columns=['operating_system', 'last_seen', 'vulnerability_count']).to_pandas()
+        if df.empty:
+            print("No hosts to visualize.")
+            return
+
+        print(f"Visualizing {len(df)} hosts from snapshot {directory}.")
+        HostDataVisualizer.plot_summary(*HostDataVisualizer.summarize_frame(df), output_dir)
+
+    @staticmethod
+    def plot_summary(os_stats: pd.DataFrame, age_counts: pd.Series, output_dir: str):
+        """
+        Plot aggregated host statistics
+
+        :param os_stats: Host count, active count and mean vulnerability count by OS
+        :param age_counts: Host counts by days since last seen
+        :param output_dir: Directory to save visualization images
+        """
         # Set up the visualization
         plt.figure(figsize=(15, 10))
         plt.suptitle('Host Data Visualization', fontsize=16)
-        
+
         # Subplot 1: OS Distribution
         plt.subplot(2, 2, 1)
-        os_counts = df['operating_system'].value_counts()
-        os_counts.plot(kind='pie', autopct='%1.1f%%')
+        os_stats['hosts'].plot(kind='pie', autopct='%1.1f%%')
         plt.title('Host Distribution by Operating System')
         plt.ylabel('')
-        
+
         # Subplot 2: Host Age Distribution
         plt.subplot(2, 2, 2)
-        df['days_since_last_seen'] = (datetime.now() - pd.to_datetime(df['last_seen'])).dt.days
-        plt.hist(df['days_since_last_seen'], bins=20, edgecolor='black')
+        plt.hist(age_counts.index, bins=20, weights=age_counts.values, edgecolor='black')
         plt.title('Host Age Distribution')
         plt.xlabel('Days Since Last Seen')
         plt.ylabel('Number of Hosts')
-        
+
         # Subplot 3: Vulnerability Count Heatmap
         plt.subplot(2, 2, 3)
         plt.title('Vulnerability Count Heatmap')
-        vulnerability_pivot = df.pivot_table(
-            values='vulnerability_count', 
-            index='operating_system', 
-            aggfunc='mean'
-        )
-        sns.heatmap(vulnerability_pivot, annot=True, cmap='YlOrRd')
-        
+        sns.heatmap(os_stats[['mean_vulnerability_count']], annot=True, cmap='YlOrRd')
+
         # Subplot 4: Active vs Inactive Hosts
         plt.subplot(2, 2, 4)
-        cutoff_date = datetime.now() - timedelta(days=30)
-        df['host_status'] = df['last_seen'].apply(
-            lambda x: 'Active' if pd.to_datetime(x) > cutoff_date else 'Inactive'
-        )
-        df['host_status'].value_counts().plot(kind='bar')
+        active = int(os_stats['active'].sum())
+        inactive = int(os_stats['hosts'].sum()) - active
+        pd.Series({'Active': active, 'Inactive': inactive}).sort_values(ascending=False).plot(kind='bar')
         plt.title('Active vs Inactive Hosts')
         plt.xlabel('Host Status')
         plt.ylabel('Number of Hosts')
-        
+
         # Adjust layout and save
         plt.tight_layout()
         plt.savefig(f'{output_dir}/host_data_visualization.png')
         plt.close()
 
         # Save individual plots
-        HostDataVisualizer.save_individual_plots(df, output_dir)
+        HostDataVisualizer.save_individual_plots(os_stats, output_dir)
 
     @staticmethod
-    def save_individual_plots(df: pd.DataFrame, output_dir: str):
+    def save_individual_plots(os_stats: pd.DataFrame, output_dir: str):
         """
         Save individual plots for specific visualizations.
-        
-        :param df: DataFrame containing host data
+
+        :param os_stats: Host count and active count by OS
         :param output_dir: Directory to save visualization images
         """
         # Distribution of hosts by operating system
         plt.figure(figsize=(10, 6))
-        os_counts = df['operating_system'].value_counts()
-        os_counts.plot(kind='bar', color='skyblue')
+        os_stats['hosts'].plot(kind='bar', color='skyblue')
         plt.title('Host Distribution by Operating System')
         plt.xlabel('Operating System')
         plt.ylabel('Number of Hosts')
@@ -100,11 +203,9 @@ class HostDataVisualizer:
 
         # Old hosts vs newly discovered hosts
         plt.figure(figsize=(10, 6))
-        cutoff_date = datetime.now() - timedelta(days=30)
-        df['host_status'] = df['last_seen'].apply(
-            lambda x: 'Old' if pd.to_datetime(x) <= cutoff_date else 'New'
-        )
-        df['host_status'].value_counts().plot(kind='bar', color='lightgreen')
+        new = int(os_stats['active'].sum())
+        old = int(os_stats['hosts'].sum()) - new
+        pd.Series({'New': new, 'Old': old}).sort_values(ascending=False).plot(kind='bar', color='lightgreen')
         plt.title('Old Hosts vs Newly Discovered Hosts')
         plt.xlabel('Host Status')
         plt.ylabel('Number of Hosts')
@@ -113,9 +214,23 @@ class HostDataVisualizer:
 
 # Example usage
 if __name__ == "__main__":
-    
-    # Fetch hosts
-    hosts = fetch_and_process_hosts()
-    
-    # Visualize
-    HostDataVisualizer.visualize_host_data(hosts)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Visualize the stored hosts")
+    parser.add_argument(
+        '--refresh', action='store_true',
+        help="Run the pipeline first to fetch the latest hosts from the vendors"
+    )
+    parser.add_argument(
+        '--snapshot', metavar='DIR',
+        help="Visualize a Parquet/Arrow snapshot instead of the stored hosts"
+    )
+    parser.add_argument('--output-dir', default='.', help="Directory to save visualization images")
+    args = parser.parse_args()
+
+    if args.refresh:
+        fetch_and_process_hosts()
+
+    if args.snapshot:
+        HostDataVisualizer.visualize_snapshot(args.snapshot, args.output_dir)
+    else:
+        # Aggregate the stored hosts in MongoDB and visualize
+        HostDataVisualizer.visualize_stored_hosts(HostRepository(connect_to_mongodb()['hosts']), args.output_dir)